@@ -136,13 +136,35 @@ STATIC_URL = 'static/'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+# Caché compartida entre procesos (comandos, daemon y servidor web)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': config('CACHE_DIR', default='') or str(BASE_DIR / '.cache'),
+        # Fragmentos del dashboard y versiones por módulo (~2 entradas por módulo)
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    }
+}
+
+# Archivos exportados reutilizados mientras no cambien los datos (LRU por tamaño)
+EXPORT_CACHE_DIR = config('EXPORT_CACHE_DIR', default='') or str(BASE_DIR / '.export_cache')
+EXPORT_CACHE_MAX_BYTES = config('EXPORT_CACHE_MAX_MB', default=512, cast=int) * 1024 * 1024
+
 # ==============================================================================
 # CONFIGURACIÓN DE SINCRONIZACIÓN CON ACCESS
 # ==============================================================================
 
 # Leer configuración desde .env (no hardcodear passwords)
-ACCESS_DATABASE_PATH = config('ACCESS_DB_PATH')
-ACCESS_DATABASE_PASSWORD = config('ACCESS_DB_PASSWORD')
+ACCESS_DATABASE_PATH = config('ACCESS_DB_PATH', default='')
+ACCESS_DATABASE_PASSWORD = config('ACCESS_DB_PASSWORD', default='')
+
+# Backend de extracción: 'odbc' (Access) o 'sqlite' (stand-in para Linux/tests)
+ACCESS_EXTRACTOR_BACKEND = config('ACCESS_EXTRACTOR_BACKEND', default='odbc')
+ACCESS_SQLITE_PATH = config('ACCESS_SQLITE_PATH', default='')
+
+# Vigencia (segundos) de las estadísticas cacheadas del origen; además se
+# invalidan cuando cambia la fecha de modificación del archivo .accdb
+ACCESS_STATS_TTL = config('ACCESS_STATS_TTL', default=3600, cast=int)
 
 ACCESS_CONNECTION_STRING = (
     r'DRIVER={Microsoft Access Driver (*.mdb, *.accdb)};'
@@ -6,7 +6,16 @@ Registra los modelos principales con interfaces personalizadas.
 from django.contrib import admin
 from django.utils.html import format_html
 
-from .models import FleetModule, MaintenanceEvent, MaintenanceProfile, OdometerLog
+from .models import (
+    ExportJob,
+    FleetModule,
+    MaintenanceEvent,
+    MaintenanceProfile,
+    OdometerLog,
+    ProjectionSnapshot,
+    SyncPhaseMetric,
+    SyncRun,
+)
 
 
 @admin.register(MaintenanceProfile)
@@ -112,3 +121,51 @@ class OdometerLogAdmin(admin.ModelAdmin):
             formatted_delta
         )
     formatted_delta.short_description = 'Delta'
+
+
+class SyncPhaseMetricInline(admin.TabularInline):
+    """Fases de un ciclo de sincronización (solo lectura)."""
+
+    model = SyncPhaseMetric
+    extra = 0
+    can_delete = False
+    readonly_fields = ['phase', 'duration_seconds', 'row_count']
+
+
+@admin.register(SyncRun)
+class SyncRunAdmin(admin.ModelAdmin):
+    """Historial de ciclos de ``sync_daemon``."""
+
+    list_display = ['started_at', 'finished_at', 'status', 'consecutive_failures']
+    list_filter = ['status']
+    date_hierarchy = 'started_at'
+    ordering = ['-started_at']
+    readonly_fields = ['started_at', 'finished_at', 'status', 'consecutive_failures', 'error']
+    inlines = [SyncPhaseMetricInline]
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    """Cola de exportaciones procesada por ``run_export_worker``."""
+
+    list_display = ['id', 'kind', 'status', 'progress', 'total', 'created_at', 'finished_at', 'worker']
+    list_filter = ['status', 'kind']
+    date_hierarchy = 'created_at'
+    ordering = ['-created_at']
+    readonly_fields = [
+        'kind', 'params', 'status', 'progress', 'total', 'artifact', 'worker', 'error',
+        'created_at', 'started_at', 'heartbeat_at', 'finished_at',
+    ]
+
+
+@admin.register(ProjectionSnapshot)
+class ProjectionSnapshotAdmin(admin.ModelAdmin):
+    """Snapshots guardados por ``snapshot_projection``."""
+
+    list_display = ['taken_on', 'months_ahead', 'monthly_km', 'module_count', 'row_count', 'created_at']
+    list_filter = ['months_ahead', 'monthly_km']
+    date_hierarchy = 'taken_on'
+    exclude = ['data']
+    readonly_fields = [
+        'taken_on', 'months_ahead', 'monthly_km', 'first_month', 'module_count', 'row_count', 'created_at',
+    ]
@@ -0,0 +1,8 @@
+from django.apps import AppConfig
+
+
+class MaintenanceConfig(AppConfig):
+    name = "maintenance"
+
+    def ready(self) -> None:
+        from . import signals  # noqa: F401 - registra los receivers
@@ -0,0 +1,87 @@
+"""
+Management Command: build_access_sqlite
+
+Genera un archivo SQLite con el esquema de Access y datos sintéticos, para
+ejecutar y medir ``sync_from_access --backend sqlite`` sin driver ODBC.
+
+Uso:
+    python manage.py build_access_sqlite --output access_stub.sqlite3 --modules 86 --days 3650
+    python manage.py sync_from_access --backend sqlite --source access_stub.sqlite3 --since 2015-01-01
+"""
+from __future__ import annotations
+
+import sqlite3
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from maintenance.services.sqlite_extractor import create_schema, populate_synthetic_data
+
+
+class Command(BaseCommand):
+    """Crea el stand-in SQLite de Access con historial sintético."""
+
+    help = "Genera un SQLite con el esquema de Access y datos sintéticos para sync_from_access"
+
+    def add_arguments(self, parser):
+        """Define los argumentos del comando."""
+        parser.add_argument(
+            "--output",
+            type=str,
+            required=True,
+            help="Ruta del archivo SQLite a generar",
+        )
+        parser.add_argument(
+            "--modules",
+            type=int,
+            default=86,
+            help="Cantidad de módulos CSR (default: 86)",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=365,
+            help="Días de historial por módulo (default: 365)",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Semilla de generación (default: 0)",
+        )
+        parser.add_argument(
+            "--overwrite",
+            action="store_true",
+            help="Reemplaza el archivo si ya existe",
+        )
+
+    def handle(self, *args, **options):
+        """Ejecuta la generación."""
+        output = Path(options["output"])
+        if options["modules"] < 1 or options["days"] < 1:
+            raise CommandError("--modules y --days deben ser mayores a 0")
+
+        if output.exists():
+            if not options["overwrite"]:
+                raise CommandError(f"{output} ya existe (usar --overwrite)")
+            output.unlink()
+
+        started = time.perf_counter()
+        conn = sqlite3.connect(output)
+        try:
+            create_schema(conn)
+            counts = populate_synthetic_data(
+                conn,
+                modules=options["modules"],
+                days=options["days"],
+                seed=options["seed"],
+            )
+        finally:
+            conn.close()
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"✓ Stand-in generado: {output} ({elapsed:.1f}s)"))
+        self.stdout.write(f"  Módulos: {counts['modules']}")
+        self.stdout.write(f"  Lecturas: {counts['readings']:,}")
+        self.stdout.write(f"  Eventos: {counts['events']:,}")
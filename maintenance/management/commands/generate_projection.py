@@ -4,16 +4,40 @@ Comando de management para generar proyecciones de mantenimiento.
 Uso:
     python manage.py generate_projection --months 24 --km 12500 --output projection.xlsx
     python manage.py generate_projection --module 5 --json
+    python manage.py generate_projection --all --ndjson --months 60
     python manage.py generate_projection --all --excel
+    python manage.py generate_projection --all --json --months 60 --workers 4
+    python manage.py generate_projection --all --excel --no-cache
+    python manage.py generate_projection --all --csv --history --output proyeccion.csv
 """
 from django.core.management.base import BaseCommand, CommandError
 from django.utils import timezone
 from datetime import date
 import json
+import shutil
 
 from maintenance.models import FleetModule
+from maintenance.services.excel_recalc import check_formula_errors, recalculate_excel
+from maintenance.services.export_cache import projection_workbook
 from maintenance.services.projection_grid import MaintenanceProjectionGrid
 from maintenance.services.projection_excel import ProjectionExcelExporter
+from maintenance.services.projection_tabular import (
+    DEFAULT_BATCH_SIZE,
+    EVENTS,
+    ODOMETER,
+    PROJECTION,
+    WRITERS as TABULAR_WRITERS,
+    history_records,
+    parquet_available,
+    projection_records,
+)
+from maintenance.services.projection_xlsx import ProjectionXlsxWriter
+
+# Escritores de Excel con la misma interfaz export(projections, filepath, monthly_km)
+EXCEL_ENGINES = {
+    'direct': ProjectionXlsxWriter,
+    'openpyxl': ProjectionExcelExporter,
+}
 
 
 class Command(BaseCommand):
@@ -52,15 +76,59 @@ class Command(BaseCommand):
             action='store_true',
             help='Output en formato JSON a stdout'
         )
+        parser.add_argument(
+            '--ndjson',
+            action='store_true',
+            help='Output NDJSON a stdout: una línea por fila, a medida que se proyecta'
+        )
         parser.add_argument(
             '--excel',
             action='store_true',
             help='Generar archivo Excel'
         )
+        parser.add_argument(
+            '--csv',
+            action='store_true',
+            help='Generar CSV en formato largo (módulo, tipo, mes, km, flags)'
+        )
+        parser.add_argument(
+            '--parquet',
+            action='store_true',
+            help='Generar Parquet en formato largo (requiere pyarrow)'
+        )
         parser.add_argument(
             '--output',
             type=str,
-            help='Ruta del archivo de salida (para --excel)'
+            help='Ruta del archivo de salida (para --excel, --csv y --parquet)'
+        )
+        parser.add_argument(
+            '--history',
+            action='store_true',
+            help='Con --csv/--parquet: exportar también lecturas y eventos (<salida>_odometer, <salida>_events)'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help=f'Filas por lote de escritura para --csv/--parquet (default: {DEFAULT_BATCH_SIZE})'
+        )
+        parser.add_argument(
+            '--excel-engine',
+            choices=sorted(EXCEL_ENGINES),
+            default='direct',
+            help='Escritor de Excel: direct (XML directo, default) u openpyxl'
+        )
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Generar el Excel aunque haya uno vigente en la caché de exportaciones'
+        )
+        
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Procesos para proyectar en paralelo (default: 1 = serial)'
         )
         
         # Opciones adicionales
@@ -81,6 +149,17 @@ class Command(BaseCommand):
         if monthly_km < 1000 or monthly_km > 50_000:
             raise CommandError('km debe estar entre 1000 y 50000')
         
+        tabular_format = 'parquet' if options['parquet'] else 'csv' if options['csv'] else None
+        if options['csv'] and options['parquet']:
+            raise CommandError('Use --csv o --parquet, no ambos')
+        if options['parquet'] and not parquet_available():
+            raise CommandError('--parquet requiere pyarrow (pip install pyarrow)')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size debe ser mayor a 0')
+        if options['workers'] < 1:
+            raise CommandError('--workers debe ser mayor a 0')
+        workers = options['workers']
+        
         # Determinar módulos a procesar
         if options['module']:
             try:
@@ -114,6 +193,36 @@ class Command(BaseCommand):
             )
         
         try:
+            if options['ndjson']:
+                self._output_ndjson(service, modules, months, workers)
+                return
+            
+            if tabular_format:
+                self._output_tabular(
+                    service,
+                    modules,
+                    months,
+                    tabular_format,
+                    options.get('output'),
+                    options['history'],
+                    options['batch_size'],
+                    workers
+                )
+                return
+            
+            if options['excel']:
+                # El libro sale de la caché de exportaciones si no cambió nada
+                self._output_excel(
+                    modules,
+                    months,
+                    monthly_km,
+                    options.get('output'),
+                    options['excel_engine'],
+                    use_cache=not options['no_cache'],
+                    workers=workers
+                )
+                return
+            
             if len(modules) == 1:
                 # Proyección para un solo módulo
                 rows = service.generate_for_module(
@@ -122,23 +231,17 @@ class Command(BaseCommand):
                 )
                 projections = {modules[0].id: rows}
             else:
-                # Proyección para múltiples módulos
-                projections = service.generate_for_all_modules(
+                # Proyección para múltiples módulos (en paralelo con --workers)
+                projections = dict(service.iter_for_modules(
                     modules,
-                    months_ahead=months
-                )
+                    months_ahead=months,
+                    workers=workers
+                ))
             
             # Output según formato solicitado
             if options['json']:
                 self._output_json(service, projections)
             
-            elif options['excel']:
-                self._output_excel(
-                    projections,
-                    monthly_km,
-                    options.get('output')
-                )
-            
             else:
                 # Output de texto por defecto
                 self._output_text(projections, months, monthly_km)
@@ -201,41 +304,102 @@ class Command(BaseCommand):
             json.dumps(data, indent=2, ensure_ascii=False)
         )
     
-    def _output_excel(self, projections, monthly_km, output_path):
+    def _output_ndjson(self, service, modules, months, workers=1):
+        """Output NDJSON a stdout, una fila por línea sin armar el resultado completo"""
+        lines = service.iter_ndjson(
+            service.iter_for_modules(modules, months_ahead=months, workers=workers),
+            header={'generation_date': date.today().isoformat()}
+        )
+        for line in lines:
+            self.stdout.write(line, ending='')
+    
+    def _output_tabular(self, service, modules, months, fmt, output_path, history, batch_size, workers=1):
+        """Generar CSV o Parquet en formato largo (y el historial si se pide)"""
+        if not output_path:
+            output_path = f'proyeccion_{date.today().strftime("%Y%m%d")}.{fmt}'
+        
+        write = TABULAR_WRITERS[fmt]
+        outputs = [(PROJECTION, output_path, projection_records(
+            service.iter_for_modules(modules, months_ahead=months, workers=workers)
+        ))]
+        if history:
+            stem, dot, suffix = output_path.rpartition('.')
+            module_ids = [module.id for module in modules]
+            outputs += [
+                (
+                    dataset,
+                    f'{stem}_{dataset.name}{dot}{suffix}' if dot else f'{output_path}_{dataset.name}',
+                    history_records(dataset, module_ids, batch_size)
+                )
+                for dataset in (ODOMETER, EVENTS)
+            ]
+        
+        for dataset, path, records in outputs:
+            write(dataset, records, path, batch_size=batch_size)
+            self.stdout.write(
+                self.style.SUCCESS(f'✓ {fmt.upper()} generado ({dataset.name}): {path}')
+            )
+    
+    def _output_excel(self, modules, months, monthly_km, output_path, engine='direct', use_cache=True, workers=1):
         """Generar archivo Excel"""
         if not output_path:
             output_path = f'proyeccion_{date.today().strftime("%Y%m%d")}.xlsx'
         
-        exporter = ProjectionExcelExporter()
-        exporter.export(
-            projections=projections,
-            filepath=output_path,
-            monthly_km=monthly_km
-        )
+        exporter = EXCEL_ENGINES[engine]()
+        if use_cache:
+            cached_path = projection_workbook(
+                modules,
+                months_ahead=months,
+                monthly_km=monthly_km,
+                start_date=date.today(),
+                exporter=exporter,
+                workers=workers
+            )
+            shutil.copyfile(cached_path, output_path)
+        else:
+            service = MaintenanceProjectionGrid(monthly_km=monthly_km)
+            exporter.export(
+                projections=service.iter_for_modules(modules, months_ahead=months, workers=workers),
+                filepath=output_path,
+                monthly_km=monthly_km
+            )
         
         self.stdout.write(
             self.style.SUCCESS(f'✓ Excel generado: {output_path}')
         )
         
-        # Intentar recalcular fórmulas si está disponible
-        try:
-            import subprocess
-            result = subprocess.run(
-                ['python', 'recalc.py', output_path],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            
-            if result.returncode == 0:
-                self.stdout.write(
-                    self.style.SUCCESS('✓ Fórmulas recalculadas')
-                )
-            else:
+        self._verify_excel(exporter, output_path)
+    
+    def _verify_excel(self, exporter, output_path):
+        """
+        Verificar el Excel generado (en proceso, sin subprocess).
+        
+        Solo se recalcula con LibreOffice si el escritor generó fórmulas; si
+        no, basta con recorrer el libro en modo read-only buscando errores.
+        """
+        if getattr(exporter, 'WRITES_FORMULAS', True):
+            result = recalculate_excel(output_path)
+            if result['status'] == 'error':
                 self.stdout.write(
                     self.style.WARNING(
-                        '⚠ No se pudo recalcular fórmulas (opcional)'
+                        f"⚠ No se pudo recalcular fórmulas (opcional): {result['message']}"
                     )
                 )
-        except Exception:
-            pass  # Recalc es opcional
+                return
+            self.stdout.write(self.style.SUCCESS('✓ Fórmulas recalculadas'))
+        else:
+            result = check_formula_errors(output_path)
+        
+        if result['total_errors']:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"⚠ {result['total_errors']} errores en fórmulas: "
+                    f"{', '.join(sorted(result['error_summary']))}"
+                )
+            )
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(
+                    f"✓ Verificado: {result['total_formulas']} fórmulas, sin errores"
+                )
+            )
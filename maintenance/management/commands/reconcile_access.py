@@ -0,0 +1,348 @@
+"""
+Comando Django para reconciliar Django contra Access por particiones.
+
+Compara agregados (cantidad, suma de km, fecha máxima) por módulo y, en los
+módulos que difieren, por módulo y mes. Solo las particiones distintas se
+vuelven a extraer y sincronizar, ignorando los hashes de fila (repara filas
+borradas o editadas del lado Django que una sincronización incremental no
+vería). En cada partición resincronizada se borran las filas de Django cuya
+clave ya no está en Access, así la partición queda igual en ambos lados y no
+vuelve a transferirse en la próxima corrida.
+
+Las particiones que solo existen en Django (el módulo no tiene filas en Access
+ese mes, p. ej. historial importado con import_legacy_data) no se tocan salvo
+con ``--delete-orphans``; sin esa opción se informan como sin resolver.
+
+Uso:
+    python manage.py reconcile_access [opciones]
+
+Opciones:
+    --dry-run           Solo informa las particiones distintas
+    --delete-orphans    Borra también las particiones que solo existen en Django
+    --events-only       Solo reconcilia eventos de mantenimiento
+    --readings-only     Solo reconcilia lecturas de odómetro
+    --since YYYY-MM-DD  Solo considera datos desde esta fecha
+    --batch-size N      Filas leídas de Access por lote (default: 5000)
+    --backend NOMBRE    Backend de extracción: odbc (Access) o sqlite
+    --source ORIGEN     Connection string o archivo del backend (default: .env)
+"""
+from datetime import date
+from typing import Callable, Dict, List, Optional, Set
+
+from django.core.management.base import CommandError
+from django.db import transaction
+
+from maintenance.models import (
+    FleetModule,
+    MaintenanceEvent,
+    MaintenanceProfile,
+    OdometerLog,
+    SourceRowHash,
+)
+from maintenance.services.access_extractor import AccessExtractor, BaseExtractor
+from maintenance.services.extractors import EXTRACTOR_BACKENDS, create_extractor
+from maintenance.services.reconciliation import (
+    diff_partitions,
+    event_checksums,
+    month_bounds,
+    reading_checksums,
+)
+
+from .sync_from_access import Command as SyncCommand
+
+
+class Command(SyncCommand):
+    help = 'Reconcilia Django contra Access resincronizando solo las particiones (módulo, mes) distintas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Solo informa las particiones distintas, sin modificar BD',
+        )
+        parser.add_argument(
+            '--delete-orphans',
+            action='store_true',
+            help='Borra también las particiones (módulo, mes) que solo existen en Django',
+        )
+        parser.add_argument(
+            '--events-only',
+            action='store_true',
+            help='Solo reconciliar eventos de mantenimiento',
+        )
+        parser.add_argument(
+            '--readings-only',
+            action='store_true',
+            help='Solo reconciliar lecturas de odómetro',
+        )
+        parser.add_argument(
+            '--since',
+            type=str,
+            help='Considerar solo datos desde fecha (YYYY-MM-DD)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=AccessExtractor.DEFAULT_BATCH_SIZE,
+            help='Filas leídas de Access por lote (default: 5000)',
+        )
+        parser.add_argument(
+            '--backend',
+            choices=sorted(EXTRACTOR_BACKENDS),
+            help='Backend de extracción (default: ACCESS_EXTRACTOR_BACKEND)',
+        )
+        parser.add_argument(
+            '--source',
+            type=str,
+            help='Connection string o archivo del backend (default: .env)',
+        )
+
+    def handle(self, *args, **options):
+        """Ejecuta la reconciliación."""
+
+        try:
+            extractor = create_extractor(options.get('backend'), options.get('source'))
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        dry_run = options['dry_run']
+        self.delete_orphans = options['delete_orphans']
+        since_date = self._parse_date(options.get('since'))
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('--batch-size debe ser mayor a 0')
+
+        reconcile_events = not options['readings_only']
+        reconcile_readings = not options['events_only']
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING('MODO PRUEBA - No se modificará la BD'))
+
+        try:
+            with extractor:
+                if not extractor.conn:
+                    raise CommandError('Error de conexión con el origen')
+
+                if reconcile_events:
+                    self._reconcile_events(extractor, since_date, batch_size, dry_run)
+                    self.stdout.write('')
+
+                if reconcile_readings:
+                    self._reconcile_readings(extractor, since_date, batch_size, dry_run)
+                    self.stdout.write('')
+
+        except CommandError:
+            raise
+        except Exception as e:
+            raise CommandError(f"Error durante reconciliación: {e}")
+
+        self.stdout.write(self.style.SUCCESS('✓ Reconciliación completada'))
+
+    def _reconcile_events(
+        self,
+        extractor: BaseExtractor,
+        since_date: Optional[date],
+        batch_size: int,
+        dry_run: bool
+    ) -> int:
+        """Reconcilia eventos; retorna la cantidad de particiones distintas."""
+
+        self.stdout.write('Reconciliando eventos de mantenimiento...')
+
+        # Solo tipos con perfil en Django: el resto nunca se sincroniza
+        profiles = {p.code: p for p in MaintenanceProfile.objects.all()}
+        partitions = self._differing_partitions(
+            lambda **kw: extractor.get_event_checksums(maintenance_types=profiles, **kw),
+            lambda **kw: event_checksums(maintenance_types=profiles, **kw),
+            since_date,
+        )
+        self._write_partitions(partitions, 'eventos')
+        if dry_run or not partitions:
+            return len(partitions)
+
+        module_ids = set(FleetModule.objects.values_list('id', flat=True))
+        synced_count = 0
+        deleted_count = 0
+
+        with transaction.atomic():
+            for module_id, module_num, start, end in self._partition_ranges(partitions, since_date):
+                source_keys = set()
+                if module_id is not None:
+                    for batch in extractor.iter_maintenance_events(
+                        module_id, since_date=start, until_date=end, batch_size=batch_size
+                    ):
+                        synced, _, _ = self._apply_events_batch(
+                            batch, module_ids, profiles, force=True
+                        )
+                        synced_count += synced
+                        source_keys.update(
+                            (module_num, profiles[evt.maintenance_type].id, evt.event_date)
+                            for evt in batch
+                            if evt.maintenance_type in profiles
+                        )
+
+                deleted = self._delete_missing(
+                    SourceRowHash.SourceTable.OT_SIMAF,
+                    MaintenanceEvent.objects.filter(
+                        fleet_module_id=module_num,
+                        profile__code__in=profiles,
+                        event_date__gte=start,
+                        event_date__lt=end,
+                    ),
+                    lambda event: (event.fleet_module_id, event.profile_id, event.event_date),
+                    source_keys,
+                )
+                deleted_count += len(deleted)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {synced_count} eventos resincronizados, {deleted_count} borrados (ya no están en Access)"
+        ))
+        return len(partitions)
+
+    def _reconcile_readings(
+        self,
+        extractor: BaseExtractor,
+        since_date: Optional[date],
+        batch_size: int,
+        dry_run: bool
+    ) -> int:
+        """Reconcilia lecturas; retorna la cantidad de particiones distintas."""
+
+        self.stdout.write('Reconciliando lecturas de odómetro...')
+
+        partitions = self._differing_partitions(
+            extractor.get_reading_checksums, reading_checksums, since_date
+        )
+        self._write_partitions(partitions, 'lecturas')
+        if dry_run or not partitions:
+            return len(partitions)
+
+        module_ids = set(FleetModule.objects.values_list('id', flat=True))
+        touched_since: Dict[int, date] = {}
+        written_count = 0
+        deleted_count = 0
+
+        with transaction.atomic():
+            for module_id, module_num, start, end in self._partition_ranges(partitions, since_date):
+                source_keys = set()
+                if module_id is not None:
+                    for batch in extractor.iter_odometer_readings(
+                        module_id, since_date=start, until_date=end, batch_size=batch_size
+                    ):
+                        written, _, _ = self._apply_readings_batch(
+                            batch, module_ids, touched_since, force=True
+                        )
+                        written_count += written
+                        source_keys.update((module_num, r.reading_date) for r in batch)
+
+                deleted = self._delete_missing(
+                    SourceRowHash.SourceTable.KILOMETRAJES,
+                    OdometerLog.objects.filter(
+                        fleet_module_id=module_num,
+                        reading_date__gte=start,
+                        reading_date__lt=end,
+                    ),
+                    lambda log: (log.fleet_module_id, log.reading_date),
+                    source_keys,
+                )
+                deleted_count += len(deleted)
+                if deleted:
+                    first = min(log.reading_date for log in deleted)
+                    touched_since[module_num] = min(touched_since.get(module_num, first), first)
+
+            for module in FleetModule.objects.filter(id__in=touched_since):
+                module.recompute_odometer_deltas(since=touched_since[module.id])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ {written_count} lecturas resincronizadas, {deleted_count} borradas (ya no están en Access)"
+        ))
+        return len(partitions)
+
+    @staticmethod
+    def _delete_missing(
+        table: str,
+        queryset,
+        key_of: Callable,
+        source_keys: Set[tuple]
+    ) -> list:
+        """
+        Borra las filas de ``queryset`` cuya clave natural no vino de Access.
+
+        También descarta los hashes de fila que apuntaban a ellas, para que
+        una fila de origen que reaparezca se vuelva a escribir.
+
+        Returns:
+            Filas borradas
+        """
+        stale = [row for row in queryset if key_of(row) not in source_keys]
+        if stale:
+            ids = [row.id for row in stale]
+            SourceRowHash.objects.filter(source_table=table, target_id__in=ids).delete()
+            queryset.model.objects.filter(id__in=ids).delete()
+        return stale
+
+    @staticmethod
+    def _differing_partitions(access_checksums, django_checksums, since_date) -> List[tuple]:
+        """
+        Resuelve las particiones (módulo, año, mes) distintas en dos niveles.
+
+        Primero compara un agregado por módulo; solo los módulos distintos
+        se vuelven a agregar por mes en ambos lados.
+
+        Returns:
+            Lista de tuplas (module_id de Access, número, año, mes)
+        """
+        access_modules = access_checksums(since_date=since_date)
+        modules = [
+            key[0] for key in diff_partitions(
+                access_modules, django_checksums(since=since_date)
+            )
+        ]
+        if not modules:
+            return []
+
+        # Solo los módulos presentes en Access pueden resincronizarse
+        names = [access_modules[(num,)].module_id for num in modules if (num,) in access_modules]
+        access_months = access_checksums(module_ids=names, since_date=since_date, by_month=True) if names else {}
+        django_months = django_checksums(module_numbers=modules, since=since_date, by_month=True)
+
+        return [
+            (
+                access_months[key].module_id if key in access_months else None,
+                *key,
+            )
+            for key in diff_partitions(access_months, django_months)
+        ]
+
+    def _write_partitions(self, partitions: List[tuple], label: str) -> None:
+        """Informa las particiones distintas (muestra de 10)."""
+        if not partitions:
+            self.stdout.write(self.style.SUCCESS(f"✓ {label.capitalize()} sin diferencias"))
+            return
+
+        self.stdout.write(f"  {len(partitions)} particiones de {label} con diferencias:")
+        for module_id, module_num, year, month in partitions[:10]:
+            if module_id:
+                origin = ''
+            elif self.delete_orphans:
+                origin = ' (solo en Django, se elimina)'
+            else:
+                origin = ' (solo en Django, sin resolver: ver --delete-orphans)'
+            self.stdout.write(f"    Módulo {module_num:02d} - {month:02d}/{year}{origin}")
+        if len(partitions) > 10:
+            self.stdout.write(f"    ... y {len(partitions) - 10} más")
+
+    def _partition_ranges(self, partitions: List[tuple], since_date: Optional[date]):
+        """
+        Genera (module_id de Access, número, desde, hasta) de las particiones a resolver.
+
+        Las que solo existen en Django (``module_id`` None) se incluyen solo
+        con ``--delete-orphans``.
+        """
+        for module_id, module_num, year, month in partitions:
+            if module_id is None and not self.delete_orphans:
+                continue
+            start, end = month_bounds(year, month)
+            if since_date and since_date > start:
+                start = since_date
+            yield module_id, module_num, start, end
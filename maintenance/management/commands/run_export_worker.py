@@ -0,0 +1,105 @@
+"""
+Comando Django que procesa la cola de exportaciones (``ExportJob``).
+
+Las vistas solo encolan el pedido; este proceso genera los archivos fuera
+del ciclo de request, así una exportación grande no ocupa un worker web ni
+choca con el timeout del proxy. Se pueden correr varias instancias: cada
+job lo toma una sola.
+
+Uso:
+    python manage.py run_export_worker [opciones]
+
+Opciones:
+    --poll-interval SEG  Espera entre consultas con la cola vacía (default: 2)
+    --max-jobs N         Termina tras N jobs (default: 0 = sin límite)
+    --once               Procesa los jobs pendientes y termina
+    --stale-after SEG    Reencola jobs RUNNING sin avance hace SEG (default: 600)
+    --keep-days N        Borra jobs terminados hace más de N días (default: 7)
+"""
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from maintenance.services.export_jobs import (
+    DEFAULT_STALE_AFTER,
+    claim_next_job,
+    prune_finished_jobs,
+    requeue_stale_jobs,
+    run_job,
+    worker_name,
+)
+
+
+class Command(BaseCommand):
+    help = 'Procesa la cola de exportaciones encoladas desde la web'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=2,
+            help='Segundos de espera con la cola vacía (default: 2)',
+        )
+        parser.add_argument(
+            '--max-jobs',
+            type=int,
+            default=0,
+            help='Termina tras N jobs (default: 0 = sin límite)',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Procesa los jobs pendientes y termina',
+        )
+        parser.add_argument(
+            '--stale-after',
+            type=float,
+            default=DEFAULT_STALE_AFTER.total_seconds(),
+            help='Reencola jobs en curso sin avance hace SEG segundos (default: 600)',
+        )
+        parser.add_argument(
+            '--keep-days',
+            type=int,
+            default=7,
+            help='Borra jobs terminados hace más de N días (default: 7)',
+        )
+
+    def handle(self, *args, **options):
+        """Procesa jobs hasta --max-jobs, --once con la cola vacía, o Ctrl+C."""
+
+        if options['poll_interval'] <= 0:
+            raise CommandError('--poll-interval debe ser mayor a 0')
+
+        worker = worker_name()
+        stale_after = timedelta(seconds=options['stale_after'])
+        keep = timedelta(days=options['keep_days'])
+        max_jobs = options['max_jobs']
+        processed = 0
+
+        try:
+            while not (max_jobs and processed >= max_jobs):
+                requeue_stale_jobs(stale_after)
+                job = claim_next_job(worker)
+
+                if job is None:
+                    prune_finished_jobs(keep)
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                started = time.monotonic()
+                job = run_job(job)
+                processed += 1
+                elapsed = time.monotonic() - started
+
+                if job.status == job.Status.OK:
+                    self.stdout.write(
+                        self.style.SUCCESS(f"✓ Job #{job.pk} ({job.total} módulos) en {elapsed:.1f}s")
+                    )
+                else:
+                    self.stdout.write(self.style.ERROR(f"✗ Job #{job.pk}: {job.error}"))
+
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Detenido por el usuario'))
@@ -0,0 +1,118 @@
+"""
+Comando Django que guarda un snapshot de la proyección de la flota.
+
+Pensado para correr una vez por día (cron): cada snapshot queda en
+``ProjectionSnapshot`` y se puede comparar con otro desde
+``projection/snapshots/diff/`` o con ``--compare``.
+
+Uso:
+    python manage.py snapshot_projection [opciones]
+
+Opciones:
+    --months N       Meses a proyectar (default: 60)
+    --km N           Km promedio mensual (default: 12500)
+    --date AAAA-MM-DD  Fecha de inicio de la proyección (default: hoy)
+    --workers N      Procesos para proyectar (default: 1)
+    --keep-days N    Borra snapshots de hace más de N días (default: 0 = conservar todos)
+    --compare        Informa las celdas que cambiaron respecto del snapshot anterior
+"""
+import time
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from maintenance.models import FleetModule, ProjectionSnapshot
+from maintenance.services.projection_snapshots import (
+    diff_snapshots,
+    prune_snapshots,
+    take_snapshot,
+)
+
+
+class Command(BaseCommand):
+    help = 'Guarda un snapshot comprimido de la proyección para comparar en el tiempo'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--months',
+            type=int,
+            default=60,
+            help='Meses a proyectar (default: 60)',
+        )
+        parser.add_argument(
+            '--km',
+            type=int,
+            default=12_500,
+            help='Km promedio mensual (default: 12500)',
+        )
+        parser.add_argument(
+            '--date',
+            type=date.fromisoformat,
+            help='Fecha de inicio de la proyección, AAAA-MM-DD (default: hoy)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Procesos para proyectar en paralelo (default: 1 = serial)',
+        )
+        parser.add_argument(
+            '--keep-days',
+            type=int,
+            default=0,
+            help='Borra snapshots de hace más de N días (default: 0 = conservar todos)',
+        )
+        parser.add_argument(
+            '--compare',
+            action='store_true',
+            help='Informa las celdas que cambiaron respecto del snapshot anterior',
+        )
+
+    def handle(self, *args, **options):
+        """Proyecta la flota activa y guarda (o reemplaza) el snapshot del día."""
+
+        months = options['months']
+        monthly_km = options['km']
+        if months < 1 or months > 60:
+            raise CommandError('months debe estar entre 1 y 60')
+        if monthly_km < 1000 or monthly_km > 50_000:
+            raise CommandError('km debe estar entre 1000 y 50000')
+        if options['workers'] < 1:
+            raise CommandError('--workers debe ser mayor a 0')
+
+        modules = list(FleetModule.objects.exclude(id__in=[47, 67]).order_by('id'))
+
+        started = time.monotonic()
+        snapshot = take_snapshot(
+            modules,
+            months_ahead=months,
+            monthly_km=monthly_km,
+            taken_on=options['date'],
+            workers=options['workers'],
+        )
+        elapsed = time.monotonic() - started
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✓ Snapshot #{snapshot.pk} del {snapshot.taken_on}: {snapshot.module_count} módulos, "
+            f"{snapshot.row_count * months} celdas en {len(snapshot.data):,} bytes ({elapsed:.1f}s)"
+        ))
+
+        if options['compare']:
+            previous = (
+                ProjectionSnapshot.objects
+                .filter(months_ahead=months, monthly_km=monthly_km, taken_on__lt=snapshot.taken_on)
+                .first()
+            )
+            if previous is None:
+                self.stdout.write('Sin snapshot anterior para comparar')
+            else:
+                diff = diff_snapshots(previous, snapshot)
+                self.stdout.write(
+                    f"Respecto del {previous.taken_on}: {diff['changed_cells']} celdas cambiaron "
+                    f"en {len(diff['modules'])} módulos"
+                )
+
+        if options['keep_days'] > 0:
+            deleted = prune_snapshots(timedelta(days=options['keep_days']))
+            if deleted:
+                self.stdout.write(f"Borrados {deleted} snapshots viejos")
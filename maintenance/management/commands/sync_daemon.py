@@ -0,0 +1,205 @@
+"""
+Comando Django que ejecuta sync_from_access periódicamente.
+
+Reemplaza al programador de tareas de Windows: un solo proceso de larga
+duración que toma un lock de BD por ciclo (solo una instancia sincroniza),
+mantiene abiertas las conexiones a Access entre ciclos, aplica backoff
+exponencial ante errores y registra duración y filas por fase en
+``SyncRun`` / ``SyncPhaseMetric``.
+
+Uso:
+    python manage.py sync_daemon [opciones]
+
+Opciones:
+    --interval SEG      Segundos entre ciclos exitosos (default: 900)
+    --backoff-base SEG  Espera tras el primer error; se duplica por fallo (default: 60)
+    --backoff-max SEG   Espera máxima entre reintentos (default: 3600)
+    --max-cycles N      Termina tras N ciclos (default: 0 = sin límite)
+    --lock-name NOMBRE  Nombre del lock compartido (default: sync_from_access)
+    --since YYYY-MM-DD  Ventana fija (default: 30 días eventos, 7 lecturas)
+    --batch-size N      Filas leídas de Access por lote (default: 5000)
+    --workers N         Extracciones simultáneas (default: 3)
+    --backend NOMBRE    Backend de extracción: odbc (Access) o sqlite
+    --source ORIGEN     Connection string o archivo del backend (default: .env)
+"""
+import time
+from typing import Tuple
+
+from django.core.management.base import CommandError
+from django.utils import timezone
+
+from maintenance.models import SyncPhaseMetric, SyncRun
+from maintenance.services.access_extractor import AccessExtractor, BaseExtractor
+from maintenance.services.extractors import EXTRACTOR_BACKENDS, create_extractor
+from maintenance.services.sync_lock import advisory_lock
+
+from .sync_from_access import SYNC_LOCK_NAME, Command as SyncCommand
+
+
+class Command(SyncCommand):
+    help = 'Ejecuta sync_from_access en un intervalo, con lock de BD, backoff y métricas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=900,
+            help='Segundos entre ciclos exitosos (default: 900)',
+        )
+        parser.add_argument(
+            '--backoff-base',
+            type=float,
+            default=60,
+            help='Espera tras el primer error, se duplica por fallo (default: 60)',
+        )
+        parser.add_argument(
+            '--backoff-max',
+            type=float,
+            default=3600,
+            help='Espera máxima entre reintentos (default: 3600)',
+        )
+        parser.add_argument(
+            '--max-cycles',
+            type=int,
+            default=0,
+            help='Termina tras N ciclos (default: 0 = sin límite)',
+        )
+        parser.add_argument(
+            '--lock-name',
+            type=str,
+            default=SYNC_LOCK_NAME,
+            help=f'Nombre del lock compartido (default: {SYNC_LOCK_NAME})',
+        )
+        parser.add_argument(
+            '--since',
+            type=str,
+            help='Ventana fija desde fecha (YYYY-MM-DD); default: 30 días eventos, 7 lecturas',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=AccessExtractor.DEFAULT_BATCH_SIZE,
+            help='Filas leídas de Access por lote (default: 5000)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=3,
+            help='Extracciones simultáneas, una conexión cada una (default: 3)',
+        )
+        parser.add_argument(
+            '--backend',
+            choices=sorted(EXTRACTOR_BACKENDS),
+            help='Backend de extracción (default: ACCESS_EXTRACTOR_BACKEND)',
+        )
+        parser.add_argument(
+            '--source',
+            type=str,
+            help='Connection string o archivo del backend (default: .env)',
+        )
+
+    def handle(self, *args, **options):
+        """Ejecuta ciclos de sincronización hasta --max-cycles o Ctrl+C."""
+
+        try:
+            extractor = create_extractor(options.get('backend'), options.get('source'))
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        options['since_date'] = self._parse_date(options.get('since'))
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size debe ser mayor a 0')
+        if options['workers'] < 1:
+            raise CommandError('--workers debe ser mayor a 0')
+
+        # Conexiones de los streams concurrentes reutilizadas entre ciclos
+        extractor.keep_warm = True
+        max_cycles = options['max_cycles']
+        failures = 0
+        cycle = 0
+
+        try:
+            while True:
+                cycle += 1
+                self.stdout.write(f"--- Ciclo {cycle} ({timezone.localtime():%d/%m/%Y %H:%M:%S}) ---")
+                delay, failures = self._run_cycle(extractor, options, failures)
+
+                if max_cycles and cycle >= max_cycles:
+                    break
+
+                self.stdout.write(f"Próximo ciclo en {delay:.0f}s")
+                time.sleep(delay)
+
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Detenido por el usuario'))
+
+        finally:
+            extractor.disconnect()
+
+    def _run_cycle(
+        self,
+        extractor: BaseExtractor,
+        options: dict,
+        failures: int
+    ) -> Tuple[float, int]:
+        """
+        Ejecuta un ciclo bajo el lock y registra sus métricas.
+
+        Returns:
+            Tupla (segundos hasta el próximo ciclo, fallos consecutivos)
+        """
+        with advisory_lock(options['lock_name']) as acquired:
+            if not acquired:
+                self.stdout.write(
+                    self.style.WARNING('⚠ Otra instancia está sincronizando; se omite el ciclo')
+                )
+                return options['interval'], failures
+
+            run = SyncRun.objects.create()
+            try:
+                if not extractor.conn and not extractor.connect():
+                    raise CommandError('No se pudo conectar al origen de datos')
+                results = self.run_sync(
+                    extractor,
+                    since_date=options['since_date'],
+                    batch_size=options['batch_size'],
+                    workers=options['workers'],
+                )
+
+            except Exception as e:
+                failures += 1
+                # La conexión puede haber quedado inválida: se reabre en el próximo ciclo
+                extractor.disconnect()
+                delay = self._backoff_delay(
+                    failures, options['backoff_base'], options['backoff_max']
+                )
+                run.status = SyncRun.Status.ERROR
+                run.error = str(e)
+                self.stdout.write(
+                    self.style.ERROR(f"✗ Error en el ciclo (fallo #{failures}): {e}")
+                )
+
+            else:
+                failures = 0
+                delay = options['interval']
+                SyncPhaseMetric.objects.bulk_create([
+                    SyncPhaseMetric(
+                        run=run,
+                        phase=phase,
+                        duration_seconds=seconds,
+                        row_count=rows,
+                    )
+                    for phase, (rows, seconds) in results.items()
+                ])
+                run.status = SyncRun.Status.OK
+
+            run.finished_at = timezone.now()
+            run.consecutive_failures = failures
+            run.save(update_fields=['status', 'error', 'finished_at', 'consecutive_failures'])
+
+        return delay, failures
+
+    @staticmethod
+    def _backoff_delay(failures: int, base: float, maximum: float) -> float:
+        """Espera exponencial: base, 2·base, 4·base... acotada a ``maximum``."""
+        return min(base * 2 ** (failures - 1), maximum)
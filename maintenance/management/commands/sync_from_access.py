@@ -11,30 +11,54 @@ Opciones:
     --events-only       Solo sincroniza eventos de mantenimiento
     --readings-only     Solo sincroniza lecturas de odómetro
     --since YYYY-MM-DD  Solo sincroniza datos desde esta fecha
+    --batch-size N      Filas leídas de Access por lote (default: 5000)
+    --backend NOMBRE    Backend de extracción: odbc (Access) o sqlite
+    --source ORIGEN     Connection string o archivo del backend (default: .env)
+    --workers N         Extracciones simultáneas, una conexión cada una (default: 3)
+    --refresh-stats     Recalcula las estadísticas de Access aunque estén en caché
+    --lock-name NOMBRE  Lock compartido con sync_daemon (default: sync_from_access)
+
+Fuera del modo prueba toma el mismo lock de BD que ``sync_daemon``: si otra
+corrida (programada, manual o un ciclo del daemon) lo tiene, no sincroniza.
 """
+import time
+
 from django.core.management.base import BaseCommand, CommandError
 from django.db import transaction
-from django.conf import settings
+from django.utils import timezone
 from datetime import datetime, date, timedelta
-from typing import Optional
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 from maintenance.models import (
     FleetModule,
     MaintenanceEvent,
     OdometerLog,
-    MaintenanceProfile
+    MaintenanceProfile,
+    SourceRowHash
 )
 from maintenance.services.access_extractor import (
     AccessExtractor,
+    BaseExtractor,
     ModuleData,
     MaintenanceEventData,
     OdometerReadingData
 )
+from maintenance.services.concurrent_extraction import ConcurrentExtraction
+from maintenance.services.data_versions import bump_module_versions
+from maintenance.services.extractors import EXTRACTOR_BACKENDS, create_extractor
+from maintenance.services.source_stats import get_connection_stats
+from maintenance.services.sync_lock import advisory_lock
+
+# Lock de BD compartido por sync_from_access y sync_daemon
+SYNC_LOCK_NAME = 'sync_from_access'
 
 
 class Command(BaseCommand):
     help = 'Sincroniza datos desde Access (DB_CCEE_Mantenimiento)'
     
+    # Filas de ejemplo mostradas por entidad en modo prueba (TOP n)
+    PREVIEW_SAMPLE_SIZE = 10
+    
     def add_arguments(self, parser):
         parser.add_argument(
             '--test',
@@ -66,22 +90,57 @@ class Command(BaseCommand):
             type=str,
             help='Sincronizar solo desde fecha (YYYY-MM-DD)',
         )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=AccessExtractor.DEFAULT_BATCH_SIZE,
+            help='Filas leídas de Access por lote (default: 5000)',
+        )
+        parser.add_argument(
+            '--backend',
+            choices=sorted(EXTRACTOR_BACKENDS),
+            help='Backend de extracción (default: ACCESS_EXTRACTOR_BACKEND)',
+        )
+        parser.add_argument(
+            '--source',
+            type=str,
+            help='Connection string o archivo del backend (default: .env)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=3,
+            help='Extracciones simultáneas, una conexión cada una (default: 3)',
+        )
+        parser.add_argument(
+            '--refresh-stats',
+            action='store_true',
+            help='Recalcula las estadísticas de Access aunque estén en caché',
+        )
+        parser.add_argument(
+            '--lock-name',
+            type=str,
+            default=SYNC_LOCK_NAME,
+            help=f'Nombre del lock compartido con sync_daemon (default: {SYNC_LOCK_NAME})',
+        )
     
     def handle(self, *args, **options):
         """Ejecuta la sincronización."""
         
         # Validar configuración
-        connection_string = getattr(settings, 'ACCESS_CONNECTION_STRING', None)
-        if not connection_string:
-            raise CommandError(
-                'Falta ACCESS_CONNECTION_STRING en settings. '
-                'Ver INSTALACION.md para configuración.'
-            )
+        try:
+            extractor = create_extractor(options.get('backend'), options.get('source'))
+        except ValueError as e:
+            raise CommandError(str(e))
         
         # Modo de operación
         is_test = options['test']
         is_full = options['full']
-        since_date = self._parse_date(options.get('since'))
+        options['since_date'] = self._parse_date(options.get('since'))
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size debe ser mayor a 0')
+        if options['workers'] < 1:
+            raise CommandError('--workers debe ser mayor a 0')
         
         # Determinar qué sincronizar
         sync_modules = options['modules_only'] or is_full or (
@@ -96,49 +155,44 @@ class Command(BaseCommand):
         
         if is_test:
             self.stdout.write(self.style.WARNING('MODO PRUEBA - No se modificará la BD'))
-        
-        self.stdout.write('Conectando a Access...')
+            self._sync_once(extractor, options, sync_modules, sync_events, sync_readings)
+            return
+        
+        # Las corridas programadas o manuales no se superponen entre sí ni
+        # con un ciclo de sync_daemon
+        with advisory_lock(options['lock_name']) as acquired:
+            if not acquired:
+                self.stdout.write(self.style.WARNING(
+                    f"⚠ Otra sincronización tiene el lock '{options['lock_name']}'; "
+                    "no se sincroniza en esta corrida"
+                ))
+                return
+            self._sync_once(extractor, options, sync_modules, sync_events, sync_readings)
+    
+    def _sync_once(
+        self,
+        extractor: BaseExtractor,
+        options: dict,
+        sync_modules: bool,
+        sync_events: bool,
+        sync_readings: bool
+    ) -> None:
+        """Conecta, sincroniza e imprime el resumen (errores como CommandError)."""
+        is_test = options['test']
         
         try:
-            with AccessExtractor(connection_string) as extractor:
-                # Test de conexión
-                stats = extractor.test_connection()
-                if not stats.get('connected'):
-                    raise CommandError(f"Error de conexión: {stats.get('error')}")
-                
-                self.stdout.write(self.style.SUCCESS('✓ Conexión exitosa'))
-                self.stdout.write(
-                    f"  Módulos CSR en Access: {stats.get('modules_count', 0)}"
-                )
-                self.stdout.write(
-                    f"  Eventos en Access: {stats.get('events_count', 0)}"
+            with extractor:
+                results = self.run_sync(
+                    extractor,
+                    sync_modules=sync_modules,
+                    sync_events=sync_events,
+                    sync_readings=sync_readings,
+                    is_test=is_test,
+                    since_date=options['since_date'],
+                    batch_size=options['batch_size'],
+                    workers=options['workers'],
+                    refresh_stats=options['refresh_stats'],
                 )
-                self.stdout.write(
-                    f"  Lecturas en Access: {stats.get('readings_count', 0)}"
-                )
-                self.stdout.write('')
-                
-                # Sincronizar módulos
-                modules_synced = 0
-                if sync_modules:
-                    modules_synced = self._sync_modules(extractor, is_test)
-                    self.stdout.write('')
-                
-                # Sincronizar eventos
-                events_synced = 0
-                if sync_events:
-                    events_synced = self._sync_events(
-                        extractor, is_test, since_date
-                    )
-                    self.stdout.write('')
-                
-                # Sincronizar lecturas
-                readings_synced = 0
-                if sync_readings:
-                    readings_synced = self._sync_readings(
-                        extractor, is_test, since_date
-                    )
-                    self.stdout.write('')
                 
                 # Resumen final
                 self.stdout.write(self.style.SUCCESS('='*60))
@@ -146,25 +200,147 @@ class Command(BaseCommand):
                 self.stdout.write(self.style.SUCCESS('='*60))
                 
                 if sync_modules:
-                    self.stdout.write(f"Módulos sincronizados: {modules_synced}")
+                    self.stdout.write(f"Módulos sincronizados: {results['modules'][0]}")
                 if sync_events:
-                    self.stdout.write(f"Eventos sincronizados: {events_synced}")
+                    self.stdout.write(f"Eventos sincronizados: {results['events'][0]}")
                 if sync_readings:
-                    self.stdout.write(f"Lecturas sincronizadas: {readings_synced}")
+                    self.stdout.write(f"Lecturas sincronizadas: {results['readings'][0]}")
         
         except Exception as e:
             raise CommandError(f"Error durante sincronización: {e}")
     
+    def run_sync(
+        self,
+        extractor: BaseExtractor,
+        sync_modules: bool = True,
+        sync_events: bool = True,
+        sync_readings: bool = True,
+        is_test: bool = False,
+        since_date: Optional[date] = None,
+        batch_size: int = AccessExtractor.DEFAULT_BATCH_SIZE,
+        workers: int = 3,
+        refresh_stats: bool = False
+    ) -> Dict[str, Tuple[int, float]]:
+        """
+        Ejecuta una sincronización sobre un extractor ya creado.
+        
+        No abre ni cierra la conexión principal, de modo que un proceso de
+        larga duración (``sync_daemon``) puede reutilizarla entre ciclos.
+        
+        Returns:
+            Dict fase ('connect', 'modules', 'events', 'readings') →
+            (filas sincronizadas, segundos)
+        """
+        results: Dict[str, Tuple[int, float]] = {}
+        
+        self.stdout.write('Conectando a Access...')
+        started = time.perf_counter()
+        
+        # Consulta mínima real: la conexión del daemon pudo caerse entre ciclos
+        if not extractor.is_alive():
+            extractor.disconnect()
+            if not extractor.connect() or not extractor.is_alive():
+                raise CommandError('Error de conexión: el origen de datos no responde')
+        
+        # Los totales salen de la caché mientras el archivo de origen no
+        # cambie (en modo prueba nunca se recalculan)
+        stats = get_connection_stats(extractor, compute=not is_test, refresh=refresh_stats)
+        results['connect'] = (0, time.perf_counter() - started)
+        
+        self.stdout.write(self.style.SUCCESS('✓ Conexión exitosa'))
+        if 'readings_count' in stats:
+            self.stdout.write(
+                f"  Módulos CSR en Access: {stats.get('modules_count', 0)}"
+            )
+            self.stdout.write(
+                f"  Eventos en Access: {stats.get('events_count', 0)}"
+            )
+            self.stdout.write(
+                f"  Lecturas en Access: {stats.get('readings_count', 0)}"
+            )
+            if stats.get('cached'):
+                self.stdout.write(f"  (estadísticas en caché de {stats['computed_at'][:19]})")
+        if stats.get('schema_changed'):
+            self.stdout.write(
+                self.style.WARNING('  ⚠ El esquema de las tablas de Access cambió')
+            )
+        self.stdout.write('')
+        
+        # Ventanas de extracción (por defecto: 30 días eventos, 7 lecturas)
+        events_since, events_window = self._resolve_window(since_date, is_test, 30)
+        readings_since, readings_window = self._resolve_window(since_date, is_test, 7)
+        
+        # Modo prueba: conteos y muestras TOP n, sin extraer las ventanas
+        if is_test:
+            if sync_modules:
+                started = time.perf_counter()
+                synced = self._sync_modules(extractor.get_active_modules(), is_test)
+                results['modules'] = (synced, time.perf_counter() - started)
+                self.stdout.write('')
+            if sync_events:
+                started = time.perf_counter()
+                synced = self._preview_events(extractor, events_since, events_window)
+                results['events'] = (synced, time.perf_counter() - started)
+                self.stdout.write('')
+            if sync_readings:
+                started = time.perf_counter()
+                synced = self._preview_readings(extractor, readings_since, readings_window)
+                results['readings'] = (synced, time.perf_counter() - started)
+                self.stdout.write('')
+            return results
+        
+        # Las tres consultas corren en paralelo (una conexión cada una);
+        # la carga en Django se hace en orden: módulos → eventos → lecturas.
+        # La duración de cada fase incluye la espera de su extracción.
+        with ConcurrentExtraction(extractor, max_workers=workers) as extraction:
+            extraction.start(
+                modules=sync_modules,
+                events=(
+                    {'since_date': events_since, 'batch_size': batch_size}
+                    if sync_events else None
+                ),
+                readings=(
+                    {'since_date': readings_since, 'batch_size': batch_size}
+                    if sync_readings else None
+                ),
+            )
+            
+            # Sincronizar módulos
+            if sync_modules:
+                started = time.perf_counter()
+                synced = self._sync_modules(extraction.modules(), is_test)
+                results['modules'] = (synced, time.perf_counter() - started)
+                self.stdout.write('')
+            
+            # Sincronizar eventos
+            if sync_events:
+                started = time.perf_counter()
+                synced = self._sync_events(
+                    extraction.event_batches(), events_since, events_window
+                )
+                results['events'] = (synced, time.perf_counter() - started)
+                self.stdout.write('')
+            
+            # Sincronizar lecturas
+            if sync_readings:
+                started = time.perf_counter()
+                synced = self._sync_readings(
+                    extraction.reading_batches(), readings_since, readings_window
+                )
+                results['readings'] = (synced, time.perf_counter() - started)
+                self.stdout.write('')
+        
+        return results
+    
     def _sync_modules(
         self,
-        extractor: AccessExtractor,
+        modules_data: List[ModuleData],
         is_test: bool
     ) -> int:
         """Sincroniza módulos desde Access."""
         
         self.stdout.write('Sincronizando módulos...')
         
-        modules_data = extractor.get_active_modules()
         synced_count = 0
         
         if is_test:
@@ -201,94 +377,66 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS(f"✓ {synced_count} módulos sincronizados"))
         return synced_count
     
+    def _preview_events(
+        self,
+        extractor: BaseExtractor,
+        since_date: Optional[date],
+        window_days: Optional[int]
+    ) -> int:
+        """Informa cuántos eventos se sincronizarían (COUNT + muestra TOP n)."""
+        
+        self.stdout.write('Sincronizando eventos de mantenimiento...')
+        self._write_window(since_date, window_days)
+        
+        total = extractor.count_maintenance_events(since_date=since_date)
+        sample = extractor.get_maintenance_events(
+            since_date=since_date, limit=self.PREVIEW_SAMPLE_SIZE
+        )
+        self.stdout.write(f"  Se sincronizarían {total} eventos:")
+        for evt in sample:
+            self.stdout.write(
+                f"    {evt.module_id} - {evt.maintenance_type} "
+                f"({evt.event_date.strftime('%d/%m/%Y')}) "
+                f"@ {evt.odometer_km:,} km"
+            )
+        if total > len(sample):
+            self.stdout.write(f"    ... y {total - len(sample)} más")
+        return total
+    
     def _sync_events(
         self,
-        extractor: AccessExtractor,
-        is_test: bool,
-        since_date: Optional[date]
+        batches: Iterable[List[MaintenanceEventData]],
+        since_date: Optional[date],
+        window_days: Optional[int]
     ) -> int:
         """Sincroniza eventos de mantenimiento desde Access."""
         
         self.stdout.write('Sincronizando eventos de mantenimiento...')
+        self._write_window(since_date, window_days)
         
-        # Determinar desde qué fecha sincronizar
-        if since_date:
-            self.stdout.write(f"  Desde: {since_date.strftime('%d/%m/%Y')}")
-        elif not is_test:
-            # Si no es full sync, solo últimos 30 días
-            since_date = date.today() - timedelta(days=30)
-            self.stdout.write(f"  Últimos 30 días (desde {since_date.strftime('%d/%m/%Y')})")
-        
-        events_data = extractor.get_maintenance_events(since_date=since_date)
         synced_count = 0
         
-        if is_test:
-            self.stdout.write(f"  Se sincronizarían {len(events_data)} eventos:")
-            for evt in events_data[:10]:
-                self.stdout.write(
-                    f"    {evt.module_id} - {evt.maintenance_type} "
-                    f"({evt.event_date.strftime('%d/%m/%Y')}) "
-                    f"@ {evt.odometer_km:,} km"
-                )
-            if len(events_data) > 10:
-                self.stdout.write(f"    ... y {len(events_data) - 10} más")
-            return len(events_data)
-        
-        # Sincronización real
+        # Sincronización real (lote a lote, memoria constante).
+        # Módulos y perfiles se precargan una sola vez.
+        module_ids = set(FleetModule.objects.values_list('id', flat=True))
+        profiles = {p.code: p for p in MaintenanceProfile.objects.all()}
         skipped_count = 0
+        unchanged_count = 0
         
         with transaction.atomic():
-            for evt_data in events_data:
-                # Buscar módulo
-                module_num = AccessExtractor.extract_module_number(evt_data.module_id)
-                if not module_num:
-                    skipped_count += 1
-                    continue
-                
-                try:
-                    module = FleetModule.objects.get(id=module_num)  # ✅ Corregido: id en vez de module_number
-                except FleetModule.DoesNotExist:
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f"  ⚠ Módulo {evt_data.module_id} no existe en BD"
-                        )
-                    )
-                    skipped_count += 1
-                    continue
-                
-                # Buscar perfil de mantenimiento
-                try:
-                    profile = MaintenanceProfile.objects.get(
-                        code=evt_data.maintenance_type  # ✅ Corregido: code en vez de cycle_type
-                    )
-                except MaintenanceProfile.DoesNotExist:
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f"  ⚠ Perfil {evt_data.maintenance_type} no existe"
-                        )
-                    )
-                    skipped_count += 1
-                    continue
-                
-                # Crear o actualizar evento
-                event, created = MaintenanceEvent.objects.get_or_create(
-                    fleet_module=module,  # ✅ Corregido: fleet_module en vez de module
-                    profile=profile,
-                    event_date=evt_data.event_date,
-                    defaults={
-                        'odometer_km': evt_data.odometer_km,
-                    }
+            for events_batch in batches:
+                synced, skipped, unchanged = self._apply_events_batch(
+                    events_batch, module_ids, profiles
                 )
-                
-                if not created and event.odometer_km != evt_data.odometer_km:
-                    event.odometer_km = evt_data.odometer_km
-                    event.save()
-                
-                synced_count += 1
+                synced_count += synced
+                skipped_count += skipped
+                unchanged_count += unchanged
         
         self.stdout.write(
             self.style.SUCCESS(f"✓ {synced_count} eventos sincronizados")
         )
+        if unchanged_count > 0:
+            self.stdout.write(f"  {unchanged_count} eventos sin cambios")
         if skipped_count > 0:
             self.stdout.write(
                 self.style.WARNING(f"  ⚠ {skipped_count} eventos omitidos")
@@ -296,75 +444,69 @@ class Command(BaseCommand):
         
         return synced_count
     
+    def _preview_readings(
+        self,
+        extractor: BaseExtractor,
+        since_date: Optional[date],
+        window_days: Optional[int]
+    ) -> int:
+        """Informa cuántas lecturas se sincronizarían (COUNT + muestra TOP n)."""
+        
+        self.stdout.write('Sincronizando lecturas de odómetro...')
+        self._write_window(since_date, window_days)
+        
+        total = extractor.count_odometer_readings(since_date=since_date)
+        sample = extractor.get_odometer_readings(
+            since_date=since_date, limit=self.PREVIEW_SAMPLE_SIZE
+        )
+        self.stdout.write(f"  Se sincronizarían {total} lecturas:")
+        for reading in sample:
+            self.stdout.write(
+                f"    {reading.module_id} - {reading.odometer_reading:,} km "
+                f"({reading.reading_date.strftime('%d/%m/%Y')})"
+            )
+        if total > len(sample):
+            self.stdout.write(f"    ... y {total - len(sample)} más")
+        return total
+    
     def _sync_readings(
         self,
-        extractor: AccessExtractor,
-        is_test: bool,
-        since_date: Optional[date]
+        batches: Iterable[List[OdometerReadingData]],
+        since_date: Optional[date],
+        window_days: Optional[int]
     ) -> int:
         """Sincroniza lecturas de odómetro desde Access."""
         
         self.stdout.write('Sincronizando lecturas de odómetro...')
+        self._write_window(since_date, window_days)
         
-        # Determinar desde qué fecha sincronizar
-        if since_date:
-            self.stdout.write(f"  Desde: {since_date.strftime('%d/%m/%Y')}")
-        elif not is_test:
-            # Si no es full sync, solo últimos 7 días
-            since_date = date.today() - timedelta(days=7)
-            self.stdout.write(f"  Últimos 7 días (desde {since_date.strftime('%d/%m/%Y')})")
-        
-        readings_data = extractor.get_odometer_readings(since_date=since_date)
         synced_count = 0
         
-        if is_test:
-            self.stdout.write(f"  Se sincronizarían {len(readings_data)} lecturas:")
-            for reading in readings_data[:10]:
-                self.stdout.write(
-                    f"    {reading.module_id} - {reading.odometer_reading:,} km "
-                    f"({reading.reading_date.strftime('%d/%m/%Y')})"
-                )
-            if len(readings_data) > 10:
-                self.stdout.write(f"    ... y {len(readings_data) - 10} más")
-            return len(readings_data)
-        
-        # Sincronización real
+        # Sincronización real (lote a lote, memoria constante).
+        # bulk_create omite OdometerLog.save(): los deltas y el acumulado se
+        # recalculan al final, una vez por módulo afectado.
+        module_ids = set(FleetModule.objects.values_list('id', flat=True))
+        touched_since: Dict[int, date] = {}
         skipped_count = 0
+        unchanged_count = 0
         
         with transaction.atomic():
-            for reading_data in readings_data:
-                # Buscar módulo
-                module_num = AccessExtractor.extract_module_number(reading_data.module_id)
-                if not module_num:
-                    skipped_count += 1
-                    continue
-                
-                try:
-                    module = FleetModule.objects.get(id=module_num)  # ✅ Corregido: id en vez de module_number
-                except FleetModule.DoesNotExist:
-                    self.stdout.write(
-                        self.style.WARNING(
-                            f"  ⚠ Módulo {reading_data.module_id} no existe en BD"
-                        )
-                    )
-                    skipped_count += 1
-                    continue
-                
-                # Crear lectura (solo si no existe ya)
-                _, created = OdometerLog.objects.get_or_create(
-                    fleet_module=module,  # ✅ Corregido: fleet_module en vez de module
-                    reading_date=reading_data.reading_date,
-                    defaults={
-                        'odometer_reading': reading_data.odometer_reading,
-                    }
+            for readings_batch in batches:
+                written, skipped, unchanged = self._apply_readings_batch(
+                    readings_batch, module_ids, touched_since
                 )
-                
-                if created:
-                    synced_count += 1
+                synced_count += written
+                skipped_count += skipped
+                unchanged_count += unchanged
+            
+            for module in FleetModule.objects.filter(id__in=touched_since):
+                module.recompute_odometer_deltas(since=touched_since[module.id])
         
         self.stdout.write(
             self.style.SUCCESS(f"✓ {synced_count} lecturas sincronizadas")
         )
+        if unchanged_count > 0:
+            self.stdout.write(f"  {unchanged_count} lecturas sin cambios")
         if skipped_count > 0:
             self.stdout.write(
                 self.style.WARNING(f"  ⚠ {skipped_count} lecturas omitidas")
@@ -372,6 +514,437 @@ class Command(BaseCommand):
         
         return synced_count
     
+    def _apply_events_batch(
+        self,
+        events_batch: List[MaintenanceEventData],
+        module_ids: Set[int],
+        profiles: Dict[str, MaintenanceProfile],
+        force: bool = False
+    ) -> Tuple[int, int, int]:
+        """
+        Aplica un lote de eventos con bulk_create / bulk_update.
+        
+        Las filas cuyo hash de contenido coincide con el de la última
+        sincronización se descartan sin tocar la BD. Las claves (módulo,
+        perfil, fecha) del resto se comparan contra la BD en una sola
+        consulta; ante claves repetidas prevalece la última fila. Una
+        corrección que cambió la clave mueve (o borra) el evento que había
+        generado (ver ``_relocate_targets``).
+        Con ``force`` no se descarta ninguna fila por hash (reconciliación).
+        
+        Returns:
+            Tupla (eventos sincronizados, omitidos, sin cambios)
+        """
+        table = SourceRowHash.SourceTable.OT_SIMAF
+        pending, stored_hashes = self._filter_unchanged(table, events_batch, force)
+        unchanged_count = len(events_batch) - len(pending)
+        
+        incoming: Dict[Tuple[int, int, date], int] = {}
+        row_keys: Dict[int, Tuple[int, int, date]] = {}
+        applied: List[MaintenanceEventData] = []
+        skipped_count = 0
+        
+        for evt_data in pending:
+            module_num = AccessExtractor.extract_module_number(evt_data.module_id)
+            if not module_num:
+                skipped_count += 1
+                continue
+            
+            if module_num not in module_ids:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"  ⚠ Módulo {evt_data.module_id} no existe en BD"
+                    )
+                )
+                skipped_count += 1
+                continue
+            
+            profile = profiles.get(evt_data.maintenance_type)
+            if profile is None:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"  ⚠ Perfil {evt_data.maintenance_type} no existe"
+                    )
+                )
+                skipped_count += 1
+                continue
+            
+            key = (module_num, profile.id, evt_data.event_date)
+            incoming[key] = evt_data.odometer_km
+            if evt_data.source_id is not None:
+                row_keys[evt_data.source_id] = key
+            applied.append(evt_data)
+        
+        if not incoming:
+            return 0, skipped_count, unchanged_count
+        
+        dates = [key[2] for key in incoming]
+        existing = {
+            (event.fleet_module_id, event.profile_id, event.event_date): event
+            for event in MaintenanceEvent.objects.filter(
+                fleet_module_id__in={key[0] for key in incoming},
+                event_date__range=(min(dates), max(dates)),
+            ).only('id', 'fleet_module_id', 'profile_id', 'event_date', 'odometer_km')
+        }
+        
+        key_fields = ('fleet_module_id', 'profile_id', 'event_date')
+        moved, deleted = self._relocate_targets(
+            MaintenanceEvent, table, stored_hashes, row_keys, existing, key_fields
+        )
+        moved_ids = {event.id for event, _ in moved}
+        
+        to_create = []
+        to_update = []
+        for key, odometer_km in incoming.items():
+            event = existing.get(key)
+            if event is None:
+                event = MaintenanceEvent(
+                    fleet_module_id=key[0],
+                    profile_id=key[1],
+                    event_date=key[2],
+                    odometer_km=odometer_km,
+                )
+                existing[key] = event
+                to_create.append(event)
+            elif event.id in moved_ids:
+                event.odometer_km = odometer_km
+            elif event.odometer_km != odometer_km:
+                event.odometer_km = odometer_km
+                to_update.append(event)
+        
+        MaintenanceEvent.objects.bulk_update(
+            [event for event, _ in moved], [*key_fields, 'odometer_km'], batch_size=1000
+        )
+        MaintenanceEvent.objects.bulk_create(to_create, batch_size=1000)
+        MaintenanceEvent.objects.bulk_update(to_update, ['odometer_km'], batch_size=1000)
+        targets = self._target_ids(MaintenanceEvent, key_fields, existing, row_keys)
+        self._store_hashes(table, applied, stored_hashes, targets)
+        # bulk_* no emite señales: invalida los fragmentos de los módulos escritos
+        bump_module_versions(
+            {event.fleet_module_id for event in to_create + to_update}
+            | {key[0] for _, key in moved + deleted}
+            | {event.fleet_module_id for event, _ in moved}
+        )
+        
+        return len(applied), skipped_count, unchanged_count
+    
+    def _apply_readings_batch(
+        self,
+        readings_batch: List[OdometerReadingData],
+        module_ids: Set[int],
+        touched_since: Dict[int, date],
+        force: bool = False
+    ) -> Tuple[int, int, int]:
+        """
+        Aplica un lote de lecturas con bulk_create / bulk_update.
+        
+        Las filas con hash sin cambios se descartan. Las lecturas nuevas se
+        insertan si no existen; las ya sincronizadas cuyo hash cambió
+        (correcciones en Access) actualizan ``odometer_reading``, y si la
+        corrección cambió la fecha o el módulo la lectura anterior se mueve
+        o se borra (ver ``_relocate_targets``).
+        ``touched_since`` acumula la fecha mínima escrita por módulo para
+        recalcular deltas al final. Con ``force`` no se descarta ninguna
+        fila por hash: las ya conocidas se tratan como correcciones y se
+        recrean si faltan en la BD (reconciliación).
+        
+        Returns:
+            Tupla (lecturas escritas, omitidas, sin cambios)
+        """
+        table = SourceRowHash.SourceTable.KILOMETRAJES
+        pending, stored_hashes = self._filter_unchanged(table, readings_batch, force)
+        unchanged_count = len(readings_batch) - len(pending)
+        
+        incoming: Dict[Tuple[int, date], int] = {}
+        corrections: Dict[Tuple[int, date], int] = {}
+        row_keys: Dict[int, Tuple[int, date]] = {}
+        applied: List[OdometerReadingData] = []
+        skipped_count = 0
+        
+        for reading_data in pending:
+            module_num = AccessExtractor.extract_module_number(reading_data.module_id)
+            if not module_num:
+                skipped_count += 1
+                continue
+            
+            if module_num not in module_ids:
+                self.stdout.write(
+                    self.style.WARNING(
+                        f"  ⚠ Módulo {reading_data.module_id} no existe en BD"
+                    )
+                )
+                skipped_count += 1
+                continue
+            
+            key = (module_num, reading_data.reading_date)
+            if reading_data.source_id in stored_hashes:
+                corrections[key] = reading_data.odometer_reading
+            else:
+                # Ante lecturas repetidas prevalece la primera (como get_or_create)
+                incoming.setdefault(key, reading_data.odometer_reading)
+            if reading_data.source_id is not None:
+                row_keys[reading_data.source_id] = key
+            applied.append(reading_data)
+        
+        for key in corrections:
+            incoming.pop(key, None)
+        
+        if not incoming and not corrections:
+            return 0, skipped_count, unchanged_count
+        
+        keys = incoming.keys() | corrections.keys()
+        dates = [key[1] for key in keys]
+        existing = {
+            (log.fleet_module_id, log.reading_date): log
+            for log in OdometerLog.objects.filter(
+                fleet_module_id__in={key[0] for key in keys},
+                reading_date__range=(min(dates), max(dates)),
+            ).only('id', 'fleet_module_id', 'reading_date', 'odometer_reading')
+        }
+        
+        key_fields = ('fleet_module_id', 'reading_date')
+        moved, deleted = self._relocate_targets(
+            OdometerLog, table, stored_hashes, row_keys, existing, key_fields
+        )
+        moved_ids = {log.id for log, _ in moved}
+        for log, _ in moved:
+            log.odometer_reading = corrections[(log.fleet_module_id, log.reading_date)]
+        
+        to_create = []
+        for key, odometer_reading in {**incoming, **corrections}.items():
+            if key not in existing:
+                existing[key] = OdometerLog(
+                    fleet_module_id=key[0],
+                    reading_date=key[1],
+                    odometer_reading=odometer_reading,
+                )
+                to_create.append(existing[key])
+        to_update = []
+        for key, odometer_reading in corrections.items():
+            log = existing[key]
+            if log.pk is None or log.id in moved_ids or log.odometer_reading == odometer_reading:
+                continue
+            log.odometer_reading = odometer_reading
+            to_update.append(log)
+        
+        OdometerLog.objects.bulk_update(
+            [log for log, _ in moved], [*key_fields, 'odometer_reading'], batch_size=1000
+        )
+        OdometerLog.objects.bulk_create(to_create, batch_size=1000)
+        OdometerLog.objects.bulk_update(to_update, ['odometer_reading'], batch_size=1000)
+        targets = self._target_ids(OdometerLog, key_fields, existing, row_keys)
+        self._store_hashes(table, applied, stored_hashes, targets)
+        
+        written_keys = [
+            (log.fleet_module_id, log.reading_date)
+            for log in to_create + to_update + [log for log, _ in moved]
+        ]
+        # Las lecturas movidas o borradas cambian también los deltas de su clave anterior
+        for module_num, reading_date in written_keys + [key for _, key in moved + deleted]:
+            current = touched_since.get(module_num)
+            if current is None or reading_date < current:
+                touched_since[module_num] = reading_date
+        
+        return len(written_keys), skipped_count, unchanged_count
+    
+    @staticmethod
+    def _relocate_targets(
+        model,
+        table: str,
+        stored: Dict[int, SourceRowHash],
+        row_keys: Dict[int, tuple],
+        existing: Dict[tuple, object],
+        key_fields: Tuple[str, ...]
+    ) -> Tuple[List[Tuple[object, tuple]], List[Tuple[object, tuple]]]:
+        """
+        Mueve o borra las filas de Django de correcciones que cambiaron de clave.
+        
+        Si Access corrigió la fecha o el módulo de una fila ya sincronizada,
+        la clave natural nueva no coincide con la de la fila que generó
+        (``SourceRowHash.target_id``). Esa fila pasa a la clave nueva, o se
+        borra si la clave nueva ya tiene otra fila. Si otra fila de Access
+        también la generó (claves repetidas) se conserva.
+        
+        ``existing`` (clave → fila) queda actualizado: sin las claves
+        anteriores y con las filas movidas en su clave nueva. Las filas
+        movidas se guardan después con ``bulk_update`` de ``key_fields``.
+        
+        Returns:
+            Tupla (filas movidas, filas borradas), cada una con su clave anterior
+        """
+        targets = {
+            source_id: stored[source_id].target_id
+            for source_id in row_keys
+            if source_id in stored and stored[source_id].target_id is not None
+        }
+        if not targets:
+            return [], []
+        
+        def key_of(row) -> tuple:
+            return tuple(getattr(row, name) for name in key_fields)
+        
+        rows = model.objects.in_bulk(set(targets.values()))
+        relocated = {
+            source_id: target_id for source_id, target_id in targets.items()
+            if target_id in rows and key_of(rows[target_id]) != row_keys[source_id]
+        }
+        if not relocated:
+            return [], []
+        shared = set(
+            SourceRowHash.objects.filter(
+                source_table=table, target_id__in=set(relocated.values())
+            ).exclude(source_id__in=relocated).values_list('target_id', flat=True)
+        )
+        
+        moved = []
+        deleted = []
+        for source_id, target_id in relocated.items():
+            row = rows.pop(target_id, None)
+            if row is None or target_id in shared:
+                continue
+            old_key = key_of(row)
+            if getattr(existing.get(old_key), 'id', None) == row.id:
+                del existing[old_key]
+            new_key = row_keys[source_id]
+            if new_key in existing:
+                deleted.append((row, old_key))
+            else:
+                for name, value in zip(key_fields, new_key):
+                    setattr(row, name, value)
+                existing[new_key] = row
+                moved.append((row, old_key))
+        
+        if deleted:
+            model.objects.filter(id__in=[row.id for row, _ in deleted]).delete()
+        return moved, deleted
+    
+    @staticmethod
+    def _target_ids(
+        model,
+        key_fields: Tuple[str, ...],
+        rows: Dict[tuple, object],
+        row_keys: Dict[int, tuple]
+    ) -> Dict[int, int]:
+        """
+        Id de la fila de Django de cada source_id, para ``SourceRowHash.target_id``.
+        
+        Las filas de ``bulk_create`` traen su id si la base lo devuelve
+        (PostgreSQL, SQLite >= 3.35); si no, se buscan por clave.
+        """
+        missing = [key for key, row in rows.items() if row.pk is None]
+        if missing:
+            module_field, date_field = key_fields[0], key_fields[-1]
+            found = model.objects.filter(**{
+                f'{module_field}__in': {key[0] for key in missing},
+                f'{date_field}__range': (min(key[-1] for key in missing), max(key[-1] for key in missing)),
+            }).only('id', *key_fields)
+            ids = {tuple(getattr(row, name) for name in key_fields): row.id for row in found}
+        else:
+            ids = {}
+        return {
+            source_id: rows[key].pk or ids.get(key)
+            for source_id, key in row_keys.items()
+            if key in rows
+        }
+    
+    @staticmethod
+    def _filter_unchanged(
+        table: str,
+        rows: list,
+        force: bool = False
+    ) -> Tuple[list, Dict[int, SourceRowHash]]:
+        """
+        Descarta las filas cuyo hash coincide con el almacenado.
+        
+        Compara el lote completo contra ``SourceRowHash`` en una consulta.
+        Con ``force`` conserva todas las filas (solo carga los hashes).
+        
+        Returns:
+            Tupla (filas nuevas o corregidas, hashes almacenados por source_id)
+        """
+        source_ids = [row.source_id for row in rows if row.source_id is not None]
+        stored = {
+            row_hash.source_id: row_hash
+            for row_hash in SourceRowHash.objects.filter(
+                source_table=table, source_id__in=source_ids
+            )
+        }
+        if force:
+            return list(rows), stored
+        pending = [
+            row for row in rows
+            if row.source_id not in stored
+            or stored[row.source_id].row_hash != row.content_hash
+        ]
+        return pending, stored
+    
+    @staticmethod
+    def _store_hashes(
+        table: str,
+        rows: list,
+        stored: Dict[int, SourceRowHash],
+        targets: Optional[Dict[int, int]] = None
+    ) -> None:
+        """
+        Registra (alta o modificación) el hash de las filas aplicadas.
+        
+        Args:
+            targets: source_id → id de la fila de Django que generó
+        """
+        targets = targets or {}
+        now = timezone.now()
+        to_create: Dict[int, SourceRowHash] = {}
+        to_update = []
+        for row in rows:
+            if row.source_id is None:
+                continue
+            if row.source_id in stored:
+                row_hash = stored[row.source_id]
+                row_hash.row_hash = row.content_hash
+                row_hash.target_id = targets.get(row.source_id, row_hash.target_id)
+                row_hash.synced_at = now
+                to_update.append(row_hash)
+            else:
+                to_create[row.source_id] = SourceRowHash(
+                    source_table=table,
+                    source_id=row.source_id,
+                    row_hash=row.content_hash,
+                    target_id=targets.get(row.source_id),
+                    synced_at=now,
+                )
+        SourceRowHash.objects.bulk_create(to_create.values(), batch_size=1000)
+        SourceRowHash.objects.bulk_update(
+            to_update, ['row_hash', 'target_id', 'synced_at'], batch_size=1000
+        )
+    
+    @staticmethod
+    def _resolve_window(
+        since_date: Optional[date],
+        is_test: bool,
+        default_days: int
+    ) -> Tuple[Optional[date], Optional[int]]:
+        """
+        Determina desde qué fecha extraer.
+        
+        Si no se indicó --since y no es modo prueba, se usa una ventana de
+        ``default_days`` días hacia atrás.
+        
+        Returns:
+            Tupla (fecha desde, días de la ventana por defecto o None)
+        """
+        if since_date or is_test:
+            return since_date, None
+        return date.today() - timedelta(days=default_days), default_days
+    
+    def _write_window(self, since_date: Optional[date], window_days: Optional[int]) -> None:
+        """Informa la ventana de sincronización."""
+        if window_days:
+            self.stdout.write(
+                f"  Últimos {window_days} días (desde {since_date.strftime('%d/%m/%Y')})"
+            )
+        elif since_date:
+            self.stdout.write(f"  Desde: {since_date.strftime('%d/%m/%Y')}")
+    
     @staticmethod
     def _determine_module_type(module_number: int) -> str:
         """
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 00:53
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SourceRowHash',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_table', models.CharField(choices=[('A_00_OT_Simaf', 'A_00_OT_Simaf'), ('A_00_Kilometrajes', 'A_00_Kilometrajes')], max_length=32)),
+                ('source_id', models.BigIntegerField(help_text='Clave primaria de la fila en Access.')),
+                ('row_hash', models.CharField(max_length=16)),
+                ('synced_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'unique_together': {('source_table', 'source_id')},
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:00
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0002_source_row_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncLock',
+            fields=[
+                ('name', models.CharField(max_length=64, primary_key=True, serialize=False)),
+                ('owner', models.CharField(max_length=100)),
+                ('expires_at', models.DateTimeField()),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SyncRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('started_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('RUNNING', 'En curso'), ('OK', 'Completado'), ('ERROR', 'Error')], default='RUNNING', max_length=10)),
+                ('consecutive_failures', models.PositiveIntegerField(default=0, help_text='Fallos seguidos al cerrar el ciclo (determina el backoff).')),
+                ('error', models.TextField(blank=True)),
+            ],
+            options={
+                'ordering': ['-started_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SyncPhaseMetric',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('phase', models.CharField(choices=[('connect', 'Conexión'), ('modules', 'Módulos'), ('events', 'Eventos'), ('readings', 'Lecturas')], max_length=10)),
+                ('duration_seconds', models.FloatField()),
+                ('row_count', models.PositiveIntegerField(default=0)),
+                ('run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='phases', to='maintenance.syncrun')),
+            ],
+            options={
+                'ordering': ['run', 'id'],
+                'unique_together': {('run', 'phase')},
+            },
+        ),
+    ]
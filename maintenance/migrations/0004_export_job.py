@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:28
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0003_sync_daemon_metrics'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('projection_xlsx', 'Proyección (Excel)')], default='projection_xlsx', max_length=20)),
+                ('params', models.JSONField(default=dict, help_text='Parámetros de la exportación (meses, km/mes, fecha de inicio, módulos).')),
+                ('status', models.CharField(choices=[('PENDING', 'En cola'), ('RUNNING', 'En curso'), ('OK', 'Completado'), ('ERROR', 'Error')], db_index=True, default='PENDING', max_length=10)),
+                ('progress', models.PositiveIntegerField(default=0, help_text='Módulos ya escritos.')),
+                ('total', models.PositiveIntegerField(default=0, help_text='Módulos a escribir.')),
+                ('artifact', models.CharField(blank=True, help_text='Archivo en EXPORT_CACHE_DIR.', max_length=100)),
+                ('worker', models.CharField(blank=True, max_length=100)),
+                ('error', models.TextField(blank=True)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('heartbeat_at', models.DateTimeField(blank=True, help_text='Último avance informado; un job RUNNING sin avance se reencola.', null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'ordering': ['created_at', 'id'],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:40
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0004_export_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectionSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('taken_on', models.DateField(db_index=True, help_text='Fecha de inicio de la proyección.')),
+                ('months_ahead', models.PositiveSmallIntegerField()),
+                ('monthly_km', models.PositiveIntegerField()),
+                ('first_month', models.DateField(help_text='Primer mes proyectado (día 1).')),
+                ('module_count', models.PositiveIntegerField(default=0)),
+                ('row_count', models.PositiveIntegerField(default=0, help_text='Filas módulo × tipo.')),
+                ('data', models.BinaryField(help_text='Arreglos columnares comprimidos con zlib.')),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'ordering': ['-taken_on', '-id'],
+                'constraints': [models.UniqueConstraint(fields=('taken_on', 'months_ahead', 'monthly_km'), name='unique_projection_snapshot')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 01:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('maintenance', '0005_projection_snapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='sourcerowhash',
+            name='target_id',
+            field=models.BigIntegerField(blank=True, help_text='Id del MaintenanceEvent u OdometerLog generado por la fila.', null=True),
+        ),
+    ]
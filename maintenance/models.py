@@ -85,6 +85,51 @@ class FleetModule(models.Model):
             self.total_accumulated_km = latest_log.odometer_reading
             self.save(update_fields=["total_accumulated_km"])
 
+    def recompute_odometer_deltas(self, since: date | None = None) -> int:
+        """
+        Recalcula ``daily_delta_km`` de las lecturas y el kilometraje acumulado.
+
+        Pensado para cargas masivas (``bulk_create``) que no pasan por
+        ``OdometerLog.save()``. Usa la misma regla que ``compute_daily_delta``
+        (lectura anterior por fecha) resuelta en un único UPDATE con subconsulta,
+        que solo escribe las lecturas cuyo delta cambia. Si se indica
+        ``since``, solo se recalculan las lecturas desde esa fecha.
+
+        Returns:
+            Cantidad de lecturas cuyo delta fue modificado.
+        """
+
+        previous_reading = (
+            OdometerLog.objects.filter(
+                fleet_module=models.OuterRef("fleet_module"),
+                reading_date__lt=models.OuterRef("reading_date"),
+            )
+            .order_by("-reading_date", "-id")
+            .values("odometer_reading")[:1]
+        )
+        new_delta = models.F("odometer_reading") - models.Subquery(previous_reading)
+        logs = OdometerLog.objects.filter(fleet_module=self)
+        if since is not None:
+            logs = logs.filter(reading_date__gte=since)
+
+        # Delta distinto del calculado, incluidos los pasajes de/a NULL
+        stale = logs.annotate(new_delta=new_delta).filter(
+            models.Q(daily_delta_km__isnull=True, new_delta__isnull=False)
+            | models.Q(daily_delta_km__isnull=False, new_delta__isnull=True)
+            | models.Q(daily_delta_km__lt=models.F("new_delta"))
+            | models.Q(daily_delta_km__gt=models.F("new_delta"))
+        )
+        updated = OdometerLog.objects.filter(pk__in=stale.values("pk")).update(
+            daily_delta_km=new_delta
+        )
+        self.update_accumulated_km()
+
+        # update() no emite señales: invalida los fragmentos del módulo
+        from maintenance.services.data_versions import bump_module_versions
+
+        bump_module_versions([self.id])
+        return updated
+
 
 class MaintenanceEvent(models.Model):
     """Registra una intervención de mantenimiento aplicada a un módulo específico."""
@@ -153,6 +198,184 @@ class OdometerLog(models.Model):
         self.fleet_module.update_accumulated_km()
 
 
+class SourceRowHash(models.Model):
+    """
+    Hash de contenido de cada fila de origen ya sincronizada desde Access.
+
+    Se indexa por tabla y clave primaria de Access; ``sync_from_access``
+    compara los hashes por lote y solo escribe filas nuevas o corregidas.
+    ``target_id`` es la fila de Django (evento o lectura) que generó: si una
+    corrección cambia la fecha o el módulo, esa fila se mueve o se borra.
+    """
+
+    class SourceTable(models.TextChoices):
+        OT_SIMAF = "A_00_OT_Simaf", "A_00_OT_Simaf"
+        KILOMETRAJES = "A_00_Kilometrajes", "A_00_Kilometrajes"
+
+    source_table = models.CharField(max_length=32, choices=SourceTable.choices)
+    source_id = models.BigIntegerField(help_text="Clave primaria de la fila en Access.")
+    row_hash = models.CharField(max_length=16)
+    target_id = models.BigIntegerField(
+        null=True,
+        blank=True,
+        help_text="Id del MaintenanceEvent u OdometerLog generado por la fila.",
+    )
+    synced_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        unique_together = ("source_table", "source_id")
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.source_table}#{self.source_id} ({self.row_hash})"
+
+
+class SyncRun(models.Model):
+    """Ciclo de sincronización ejecutado por ``sync_daemon``."""
+
+    class Status(models.TextChoices):
+        RUNNING = "RUNNING", "En curso"
+        OK = "OK", "Completado"
+        ERROR = "ERROR", "Error"
+
+    started_at = models.DateTimeField(default=timezone.now, db_index=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.RUNNING)
+    consecutive_failures = models.PositiveIntegerField(
+        default=0,
+        help_text="Fallos seguidos al cerrar el ciclo (determina el backoff).",
+    )
+    error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["-started_at"]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"Sync {self.started_at:%Y-%m-%d %H:%M} ({self.status})"
+
+
+class SyncPhaseMetric(models.Model):
+    """Duración y filas de una fase de un ciclo de sincronización."""
+
+    class Phase(models.TextChoices):
+        CONNECT = "connect", "Conexión"
+        MODULES = "modules", "Módulos"
+        EVENTS = "events", "Eventos"
+        READINGS = "readings", "Lecturas"
+
+    run = models.ForeignKey(SyncRun, related_name="phases", on_delete=models.CASCADE)
+    phase = models.CharField(max_length=10, choices=Phase.choices)
+    duration_seconds = models.FloatField()
+    row_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ["run", "id"]
+        unique_together = ("run", "phase")
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.phase}: {self.row_count} filas en {self.duration_seconds:.1f}s"
+
+
+class SyncLock(models.Model):
+    """
+    Lease de exclusión mutua para motores sin advisory locks (SQLite).
+
+    En PostgreSQL ``sync_lock.advisory_lock`` usa ``pg_try_advisory_lock``
+    y esta tabla no se utiliza.
+    """
+
+    name = models.CharField(max_length=64, primary_key=True)
+    owner = models.CharField(max_length=100)
+    expires_at = models.DateTimeField()
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"{self.name} ({self.owner})"
+
+
+class ExportJob(models.Model):
+    """
+    Exportación encolada por la web y generada por ``run_export_worker``.
+
+    El archivo resultante vive en la caché de exportaciones
+    (``export_cache``); el job guarda su nombre y el avance por módulo.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = "PENDING", "En cola"
+        RUNNING = "RUNNING", "En curso"
+        OK = "OK", "Completado"
+        ERROR = "ERROR", "Error"
+
+    class Kind(models.TextChoices):
+        PROJECTION_XLSX = "projection_xlsx", "Proyección (Excel)"
+
+    kind = models.CharField(max_length=20, choices=Kind.choices, default=Kind.PROJECTION_XLSX)
+    params = models.JSONField(
+        default=dict,
+        help_text="Parámetros de la exportación (meses, km/mes, fecha de inicio, módulos).",
+    )
+    status = models.CharField(
+        max_length=10, choices=Status.choices, default=Status.PENDING, db_index=True
+    )
+    progress = models.PositiveIntegerField(default=0, help_text="Módulos ya escritos.")
+    total = models.PositiveIntegerField(default=0, help_text="Módulos a escribir.")
+    artifact = models.CharField(
+        max_length=100, blank=True, help_text="Archivo en EXPORT_CACHE_DIR."
+    )
+    worker = models.CharField(max_length=100, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        help_text="Último avance informado; un job RUNNING sin avance se reencola.",
+    )
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["created_at", "id"]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"Export #{self.pk} {self.kind} ({self.status})"
+
+    @property
+    def percent(self) -> int:
+        """Avance en porcentaje (100 si terminó bien)."""
+        if self.status == self.Status.OK:
+            return 100
+        return self.progress * 100 // self.total if self.total else 0
+
+
+class ProjectionSnapshot(models.Model):
+    """
+    Proyección guardada para comparar cómo cambió el plan entre fechas.
+
+    Las celdas no se guardan una por fila: ``data`` tiene los arreglos
+    columnares de toda la grilla comprimidos (ver ``projection_snapshots``).
+    """
+
+    taken_on = models.DateField(db_index=True, help_text="Fecha de inicio de la proyección.")
+    months_ahead = models.PositiveSmallIntegerField()
+    monthly_km = models.PositiveIntegerField()
+    first_month = models.DateField(help_text="Primer mes proyectado (día 1).")
+    module_count = models.PositiveIntegerField(default=0)
+    row_count = models.PositiveIntegerField(default=0, help_text="Filas módulo × tipo.")
+    data = models.BinaryField(help_text="Arreglos columnares comprimidos con zlib.")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        ordering = ["-taken_on", "-id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["taken_on", "months_ahead", "monthly_km"],
+                name="unique_projection_snapshot",
+            )
+        ]
+
+    def __str__(self) -> str:  # pragma: no cover
+        return f"Proyección {self.taken_on} ({self.months_ahead} meses, {self.monthly_km} km/mes)"
+
+
 class ProjectionService:
     """Servicio auxiliar para proyectar la próxima intervención por disparador dual."""
 
@@ -3,6 +3,11 @@ Access Data Extractor - Adaptado a estructura real de DB_CCEE_Mantenimiento.
 
 Este servicio extrae datos de Access para sincronizar con Django.
 
+``BaseExtractor`` concentra las consultas y el parseo; cada backend solo
+define cómo conectarse. ``AccessExtractor`` usa pyodbc + driver de Access;
+``SQLiteExtractor`` (ver ``sqlite_extractor``) replica el esquema en SQLite
+para correr la sincronización en hosts Linux.
+
 Fuentes de datos:
 - A_00_Kilometrajes: Lecturas de odómetro
 - A_00_OT_Simaf: Eventos de mantenimiento
@@ -14,12 +19,20 @@ JOIN validado:
 """
 from __future__ import annotations
 
-import pyodbc
+import hashlib
+import os
+import threading
+from abc import ABC, abstractmethod
 from datetime import datetime, date
-from typing import Dict, List, Optional, Any
-from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Sequence, Tuple
+from dataclasses import dataclass, field
 import re
 
+try:
+    import pyodbc
+except ImportError:  # pragma: no cover - depende del driver ODBC del host
+    pyodbc = None
+
 
 @dataclass
 class ModuleData:
@@ -31,6 +44,12 @@ class ModuleData:
     coaches: Optional[List[str]] = None  # [5001, 5002, 5601, 5801]
 
 
+def content_hash(*values: Any) -> str:
+    """Hash compacto (16 hex) del contenido de una fila de origen."""
+    payload = "\x1f".join("" if v is None else str(v) for v in values)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=8).hexdigest()
+
+
 @dataclass
 class MaintenanceEventData:
     """Datos de un evento de mantenimiento."""
@@ -39,6 +58,12 @@ class MaintenanceEventData:
     event_date: date
     odometer_km: int
     raw_task: str  # Tarea original de Access
+    source_id: Optional[int] = None  # Id_OT_Simaf
+    
+    @property
+    def content_hash(self) -> str:
+        """Hash del contenido sincronizado (detecta correcciones en Access)."""
+        return content_hash(self.module_id, self.raw_task, self.event_date, self.odometer_km)
 
 
 @dataclass
@@ -47,10 +72,31 @@ class OdometerReadingData:
     module_id: str  # M01, M02...
     reading_date: date
     odometer_reading: int
+    source_id: Optional[int] = None  # Id_Kilometrajes
+    
+    @property
+    def content_hash(self) -> str:
+        """Hash del contenido sincronizado (detecta correcciones en Access)."""
+        return content_hash(self.module_id, self.reading_date, self.odometer_reading)
+
+
+@dataclass(frozen=True)
+class PartitionChecksum:
+    """Agregado de una partición (módulo o módulo/mes) para reconciliar."""
+    count: int
+    km_total: int
+    last_date: Optional[date]
+    module_id: Optional[str] = field(default=None, compare=False)  # M01 (solo Access)
 
 
-class AccessExtractor:
-    """Extractor de datos de Access para flota CSR."""
+class BaseExtractor(ABC):
+    """
+    Interfaz común de extractores de datos legacy para flota CSR.
+    
+    Las subclases implementan ``_open_connection`` (y opcionalmente los
+    hooks de dialecto SQL); las consultas sobre A_00_Kilometrajes,
+    A_00_OT_Simaf, A_00_Módulos y 12_CambioMódulos son compartidas.
+    """
     
     # Mapeo de ciclos Access → Django/CNRT
     CYCLE_MAPPING = {
@@ -79,32 +125,112 @@ class AccessExtractor:
         # DE no existe aún en Access
     }
     
-    def __init__(self, connection_string: str):
+    # Filas por fetchmany() en las variantes iter_* (memoria acotada)
+    DEFAULT_BATCH_SIZE = 5000
+    
+    # Excepciones del driver capturadas como errores de consulta
+    DB_ERRORS: tuple = ()
+    
+    # Tablas de origen consultadas (base del fingerprint de esquema)
+    SOURCE_TABLES = ("A_00_Módulos", "A_00_Kilometrajes", "A_00_OT_Simaf", "[12_CambioMódulos]")
+    
+    def __init__(self, source: str):
         """
         Inicializa el extractor.
         
         Args:
-            connection_string: String de conexión ODBC a Access
+            source: Origen de datos (connection string, ruta de archivo...)
         """
-        self.connection_string = connection_string
-        self.conn: Optional[pyodbc.Connection] = None
+        self.source = source
+        self.conn = None
+        # Con keep_warm, los clones usados por la extracción concurrente
+        # quedan conectados para el siguiente ciclo (ver sync_daemon)
+        self.keep_warm = False
+        self._idle_clones: List["BaseExtractor"] = []
+        self._clones_lock = threading.Lock()
+    
+    @abstractmethod
+    def _open_connection(self):
+        """Abre y retorna una conexión DB-API al origen de datos."""
     
     def connect(self) -> bool:
         """
-        Establece conexión con Access.
+        Establece conexión con el origen de datos.
         
         Returns:
             True si conectó exitosamente
         """
         try:
-            self.conn = pyodbc.connect(self.connection_string)
+            self.conn = self._open_connection()
             return True
-        except pyodbc.Error as e:
-            print(f"Error conectando a Access: {e}")
+        except self.DB_ERRORS as e:
+            print(f"Error conectando a {self.__class__.__name__}: {e}")
             return False
     
+    def clone(self) -> "BaseExtractor":
+        """Crea un extractor equivalente (sin conectar) para otra conexión."""
+        return self.__class__(self.source)
+    
+    def acquire_clone(self) -> "BaseExtractor":
+        """
+        Retorna un clon para otra conexión, reutilizando uno ocioso.
+        
+        Returns:
+            Extractor conectado (o sin conexión si no se pudo conectar)
+        """
+        while True:
+            with self._clones_lock:
+                if not self._idle_clones:
+                    break
+                clone = self._idle_clones.pop()
+            # Una conexión ociosa puede haberse caído entre ciclos
+            if clone.is_alive():
+                return clone
+            clone.disconnect()
+        
+        clone = self.clone()
+        clone.connect()
+        return clone
+    
+    def is_alive(self) -> bool:
+        """
+        Verifica la conexión con una consulta real mínima (una fila de módulos).
+        
+        Returns:
+            False si no hay conexión o la consulta falla
+        """
+        if not self.conn:
+            return False
+        
+        query = " ".join(filter(None, [
+            "SELECT", self._top_clause(1), "Id_Módulos FROM A_00_Módulos", self._limit_clause(1)
+        ]))
+        try:
+            cursor = self.conn.cursor()
+            try:
+                self._execute(cursor, query)
+                cursor.fetchall()
+            finally:
+                cursor.close()
+        except self.DB_ERRORS:
+            return False
+        return True
+    
+    def release_clone(self, clone: "BaseExtractor") -> None:
+        """Devuelve un clon: queda ocioso si ``keep_warm``, si no se cierra."""
+        if self.keep_warm and clone.conn:
+            with self._clones_lock:
+                self._idle_clones.append(clone)
+        else:
+            clone.disconnect()
+    
     def disconnect(self):
-        """Cierra la conexión."""
+        """Cierra la conexión (y las de los clones ociosos)."""
+        with self._clones_lock:
+            idle, self._idle_clones = self._idle_clones, []
+        for clone in idle:
+            clone.disconnect()
+        
         if self.conn:
             self.conn.close()
             self.conn = None
@@ -166,18 +292,68 @@ class AccessExtractor:
         task_code = raw_task.strip().upper()
         
         # Buscar en mapeo (intenta coincidencia exacta primero)
-        if task_code in AccessExtractor.CYCLE_MAPPING:
-            return AccessExtractor.CYCLE_MAPPING[task_code]
+        if task_code in BaseExtractor.CYCLE_MAPPING:
+            return BaseExtractor.CYCLE_MAPPING[task_code]
         
         # Si no coincide exactamente, intentar con primeros 2 caracteres
         # (para casos como "AN$" que no están en el mapping)
         if len(task_code) >= 2:
             prefix = task_code[:2]
-            if prefix in AccessExtractor.CYCLE_MAPPING:
-                return AccessExtractor.CYCLE_MAPPING[prefix]
+            if prefix in BaseExtractor.CYCLE_MAPPING:
+                return BaseExtractor.CYCLE_MAPPING[prefix]
         
         return None
     
+    @staticmethod
+    def _to_date(value) -> date:
+        """Normaliza fechas del driver (datetime, date o texto ISO)."""
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, str):
+            return datetime.fromisoformat(value).date()
+        return value
+    
+    def _execute(self, cursor, query: str, params: Sequence = ()) -> None:
+        """Ejecuta una consulta parametrizada (hook para adaptar parámetros)."""
+        cursor.execute(query, params)
+    
+    def _top_clause(self, limit: int) -> str:
+        """Cláusula de límite previa a las columnas (dialecto Access)."""
+        return f"TOP {limit}"
+    
+    def _limit_clause(self, limit: int) -> str:
+        """Cláusula de límite al final de la consulta (otros dialectos)."""
+        return ""
+    
+    def _year_month_exprs(self, column: str) -> Tuple[str, str]:
+        """Expresiones de año y mes de una columna fecha (dialecto Access)."""
+        return f"Year({column})", f"Month({column})"
+    
+    def _task_prefix_expr(self, column: str) -> str:
+        """Prefijo de dos letras normalizado de una tarea (dialecto Access)."""
+        return f"UCase(Left(Trim({column}), 2))"
+    
+    @classmethod
+    def task_prefixes(cls, maintenance_types: Optional[Iterable[str]] = None) -> List[str]:
+        """
+        Prefijos de tarea que ``normalize_maintenance_type`` reconoce.
+        
+        Toda variante del mapeo (IQ1, AN3...) comparte tipo con su prefijo
+        de dos letras, por lo que filtrar por prefijo en SQL equivale a
+        normalizar fila por fila.
+        
+        Args:
+            maintenance_types: Limitar a estos tipos normalizados (None = todos)
+        
+        Returns:
+            Lista ordenada de prefijos (ej: ['AN', 'BA', 'IB', 'IQ', 'RS'])
+        """
+        types = set(maintenance_types) if maintenance_types is not None else None
+        return sorted({
+            task[:2] for task, maint_type in cls.CYCLE_MAPPING.items()
+            if types is None or maint_type in types
+        })
+    
     def get_active_modules(self) -> List[ModuleData]:
         """
         Obtiene lista de módulos CSR activos.
@@ -215,7 +391,7 @@ class AccessExtractor:
                         module_number=module_num,
                         module_id=module_id
                     )
-        except pyodbc.Error as e:
+        except self.DB_ERRORS as e:
             print(f"Error obteniendo módulos de kilometrajes: {e}")
         
         # Obtener módulos de mantenimientos (CSR: Clase_Vehículos = 3)
@@ -236,34 +412,55 @@ class AccessExtractor:
                         module_number=module_num,
                         module_id=module_id
                     )
-        except pyodbc.Error as e:
+        except self.DB_ERRORS as e:
             print(f"Error obteniendo módulos de mantenimientos: {e}")
         
-        # Enriquecer con información de formación (última asignación)
-        for module_id in modules_dict.keys():
-            try:
-                cursor.execute("""
-                    SELECT TOP 1 Formación, Cabina
-                    FROM [12_CambioMódulos]
-                    WHERE Módulo = ?
-                    ORDER BY Fecha DESC
-                """, (module_id,))
-                
-                row = cursor.fetchone()
-                if row:
-                    modules_dict[module_id].formation = row[0]
-                    modules_dict[module_id].cabin_position = row[1]
-            except pyodbc.Error:
-                pass  # No crítico si no hay datos de formación
+        # Enriquecer con información de formación (última asignación).
+        # Una sola consulta agrupada en vez de un TOP 1 por módulo.
+        try:
+            for module_id, (formation, cabin) in self._get_latest_formations(cursor).items():
+                if module_id in modules_dict:
+                    modules_dict[module_id].formation = formation
+                    modules_dict[module_id].cabin_position = cabin
+        except self.DB_ERRORS:
+            pass  # No crítico si no hay datos de formación
         
         cursor.close()
         
         return list(modules_dict.values())
     
+    @staticmethod
+    def _get_latest_formations(cursor) -> Dict[str, tuple]:
+        """
+        Obtiene la última formación y cabina asignada a cada módulo.
+        
+        Resuelve todos los módulos en una única consulta contra
+        [12_CambioMódulos], uniendo cada cambio con la fecha máxima de su
+        módulo. Ante empates de fecha se conserva la primera fila.
+        
+        Returns:
+            Dict module_id → (formación, cabina)
+        """
+        cursor.execute("""
+            SELECT c.Módulo, c.Formación, c.Cabina
+            FROM [12_CambioMódulos] AS c
+            INNER JOIN (
+                SELECT Módulo, MAX(Fecha) AS UltimaFecha
+                FROM [12_CambioMódulos]
+                GROUP BY Módulo
+            ) AS u ON c.Módulo = u.Módulo AND c.Fecha = u.UltimaFecha
+        """)
+        
+        latest: Dict[str, tuple] = {}
+        for row in cursor.fetchall():
+            latest.setdefault(row[0], (row[1], row[2]))
+        return latest
+    
     def get_maintenance_events(
         self,
         module_id: Optional[str] = None,
-        since_date: Optional[date] = None
+        since_date: Optional[date] = None,
+        limit: Optional[int] = None
     ) -> List[MaintenanceEventData]:
         """
         Obtiene eventos de mantenimiento desde A_00_OT_Simaf.
@@ -274,70 +471,183 @@ class AccessExtractor:
         Args:
             module_id: Filtrar por módulo específico (ej: 'M01')
             since_date: Obtener solo eventos desde esta fecha
+            limit: Límite de registros (más recientes primero)
         
         Returns:
-            Lista de MaintenanceEventData
+            Lista de MaintenanceEventData (vacía o parcial si la consulta falla)
+        """
+        events = []
+        try:
+            for batch in self.iter_maintenance_events(module_id, since_date, limit=limit):
+                events.extend(batch)
+        except self.DB_ERRORS as e:
+            print(f"Error obteniendo eventos de mantenimiento: {e}")
+        return events
+    
+    def iter_maintenance_events(
+        self,
+        module_id: Optional[str] = None,
+        since_date: Optional[date] = None,
+        *,
+        batch_size: Optional[int] = None,
+        until_date: Optional[date] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[List[MaintenanceEventData]]:
+        """
+        Variante streaming de ``get_maintenance_events``.
+        
+        Lee filas con ``fetchmany(batch_size)`` y entrega lotes tipados,
+        de modo que la memoria no crece con el historial de Access.
+        
+        Args:
+            module_id: Filtrar por módulo específico (ej: 'M01')
+            since_date: Obtener solo eventos desde esta fecha
+            batch_size: Filas por lote (default: DEFAULT_BATCH_SIZE)
+            until_date: Obtener solo eventos anteriores a esta fecha (exclusiva)
+            limit: Límite de registros (más recientes primero)
+        
+        Yields:
+            Listas de MaintenanceEventData (nunca vacías)
+        
+        Raises:
+            ``DB_ERRORS`` del backend si la consulta falla
         """
         if not self.conn:
             raise RuntimeError("No hay conexión activa")
         
+        batch_size = batch_size or self.DEFAULT_BATCH_SIZE
         cursor = self.conn.cursor()
-        events = []
         
-        # Construir query (CSR: Clase_Vehículos = 3)
-        query = """
-            SELECT m.Módulos, ot.Tarea, ot.Km, ot.Fecha_Fin
-            FROM A_00_OT_Simaf AS ot
-            INNER JOIN A_00_Módulos AS m ON ot.Módulo = m.Id_Módulos
-            WHERE m.Clase_Vehículos = 3
+        where, params = self._events_where(module_id, since_date, until_date)
+        query_parts = ["SELECT"]
+        if limit:
+            query_parts.append(self._top_clause(limit))
+        query_parts.append("m.Módulos, ot.Tarea, ot.Km, ot.Fecha_Fin, ot.Id_OT_Simaf")
+        query_parts.append(where)
+        # Desempate por Id: ante eventos repetidos el sync conserva el último
+        query_parts.append("ORDER BY ot.Fecha_Fin DESC, ot.Id_OT_Simaf")
+        if limit:
+            query_parts.append(self._limit_clause(limit))
+        
+        query = " ".join(query_parts)
+        
+        try:
+            self._execute(cursor, query, params)
+            
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                
+                batch = [
+                    event for event in map(self._parse_event_row, rows)
+                    if event is not None
+                ]
+                if batch:
+                    yield batch
+        
+        finally:
+            cursor.close()
+    
+    def _events_where(
+        self,
+        module_id: Optional[str] = None,
+        since_date: Optional[date] = None,
+        until_date: Optional[date] = None
+    ) -> Tuple[str, List[Any]]:
+        """
+        FROM/WHERE de eventos CSR (Clase_Vehículos = 3) con tarea reconocida.
+        
+        El filtro por prefijo de tarea equivale a ``normalize_maintenance_type``
+        (ver ``task_prefixes``): las filas no reconocidas ni se transfieren.
+        
+        Returns:
+            Tupla (SQL desde FROM, parámetros)
         """
-        params = []
+        prefixes = self.task_prefixes()
+        clauses = [
+            "FROM A_00_OT_Simaf AS ot",
+            "INNER JOIN A_00_Módulos AS m ON ot.Módulo = m.Id_Módulos",
+            "WHERE m.Clase_Vehículos = 3",
+            f"AND {self._task_prefix_expr('ot.Tarea')} IN ({', '.join('?' for _ in prefixes)})",
+        ]
+        params: List[Any] = list(prefixes)
         
         if module_id:
-            query += " AND m.Módulos = ?"
+            clauses.append("AND m.Módulos = ?")
             params.append(module_id)
         
         if since_date:
-            query += " AND ot.Fecha_Fin >= ?"
+            clauses.append("AND ot.Fecha_Fin >= ?")
             params.append(since_date)
         
-        query += " ORDER BY ot.Fecha_Fin DESC"
+        if until_date:
+            clauses.append("AND ot.Fecha_Fin < ?")
+            params.append(until_date)
         
-        try:
-            cursor.execute(query, params)
-            
-            for row in cursor.fetchall():
-                module_id_str = row[0]  # "M01", "M02", etc.
-                raw_task = row[1].strip() if row[1] else None
-                km = row[2] if row[2] is not None else 0
-                fecha_fin = row[3]
-                
-                if not module_id_str or not raw_task or not fecha_fin:
-                    continue
-                
-                # Normalizar tipo de mantenimiento
-                maint_type = self.normalize_maintenance_type(raw_task)
-                if not maint_type:
-                    continue  # Saltar tipos no reconocidos
-                
-                # Convertir fecha
-                event_date = fecha_fin.date() if isinstance(fecha_fin, datetime) else fecha_fin
-                
-                events.append(MaintenanceEventData(
-                    module_id=module_id_str,
-                    maintenance_type=maint_type,
-                    event_date=event_date,
-                    odometer_km=int(km),
-                    raw_task=raw_task
-                ))
-        
-        except pyodbc.Error as e:
-            print(f"Error obteniendo eventos de mantenimiento: {e}")
+        return " ".join(clauses), params
+    
+    def count_maintenance_events(
+        self,
+        module_id: Optional[str] = None,
+        since_date: Optional[date] = None
+    ) -> int:
+        """
+        Cuenta los eventos que ``iter_maintenance_events`` entregaría.
+        
+        Una sola consulta COUNT(*), sin transferir filas (modo prueba).
+        
+        Args:
+            module_id: Filtrar por módulo específico (ej: 'M01')
+            since_date: Contar solo eventos desde esta fecha
+        
+        Returns:
+            Cantidad de eventos
+        """
+        where, params = self._events_where(module_id, since_date)
+        return self._count(
+            f"{where} AND m.Módulos IS NOT NULL AND ot.Fecha_Fin IS NOT NULL", params
+        )
+    
+    def _count(self, where: str, params: List[Any]) -> int:
+        """Ejecuta ``SELECT COUNT(*)`` sobre un FROM/WHERE."""
+        if not self.conn:
+            raise RuntimeError("No hay conexión activa")
         
+        cursor = self.conn.cursor()
+        try:
+            self._execute(cursor, f"SELECT COUNT(*) {where}", params)
+            return cursor.fetchone()[0]
         finally:
             cursor.close()
+    
+    @classmethod
+    def _parse_event_row(cls, row) -> Optional[MaintenanceEventData]:
+        """Convierte una fila de A_00_OT_Simaf en MaintenanceEventData."""
+        module_id_str = row[0]  # "M01", "M02", etc.
+        raw_task = row[1].strip() if row[1] else None
+        km = row[2] if row[2] is not None else 0
+        fecha_fin = row[3]
         
-        return events
+        if not module_id_str or not raw_task or not fecha_fin:
+            return None
+        
+        # Normalizar tipo de mantenimiento
+        maint_type = cls.normalize_maintenance_type(raw_task)
+        if not maint_type:
+            return None  # Saltar tipos no reconocidos
+        
+        # Convertir fecha
+        event_date = cls._to_date(fecha_fin)
+        
+        return MaintenanceEventData(
+            module_id=module_id_str,
+            maintenance_type=maint_type,
+            event_date=event_date,
+            odometer_km=int(km),
+            raw_task=raw_task,
+            source_id=row[4]
+        )
     
     def get_odometer_readings(
         self,
@@ -357,65 +667,155 @@ class AccessExtractor:
             limit: Límite de registros (más recientes primero)
         
         Returns:
-            Lista de OdometerReadingData
+            Lista de OdometerReadingData (vacía o parcial si la consulta falla)
+        """
+        readings = []
+        try:
+            for batch in self.iter_odometer_readings(module_id, since_date, limit=limit):
+                readings.extend(batch)
+        except self.DB_ERRORS as e:
+            print(f"Error obteniendo lecturas de odómetro: {e}")
+        return readings
+    
+    def iter_odometer_readings(
+        self,
+        module_id: Optional[str] = None,
+        since_date: Optional[date] = None,
+        *,
+        batch_size: Optional[int] = None,
+        until_date: Optional[date] = None,
+        limit: Optional[int] = None
+    ) -> Iterator[List[OdometerReadingData]]:
+        """
+        Variante streaming de ``get_odometer_readings``.
+        
+        Lee filas con ``fetchmany(batch_size)`` y entrega lotes tipados,
+        de modo que la memoria no crece con el historial de Access.
+        
+        Args:
+            module_id: Filtrar por módulo específico (ej: 'M01')
+            since_date: Obtener solo lecturas desde esta fecha
+            batch_size: Filas por lote (default: DEFAULT_BATCH_SIZE)
+            until_date: Obtener solo lecturas anteriores a esta fecha (exclusiva)
+            limit: Límite de registros (más recientes primero)
+        
+        Yields:
+            Listas de OdometerReadingData (nunca vacías)
+        
+        Raises:
+            ``DB_ERRORS`` del backend si la consulta falla
         """
         if not self.conn:
             raise RuntimeError("No hay conexión activa")
         
+        batch_size = batch_size or self.DEFAULT_BATCH_SIZE
         cursor = self.conn.cursor()
-        readings = []
         
         # Construir query (CSR: Clase_Vehículos = 3)
         query_parts = ["SELECT"]
         if limit:
-            query_parts.append(f"TOP {limit}")
+            query_parts.append(self._top_clause(limit))
         
-        query_parts.append("m.Módulos, k.kilometraje, k.Fecha")
-        query_parts.append("FROM A_00_Kilometrajes AS k")
-        query_parts.append("INNER JOIN A_00_Módulos AS m ON k.Módulo = m.Id_Módulos")
-        query_parts.append("WHERE m.Clase_Vehículos = 3")
+        query_parts.append("m.Módulos, k.kilometraje, k.Fecha, k.Id_Kilometrajes")
+        where, params = self._readings_where(module_id, since_date, until_date)
+        query_parts.append(where)
+        # Desempate por Id: ante lecturas repetidas el sync conserva la primera
+        query_parts.append("ORDER BY k.Fecha DESC, k.Id_Kilometrajes")
+        if limit:
+            query_parts.append(self._limit_clause(limit))
         
-        params = []
+        query = " ".join(query_parts)
+        
+        try:
+            self._execute(cursor, query, params)
+            
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                
+                batch = [
+                    reading for reading in map(self._parse_reading_row, rows)
+                    if reading is not None
+                ]
+                if batch:
+                    yield batch
+        
+        finally:
+            cursor.close()
+    
+    @staticmethod
+    def _readings_where(
+        module_id: Optional[str] = None,
+        since_date: Optional[date] = None,
+        until_date: Optional[date] = None
+    ) -> Tuple[str, List[Any]]:
+        """
+        FROM/WHERE de lecturas CSR (Clase_Vehículos = 3).
+        
+        Returns:
+            Tupla (SQL desde FROM, parámetros)
+        """
+        clauses = [
+            "FROM A_00_Kilometrajes AS k",
+            "INNER JOIN A_00_Módulos AS m ON k.Módulo = m.Id_Módulos",
+            "WHERE m.Clase_Vehículos = 3",
+        ]
+        params: List[Any] = []
         
         if module_id:
-            query_parts.append("AND m.Módulos = ?")
+            clauses.append("AND m.Módulos = ?")
             params.append(module_id)
         
         if since_date:
-            query_parts.append("AND k.Fecha >= ?")
+            clauses.append("AND k.Fecha >= ?")
             params.append(since_date)
         
-        query_parts.append("ORDER BY k.Fecha DESC")
+        if until_date:
+            clauses.append("AND k.Fecha < ?")
+            params.append(until_date)
         
-        query = " ".join(query_parts)
+        return " ".join(clauses), params
+    
+    def count_odometer_readings(
+        self,
+        module_id: Optional[str] = None,
+        since_date: Optional[date] = None
+    ) -> int:
+        """
+        Cuenta las lecturas que ``iter_odometer_readings`` entregaría.
         
-        try:
-            cursor.execute(query, params)
-            
-            for row in cursor.fetchall():
-                module_id_str = row[0]  # "M01", "M02", etc.
-                kilometraje = row[1] if row[1] is not None else 0
-                fecha = row[2]
-                
-                if not module_id_str or not fecha:
-                    continue
-                
-                # Convertir fecha
-                reading_date = fecha.date() if isinstance(fecha, datetime) else fecha
-                
-                readings.append(OdometerReadingData(
-                    module_id=module_id_str,
-                    reading_date=reading_date,
-                    odometer_reading=int(kilometraje)
-                ))
+        Una sola consulta COUNT(*), sin transferir filas (modo prueba).
         
-        except pyodbc.Error as e:
-            print(f"Error obteniendo lecturas de odómetro: {e}")
+        Args:
+            module_id: Filtrar por módulo específico (ej: 'M01')
+            since_date: Contar solo lecturas desde esta fecha
         
-        finally:
-            cursor.close()
+        Returns:
+            Cantidad de lecturas
+        """
+        where, params = self._readings_where(module_id, since_date)
+        return self._count(f"{where} AND m.Módulos IS NOT NULL AND k.Fecha IS NOT NULL", params)
+    
+    @classmethod
+    def _parse_reading_row(cls, row) -> Optional[OdometerReadingData]:
+        """Convierte una fila de A_00_Kilometrajes en OdometerReadingData."""
+        module_id_str = row[0]  # "M01", "M02", etc.
+        kilometraje = row[1] if row[1] is not None else 0
+        fecha = row[2]
         
-        return readings
+        if not module_id_str or not fecha:
+            return None
+        
+        # Convertir fecha
+        reading_date = cls._to_date(fecha)
+        
+        return OdometerReadingData(
+            module_id=module_id_str,
+            reading_date=reading_date,
+            odometer_reading=int(kilometraje),
+            source_id=row[3]
+        )
     
     def get_latest_odometer_reading(self, module_id: str) -> Optional[int]:
         """
@@ -434,12 +834,209 @@ class AccessExtractor:
         
         return readings[0].odometer_reading if readings else None
     
-    def test_connection(self) -> Dict[str, Any]:
+    def get_reading_checksums(
+        self,
+        module_ids: Optional[Sequence[str]] = None,
+        since_date: Optional[date] = None,
+        by_month: bool = False
+    ) -> Dict[tuple, PartitionChecksum]:
+        """
+        Agregados de A_00_Kilometrajes por módulo (o por módulo y mes).
+        
+        Args:
+            module_ids: Limitar a estos módulos (ej: ['M01', 'M45'])
+            since_date: Considerar solo lecturas desde esta fecha
+            by_month: Particionar además por año/mes de ``Fecha``
+        
+        Returns:
+            Dict (número de módulo[, año, mes]) → PartitionChecksum
+        """
+        return self._partition_checksums(
+            table="A_00_Kilometrajes AS k",
+            module_column="k.Módulo",
+            km_column="k.kilometraje",
+            date_column="k.Fecha",
+            filters=[],
+            id_column="k.Id_Kilometrajes",
+            kept_id="MIN",
+            key_columns=["k.Módulo", "k.Fecha"],
+            module_ids=module_ids,
+            since_date=since_date,
+            by_month=by_month,
+        )
+    
+    def get_event_checksums(
+        self,
+        module_ids: Optional[Sequence[str]] = None,
+        since_date: Optional[date] = None,
+        by_month: bool = False,
+        maintenance_types: Optional[Iterable[str]] = None
+    ) -> Dict[tuple, PartitionChecksum]:
+        """
+        Agregados de A_00_OT_Simaf por módulo (o por módulo y mes).
+        
+        Solo cuenta tareas reconocidas (mismo criterio que
+        ``normalize_maintenance_type``), particionadas por ``Fecha_Fin``.
+        
+        Args:
+            module_ids: Limitar a estos módulos (ej: ['M01', 'M45'])
+            since_date: Considerar solo eventos desde esta fecha
+            by_month: Particionar además por año/mes de ``Fecha_Fin``
+            maintenance_types: Limitar a estos tipos normalizados
+        
+        Returns:
+            Dict (número de módulo[, año, mes]) → PartitionChecksum
+        """
+        prefixes = self.task_prefixes(maintenance_types)
+        if not prefixes:
+            return {}
+        
+        placeholders = ", ".join("?" for _ in prefixes)
+        return self._partition_checksums(
+            table="A_00_OT_Simaf AS ot",
+            module_column="ot.Módulo",
+            km_column="ot.Km",
+            date_column="ot.Fecha_Fin",
+            filters=[(f"{self._task_prefix_expr('ot.Tarea')} IN ({placeholders})", prefixes)],
+            id_column="ot.Id_OT_Simaf",
+            kept_id="MAX",
+            key_columns=["ot.Módulo", self._task_prefix_expr("ot.Tarea"), "ot.Fecha_Fin"],
+            module_ids=module_ids,
+            since_date=since_date,
+            by_month=by_month,
+        )
+    
+    def _partition_checksums(
+        self,
+        table: str,
+        module_column: str,
+        km_column: str,
+        date_column: str,
+        filters: List[tuple],
+        id_column: str,
+        kept_id: str,
+        key_columns: List[str],
+        module_ids: Optional[Sequence[str]],
+        since_date: Optional[date],
+        by_month: bool
+    ) -> Dict[tuple, PartitionChecksum]:
+        """
+        Consulta agrupada COUNT/SUM/MAX común a lecturas y eventos.
+        
+        Solo cuenta una fila por clave natural (``key_columns``), la misma
+        que conserva el sync: la de ``kept_id`` (MIN o MAX) de ``id_column``.
+        Así las filas repetidas en Access no descuadran contra la base, donde
+        la clave es única.
+        """
+        if not self.conn:
+            raise RuntimeError("No hay conexión activa")
+        
+        group_by = ["m.Módulos"]
+        if by_month:
+            group_by.extend(self._year_month_exprs(date_column))
+        
+        keys = ", ".join(key_columns)
+        kept_rows = f"(SELECT {kept_id}({id_column}) AS kept FROM {table} GROUP BY {keys}) AS kept_rows"
+        query_parts = [
+            f"SELECT {', '.join(group_by)}, COUNT(*), SUM({km_column}), MAX({date_column})",
+            f"FROM ({table} INNER JOIN {kept_rows} ON {id_column} = kept_rows.kept)",
+            f"INNER JOIN A_00_Módulos AS m ON {module_column} = m.Id_Módulos",
+            f"WHERE m.Clase_Vehículos = 3 AND {date_column} IS NOT NULL",
+        ]
+        params: List[Any] = []
+        
+        for condition, values in filters:
+            query_parts.append(f"AND {condition}")
+            params.extend(values)
+        
+        if module_ids:
+            query_parts.append(f"AND m.Módulos IN ({', '.join('?' for _ in module_ids)})")
+            params.extend(module_ids)
+        
+        if since_date:
+            query_parts.append(f"AND {date_column} >= ?")
+            params.append(since_date)
+        
+        query_parts.append(f"GROUP BY {', '.join(group_by)}")
+        
+        cursor = self.conn.cursor()
+        checksums: Dict[tuple, PartitionChecksum] = {}
+        try:
+            self._execute(cursor, " ".join(query_parts), params)
+            for row in cursor.fetchall():
+                module_num = self.extract_module_number(row[0])
+                if not module_num:
+                    continue
+                
+                key = (module_num, int(row[1]), int(row[2])) if by_month else (module_num,)
+                count, km_total, last_date = row[-3:]
+                checksums[key] = PartitionChecksum(
+                    count=int(count),
+                    km_total=int(round(km_total or 0)),
+                    last_date=self._to_date(last_date) if last_date else None,
+                    module_id=row[0],
+                )
+        finally:
+            cursor.close()
+        
+        return checksums
+    
+    def source_path(self) -> Optional[str]:
+        """Ruta del archivo de origen, si el backend usa uno."""
+        return None
+    
+    def source_mtime(self) -> Optional[float]:
+        """
+        Fecha de modificación del archivo de origen (invalida cachés).
+        
+        Returns:
+            Timestamp o None si no hay archivo o no es accesible
+        """
+        path = self.source_path()
+        if not path:
+            return None
+        try:
+            return os.stat(path).st_mtime
+        except OSError:
+            return None
+    
+    def get_schema_fingerprint(self) -> str:
+        """
+        Hash de columnas y tipos de las tablas de origen.
+        
+        Usa ``SELECT * ... WHERE 1=0``: solo lee metadatos, sin filas.
+        
+        Returns:
+            Hash hex de 16 caracteres
+        """
+        if not self.conn:
+            raise RuntimeError("No hay conexión activa")
+        
+        columns = []
+        cursor = self.conn.cursor()
+        try:
+            for table in self.SOURCE_TABLES:
+                cursor.execute(f"SELECT * FROM {table} WHERE 1=0")
+                for column in cursor.description:
+                    type_code = column[1]
+                    columns.append(
+                        f"{table}.{column[0]}:{getattr(type_code, '__name__', type_code)}"
+                    )
+        finally:
+            cursor.close()
+        
+        return content_hash(*columns)
+    
+    def test_connection(self, include_counts: bool = True) -> Dict[str, Any]:
         """
         Prueba la conexión y retorna estadísticas básicas.
         
         Cuenta registros CSR (Clase_Vehículos = 3) mediante JOIN validado.
         
+        Args:
+            include_counts: Si es False solo verifica la conexión (omite
+                los tres COUNT sobre tablas completas)
+        
         Returns:
             Dict con información de la conexión
         """
@@ -447,8 +1044,11 @@ class AccessExtractor:
             if not self.connect():
                 return {"connected": False, "error": "No se pudo conectar"}
         
-        cursor = self.conn.cursor()
         stats = {"connected": True}
+        if not include_counts:
+            return stats
+        
+        cursor = self.conn.cursor()
         
         try:
             # Contar módulos (CSR: Clase_Vehículos = 3)
@@ -478,7 +1078,7 @@ class AccessExtractor:
             """)
             stats["readings_count"] = cursor.fetchone()[0]
             
-        except pyodbc.Error as e:
+        except self.DB_ERRORS as e:
             stats["error"] = str(e)
         
         finally:
@@ -487,6 +1087,35 @@ class AccessExtractor:
         return stats
 
 
+class AccessExtractor(BaseExtractor):
+    """Extractor de datos de Access (pyodbc + Microsoft Access Driver)."""
+    
+    DB_ERRORS = (pyodbc.Error,) if pyodbc is not None else ()
+    
+    def __init__(self, connection_string: str):
+        """
+        Inicializa el extractor.
+        
+        Args:
+            connection_string: String de conexión ODBC a Access
+        """
+        super().__init__(connection_string)
+        self.connection_string = connection_string
+    
+    def source_path(self) -> Optional[str]:
+        """Archivo .accdb indicado en ``DBQ=`` del connection string."""
+        match = re.search(r'DBQ=([^;]+)', self.connection_string, re.IGNORECASE)
+        return match.group(1).strip() if match else None
+    
+    def _open_connection(self):
+        """Abre la conexión ODBC a Access."""
+        if pyodbc is None:
+            raise RuntimeError(
+                "pyodbc no está disponible (falta el driver ODBC en este host)"
+            )
+        return pyodbc.connect(self.connection_string)
+
+
 # Ejemplo de uso
 if __name__ == '__main__':
     # Connection string de ejemplo
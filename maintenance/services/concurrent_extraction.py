@@ -0,0 +1,183 @@
+"""
+Extracción concurrente de módulos, eventos y lecturas.
+
+Cada consulta corre en su propio hilo y con su propia conexión (pyodbc libera
+el GIL durante la E/S), de modo que el tiempo total se acerca al de la
+consulta más lenta y no a la suma de las tres. Los lotes se entregan por
+colas acotadas: la fase de carga los consume en orden (módulos → eventos →
+lecturas) y la memoria sigue acotada aunque la extracción vaya adelantada.
+"""
+from __future__ import annotations
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from .access_extractor import BaseExtractor, ModuleData
+
+# Marca de fin de stream en las colas
+_DONE = object()
+
+
+class _StreamError:
+    """Envuelve una excepción del productor para re-lanzarla al consumir."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class ConcurrentExtraction:
+    """
+    Orquesta las tres extracciones en un pool de hilos acotado.
+
+    Uso:
+        with ConcurrentExtraction(extractor) as extraction:
+            extraction.start(modules=True, events={...}, readings={...})
+            modules = extraction.modules()
+            for batch in extraction.event_batches(): ...
+            for batch in extraction.reading_batches(): ...
+
+    Los streams se envían al pool en el mismo orden en que se consumen, por
+    lo que incluso con ``max_workers=1`` no hay bloqueo mutuo.
+    """
+
+    STREAMS = ("modules", "events", "readings")
+
+    def __init__(
+        self,
+        extractor: BaseExtractor,
+        max_workers: int = 3,
+        queue_size: int = 4,
+    ):
+        """
+        Args:
+            extractor: Extractor de referencia (se clona una conexión por stream;
+                con ``extractor.keep_warm`` los clones se reutilizan)
+            max_workers: Hilos simultáneos (1 = secuencial)
+            queue_size: Lotes máximos en espera por stream
+        """
+        self.extractor = extractor
+        self.max_workers = max_workers
+        self.queue_size = queue_size
+        self._queues: Dict[str, queue.Queue] = {}
+        self._stop = threading.Event()
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def start(
+        self,
+        modules: bool = True,
+        events: Optional[Dict[str, Any]] = None,
+        readings: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """
+        Lanza las extracciones solicitadas.
+
+        Args:
+            modules: Si se extraen módulos activos
+            events: kwargs de ``iter_maintenance_events`` (None = no extraer)
+            readings: kwargs de ``iter_odometer_readings`` (None = no extraer)
+        """
+        jobs: Dict[str, Callable[[BaseExtractor], Iterator[List[Any]]]] = {}
+        if modules:
+            jobs["modules"] = lambda ext: iter([ext.get_active_modules()])
+        if events is not None:
+            jobs["events"] = lambda ext: ext.iter_maintenance_events(**events)
+        if readings is not None:
+            jobs["readings"] = lambda ext: ext.iter_odometer_readings(**readings)
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers, thread_name_prefix="access-extract"
+        )
+        for name in self.STREAMS:
+            if name in jobs:
+                self._queues[name] = queue.Queue(maxsize=self.queue_size)
+                self._executor.submit(self._produce, name, jobs[name])
+
+    def modules(self) -> List[ModuleData]:
+        """Retorna los módulos extraídos."""
+        result: List[ModuleData] = []
+        for batch in self._consume("modules"):
+            result.extend(batch)
+        return result
+
+    def event_batches(self) -> Iterator[list]:
+        """Itera los lotes de eventos a medida que llegan."""
+        return self._consume("events")
+
+    def reading_batches(self) -> Iterator[list]:
+        """Itera los lotes de lecturas a medida que llegan."""
+        return self._consume("readings")
+
+    def close(self) -> None:
+        """Detiene los productores pendientes y libera el pool."""
+        self._stop.set()
+        for q in self._queues.values():
+            self._drain(q)
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _produce(self, name: str, job: Callable[[BaseExtractor], Iterator[list]]) -> None:
+        """Corre una extracción en su propia conexión y publica sus lotes."""
+        q = self._queues[name]
+        ext = self.extractor.acquire_clone()
+        batches = None
+        failed = False
+        try:
+            if not ext.conn:
+                raise RuntimeError(f"No se pudo abrir conexión para extraer {name}")
+            batches = job(ext)
+            for batch in batches:
+                if not self._put(q, batch):
+                    return
+            self._put(q, _DONE)
+        except BaseException as e:  # se re-lanza en el hilo consumidor
+            failed = True
+            self._put(q, _StreamError(e))
+        finally:
+            # Cierra el cursor (generador) antes de devolver la conexión;
+            # tras un error la conexión puede ser inválida y no se reutiliza.
+            if batches is not None and hasattr(batches, "close"):
+                batches.close()
+            if failed:
+                ext.disconnect()
+            self.extractor.release_clone(ext)
+
+    def _put(self, q: queue.Queue, item: Any) -> bool:
+        """Encola respetando la cancelación; False si se canceló."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _consume(self, name: str) -> Iterator[list]:
+        """Genera los lotes de un stream hasta su marca de fin."""
+        q = self._queues.get(name)
+        if q is None:
+            raise RuntimeError(f"El stream '{name}' no fue iniciado")
+        while True:
+            item = q.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _StreamError):
+                raise item.error
+            yield item
+
+    @staticmethod
+    def _drain(q: queue.Queue) -> None:
+        """Vacía una cola para desbloquear productores en espera."""
+        try:
+            while True:
+                q.get_nowait()
+        except queue.Empty:
+            pass
@@ -0,0 +1,182 @@
+"""
+Versiones de datos por módulo para invalidar cachés de fragmentos.
+
+Cada módulo tiene un token de versión en la caché de Django que cambia
+cuando se escriben sus lecturas, eventos o datos propios. Las claves de
+fragmentos cacheados (p. ej. tarjetas del dashboard) incluyen ese token, de
+modo que una escritura las invalida sin borrar nada explícitamente.
+
+Los cambios se publican al confirmar la transacción (``on_commit``) y se
+agrupan por transacción: una carga masiva genera un solo ``set_many``.
+
+Los tokens de deltas (``delta_token``) permiten a un cliente pedir solo los
+módulos cuya versión cambió después de su última consulta.
+"""
+from __future__ import annotations
+
+import threading
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from typing import Dict, Iterable, Optional, Set
+
+from django.core.cache import cache
+from django.db import transaction
+
+VERSION_KEY = "data_version:module:{}"
+
+# Callback pendiente de la transacción en curso, por hilo y alias de conexión
+_pending = threading.local()
+
+# Margen de los tokens de deltas: una versión generada antes de leer pero
+# publicada después se reenvía en la consulta siguiente en lugar de perderse
+DELTA_SKEW_MS = 5_000
+
+
+def _new_token() -> str:
+    """Token ``<ms desde epoch en hex>-<aleatorio>``: único y con su fecha."""
+    return f"{time.time_ns() // 1_000_000:x}-{uuid.uuid4().hex[:6]}"
+
+
+def version_timestamp(token: str) -> Optional[datetime]:
+    """
+    Fecha en que se generó un token de versión.
+
+    Returns:
+        datetime aware (UTC), o None si el token no tiene fecha
+    """
+    prefix, sep, _ = str(token).partition("-")
+    if not sep:
+        return None
+    try:
+        return datetime.fromtimestamp(int(prefix, 16) / 1000, tz=dt_timezone.utc)
+    except (OverflowError, OSError, ValueError):
+        return None
+
+
+def get_module_versions(module_ids: Iterable[int]) -> Dict[int, str]:
+    """
+    Retorna el token de versión vigente de cada módulo.
+
+    Un módulo sin token (caché fría o entrada desalojada) recibe uno nuevo,
+    así nunca se reutiliza un fragmento calculado con una versión perdida.
+
+    Returns:
+        Dict module_id → token
+    """
+    keys = {module_id: VERSION_KEY.format(module_id) for module_id in module_ids}
+    stored = cache.get_many(keys.values())
+
+    versions = {}
+    for module_id, key in keys.items():
+        token = stored.get(key)
+        if token is None:
+            token = _new_token()
+            if not cache.add(key, token, timeout=None):
+                token = cache.get(key, token)
+        versions[module_id] = token
+    return versions
+
+
+def bump_module_versions(module_ids: Iterable[int]) -> None:
+    """
+    Invalida los fragmentos de los módulos indicados.
+
+    Dentro de una transacción el cambio se difiere al commit (un lector
+    concurrente nunca asocia la versión nueva a datos sin confirmar) y se
+    acumula con el resto de la transacción.
+    """
+    ids = {int(module_id) for module_id in module_ids}
+    if not ids:
+        return
+
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        _set_versions(ids)
+        return
+
+    registry = _pending.__dict__
+    pending = registry.get(connection.alias)
+    if pending is None:
+        pending = registry[connection.alias] = _PendingBump(connection.alias)
+    pending.ids |= ids
+    # Se registra en cada llamada: si un rollback (o el de un savepoint)
+    # descartó un registro anterior, este asegura que el commit lo publique.
+    # Las llamadas repetidas del mismo callback no hacen nada.
+    transaction.on_commit(pending)
+
+
+class _PendingBump:
+    """Callback ``on_commit`` que acumula los módulos de una transacción."""
+
+    def __init__(self, alias: str) -> None:
+        self.alias = alias
+        self.ids: Set[int] = set()
+        self.flushed = False
+
+    def __call__(self) -> None:
+        if self.flushed:
+            return
+        self.flushed = True
+        if _pending.__dict__.get(self.alias) is self:
+            del _pending.__dict__[self.alias]
+        _set_versions(self.ids)
+
+
+def _set_versions(ids: Iterable[int]) -> None:
+    cache.set_many(
+        {VERSION_KEY.format(module_id): _new_token() for module_id in ids},
+        timeout=None,
+    )
+
+
+def delta_token(scope: str) -> str:
+    """
+    Token ``<ms en hex>.<scope>`` para pedir los cambios posteriores.
+
+    La marca de tiempo queda ``DELTA_SKEW_MS`` antes de ahora: un módulo
+    que cambió justo antes de la consulta se puede reenviar una vez de más,
+    nunca omitir.
+
+    Args:
+        scope: Identifica la consulta (parámetros, fecha): un token de otro
+               scope no sirve para pedir deltas
+    """
+    return f"{time.time_ns() // 1_000_000 - DELTA_SKEW_MS:x}.{scope}"
+
+
+def parse_delta_token(token: str) -> tuple[datetime, str]:
+    """
+    Inverso de ``delta_token``.
+
+    Returns:
+        Tupla (fecha aware UTC, scope)
+
+    Raises:
+        ValueError: Si el token no tiene el formato esperado
+    """
+    prefix, sep, scope = str(token).partition(".")
+    if not sep or not scope:
+        raise ValueError(f"Token de versión inválido: {token}")
+    try:
+        return datetime.fromtimestamp(int(prefix, 16) / 1000, tz=dt_timezone.utc), scope
+    except (OverflowError, OSError, ValueError):
+        raise ValueError(f"Token de versión inválido: {token}")
+
+
+def changed_since(versions: Dict[int, str], since: datetime) -> Set[int]:
+    """
+    Módulos cuya versión se generó después de ``since``.
+
+    Un token sin fecha (formato anterior) es de antes de cualquier token de
+    deltas: cuenta como sin cambios.
+
+    Args:
+        versions: Dict module_id → token (ver ``get_module_versions``)
+    """
+    changed = set()
+    for module_id, token in versions.items():
+        stamp = version_timestamp(token)
+        if stamp is not None and stamp > since:
+            changed.add(module_id)
+    return changed
@@ -0,0 +1,267 @@
+"""
+Caché en disco de archivos exportados, direccionada por contenido.
+
+La clave de un artefacto se deriva de las versiones de datos de los módulos
+incluidos (``data_versions``) y de los parámetros de exportación: mientras no
+cambien, cada descarga reutiliza el mismo archivo. El directorio se acota a
+``EXPORT_CACHE_MAX_BYTES`` descartando primero los artefactos usados hace más
+tiempo (la fecha de modificación se actualiza en cada acierto).
+
+La generación concurrente de una misma clave se serializa con un archivo
+``.lock`` creado en forma exclusiva: el resto de los procesos espera el
+artefacto en lugar de generarlo otra vez.
+"""
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator, Sequence
+
+from django.conf import settings
+
+from .access_extractor import content_hash
+from .data_versions import get_module_versions
+from .projection_grid import MaintenanceProjectionGrid
+from .projection_xlsx import ProjectionXlsxWriter
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+def artifact_key(kind: str, module_ids: Iterable[int], **params) -> str:
+    """
+    Clave de un artefacto: tipo, parámetros y versión de datos de cada módulo.
+
+    Args:
+        kind: Tipo de exportación (ej: "projection_xlsx")
+        module_ids: Módulos incluidos en el archivo
+        **params: Parámetros que afectan el contenido (meses, km, fecha...)
+    """
+    versions = get_module_versions(module_ids)
+    return content_hash(
+        kind,
+        *(f"{name}={params[name]}" for name in sorted(params)),
+        *(f"{module_id}:{versions[module_id]}" for module_id in sorted(versions)),
+    )
+
+
+class ExportArtifactCache:
+    """
+    Directorio de artefactos exportados con desalojo LRU por tamaño.
+
+    Uso:
+        cache = ExportArtifactCache()
+        path = cache.get_or_build(key, ".xlsx", lambda f: exporter.export(..., f))
+    """
+
+    # Un lock más viejo que esto es de un proceso caído y se descarta
+    LOCK_TIMEOUT = 300
+    POLL_INTERVAL = 0.1
+
+    def __init__(self, directory: str | Path | None = None, max_bytes: int | None = None) -> None:
+        self.directory = Path(directory or settings.EXPORT_CACHE_DIR)
+        self.max_bytes = (
+            max_bytes if max_bytes is not None
+            else getattr(settings, "EXPORT_CACHE_MAX_BYTES", DEFAULT_MAX_BYTES)
+        )
+
+    def path_for(self, key: str, suffix: str) -> Path:
+        return self.directory / f"{key}{suffix}"
+
+    def get(self, key: str, suffix: str) -> Path | None:
+        """Ruta del artefacto si existe (y lo marca como recién usado)."""
+        path = self.path_for(key, suffix)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def get_or_build(
+        self,
+        key: str,
+        suffix: str,
+        build: Callable[[BinaryIO], None],
+        waiting: Callable[[], None] | None = None,
+    ) -> Path:
+        """
+        Retorna el artefacto de ``key``, generándolo si no está en caché.
+
+        Args:
+            key: Clave de ``artifact_key``
+            suffix: Extensión del archivo (ej: ".xlsx")
+            build: Escribe el contenido en el archivo binario recibido
+            waiting: Se llama en cada espera mientras otro proceso tiene el
+                     lock (hasta ``LOCK_TIMEOUT``)
+
+        Returns:
+            Ruta del artefacto (completo: se publica con un rename atómico)
+        """
+        path = self.get(key, suffix)
+        if path is not None:
+            return path
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        lock_path = self.directory / f"{key}.lock"
+        deadline = time.monotonic() + self.LOCK_TIMEOUT
+
+        locked = self._try_lock(lock_path)
+        while not locked:
+            # Otro proceso lo está generando: esperar su resultado
+            path = self.get(key, suffix)
+            if path is not None:
+                return path
+            if time.monotonic() > deadline:
+                break
+            if waiting is not None:
+                waiting()
+            time.sleep(self.POLL_INTERVAL)
+            locked = self._try_lock(lock_path)
+
+        try:
+            # Puede haberse publicado entre el primer get y el lock
+            path = self.get(key, suffix)
+            if path is not None:
+                return path
+
+            path = self.path_for(key, suffix)
+            fd, tmp_name = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as tmp_file:
+                    build(tmp_file)
+                os.replace(tmp_name, path)
+            except BaseException:
+                os.unlink(tmp_name)
+                raise
+        finally:
+            if locked:
+                lock_path.unlink(missing_ok=True)
+
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep: Path | None = None) -> int:
+        """
+        Borra los artefactos menos usados hasta respetar ``max_bytes``.
+
+        Args:
+            keep: Artefacto que no se borra aunque sea el único (el recién generado)
+
+        Returns:
+            Cantidad de archivos borrados
+        """
+        entries = []
+        total = 0
+        for path in self.directory.iterdir():
+            if path.suffix in (".lock", ".tmp"):
+                continue
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+            total += stat.st_size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                path.unlink()
+            except OSError:
+                # Borrado concurrente, o en Windows un archivo que se está enviando
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def _try_lock(self, lock_path: Path) -> bool:
+        """Crea el lock en forma exclusiva; descarta uno abandonado."""
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return True
+        except FileExistsError:
+            pass
+        try:
+            if time.time() - lock_path.stat().st_mtime > self.LOCK_TIMEOUT:
+                lock_path.unlink(missing_ok=True)
+        except FileNotFoundError:
+            pass
+        return False
+
+
+def projection_workbook_key(
+    module_ids: Iterable[int],
+    months_ahead: int,
+    monthly_km: int,
+    start_date: date,
+    exporter=None,
+) -> str:
+    """Clave del libro de proyección (ver ``projection_workbook``)."""
+    return artifact_key(
+        "projection_xlsx",
+        module_ids,
+        engine=type(exporter or ProjectionXlsxWriter()).__name__,
+        months=months_ahead,
+        monthly_km=monthly_km,
+        start=start_date.isoformat(),
+    )
+
+
+def projection_workbook(
+    modules: Sequence,
+    months_ahead: int,
+    monthly_km: int,
+    start_date: date,
+    exporter=None,
+    cache: ExportArtifactCache | None = None,
+    progress: Callable[[int], None] | None = None,
+    workers: int = 1,
+    waiting: Callable[[], None] | None = None,
+) -> Path:
+    """
+    Libro de proyección desde la caché, generándolo solo si cambió algo.
+
+    Args:
+        modules: FleetModules a incluir, en el orden de las filas
+        months_ahead: Meses a proyectar
+        monthly_km: Km promedio mensual
+        start_date: Fecha de inicio de la proyección
+        exporter: Escritor con ``export(projections, filepath, monthly_km)``
+                  (default: ProjectionXlsxWriter)
+        cache: Caché a usar (default: EXPORT_CACHE_DIR)
+        progress: Se llama con la cantidad de módulos proyectados hasta el
+                  momento (solo si hay que generar el libro)
+        workers: Procesos para proyectar (ver ``iter_for_modules_parallel``)
+        waiting: Se llama mientras otro proceso genera el mismo libro
+                 (ver ``ExportArtifactCache.get_or_build``)
+
+    Returns:
+        Ruta del .xlsx en la caché
+    """
+    exporter = exporter or ProjectionXlsxWriter()
+    key = projection_workbook_key(
+        [module.id for module in modules], months_ahead, monthly_km, start_date, exporter
+    )
+
+    def build(output: BinaryIO) -> None:
+        grid = MaintenanceProjectionGrid(monthly_km=monthly_km)
+        projections = grid.iter_for_modules(
+            modules, months_ahead=months_ahead, start_date=start_date, workers=workers
+        )
+        if progress is not None:
+            projections = _report_progress(projections, progress)
+        exporter.export(projections, output, monthly_km=monthly_km)
+
+    return (cache or ExportArtifactCache()).get_or_build(key, ".xlsx", build, waiting=waiting)
+
+
+def _report_progress(items: Iterable, progress: Callable[[int], None]) -> Iterator:
+    """Reenvía ``items`` informando cuántos se consumieron."""
+    for count, item in enumerate(items, start=1):
+        yield item
+        progress(count)
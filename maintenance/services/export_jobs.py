@@ -0,0 +1,191 @@
+"""
+Cola de exportaciones en la base de datos.
+
+La web encola un ``ExportJob`` y responde enseguida; ``run_export_worker``
+toma los jobs pendientes, genera el archivo en la caché de exportaciones
+(``export_cache``) e informa el avance por módulo. El cliente consulta el
+estado hasta que el job termina y luego descarga el archivo.
+
+La toma de un job es un UPDATE condicionado al estado ``PENDING``: si dos
+workers eligen el mismo job, solo uno actualiza la fila.
+"""
+from __future__ import annotations
+
+import os
+import socket
+import time
+from datetime import date, timedelta
+from pathlib import Path
+
+from django.utils import timezone
+
+from maintenance.models import ExportJob, FleetModule
+
+from .export_cache import ExportArtifactCache, projection_workbook, projection_workbook_key
+
+# Un job RUNNING sin avances durante este tiempo es de un worker caído. Supera
+# la espera máxima por el lock de la caché y deja margen para guardar el libro
+# después del último avance.
+DEFAULT_STALE_AFTER = timedelta(seconds=2 * ExportArtifactCache.LOCK_TIMEOUT)
+
+# Mientras espera el lock, el worker informa que sigue vivo cada este tiempo
+HEARTBEAT_INTERVAL = timedelta(seconds=30)
+
+# Avance informado cada 5% de los módulos (una escritura por paso)
+PROGRESS_STEPS = 20
+
+ACTIVE_STATUSES = (ExportJob.Status.PENDING, ExportJob.Status.RUNNING)
+
+
+def enqueue_projection_export(
+    modules: list[FleetModule],
+    months_ahead: int,
+    monthly_km: int,
+    start_date: date,
+) -> ExportJob:
+    """
+    Encola la exportación a Excel de la proyección.
+
+    Si ya hay un job activo con los mismos parámetros se reutiliza, y si el
+    libro ya está en la caché el job se crea terminado.
+
+    Returns:
+        Job nuevo o existente
+    """
+    module_ids = [module.id for module in modules]
+    params = {
+        "months": months_ahead,
+        "monthly_km": monthly_km,
+        "start_date": start_date.isoformat(),
+        "modules": module_ids,
+    }
+    existing = ExportJob.objects.filter(
+        kind=ExportJob.Kind.PROJECTION_XLSX, params=params, status__in=ACTIVE_STATUSES
+    ).first()
+    if existing is not None:
+        return existing
+
+    key = projection_workbook_key(module_ids, months_ahead, monthly_km, start_date)
+    cached = ExportArtifactCache().get(key, ".xlsx")
+    if cached is not None:
+        now = timezone.now()
+        return ExportJob.objects.create(
+            params=params,
+            status=ExportJob.Status.OK,
+            progress=len(module_ids),
+            total=len(module_ids),
+            artifact=cached.name,
+            started_at=now,
+            finished_at=now,
+        )
+
+    return ExportJob.objects.create(params=params, total=len(module_ids))
+
+
+def worker_name() -> str:
+    """Identificador del proceso worker (host:pid)."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim_next_job(worker: str) -> ExportJob | None:
+    """
+    Toma el job pendiente más antiguo.
+
+    Returns:
+        Job marcado RUNNING por este worker, o None si la cola está vacía
+    """
+    while True:
+        job = ExportJob.objects.filter(status=ExportJob.Status.PENDING).first()
+        if job is None:
+            return None
+
+        now = timezone.now()
+        claimed = ExportJob.objects.filter(pk=job.pk, status=ExportJob.Status.PENDING).update(
+            status=ExportJob.Status.RUNNING,
+            worker=worker,
+            started_at=now,
+            heartbeat_at=now,
+            progress=0,
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+        # Lo tomó otro worker: probar con el siguiente
+
+
+def run_job(job: ExportJob) -> ExportJob:
+    """
+    Genera el archivo de un job tomado con ``claim_next_job``.
+
+    Los errores quedan registrados en el job (no se propagan).
+
+    Returns:
+        El job con estado OK o ERROR
+    """
+    params = job.params
+    modules = list(FleetModule.objects.filter(id__in=params["modules"]).order_by("id"))
+    step = max(1, len(modules) // PROGRESS_STEPS)
+
+    last_heartbeat = time.monotonic()
+
+    def report(count: int) -> None:
+        nonlocal last_heartbeat
+        if count % step == 0 or count == len(modules):
+            ExportJob.objects.filter(pk=job.pk).update(
+                progress=count, heartbeat_at=timezone.now()
+            )
+            last_heartbeat = time.monotonic()
+
+    def waiting() -> None:
+        # Otro worker genera el mismo libro: sin avance propio, solo heartbeat
+        nonlocal last_heartbeat
+        if time.monotonic() - last_heartbeat >= HEARTBEAT_INTERVAL.total_seconds():
+            ExportJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now())
+            last_heartbeat = time.monotonic()
+
+    try:
+        path = projection_workbook(
+            modules,
+            months_ahead=params["months"],
+            monthly_km=params["monthly_km"],
+            start_date=date.fromisoformat(params["start_date"]),
+            progress=report,
+            waiting=waiting,
+        )
+    except Exception as e:
+        job.status = ExportJob.Status.ERROR
+        job.error = f"{type(e).__name__}: {e}"
+    else:
+        job.status = ExportJob.Status.OK
+        job.artifact = path.name
+        job.progress = len(modules)
+
+    job.total = len(modules)
+    job.finished_at = timezone.now()
+    job.save(update_fields=["status", "error", "artifact", "progress", "total", "finished_at"])
+    return job
+
+
+def requeue_stale_jobs(stale_after: timedelta = DEFAULT_STALE_AFTER) -> int:
+    """Devuelve a la cola los jobs RUNNING cuyo worker dejó de informar avance."""
+    return ExportJob.objects.filter(
+        status=ExportJob.Status.RUNNING,
+        heartbeat_at__lt=timezone.now() - stale_after,
+    ).update(status=ExportJob.Status.PENDING, worker="", progress=0)
+
+
+def prune_finished_jobs(keep: timedelta) -> int:
+    """Borra los jobs terminados hace más de ``keep``."""
+    deleted, _ = ExportJob.objects.filter(
+        status__in=(ExportJob.Status.OK, ExportJob.Status.ERROR),
+        finished_at__lt=timezone.now() - keep,
+    ).delete()
+    return deleted
+
+
+def job_artifact(job: ExportJob) -> Path | None:
+    """Ruta del archivo de un job terminado, si sigue en la caché."""
+    if job.status != ExportJob.Status.OK or not job.artifact:
+        return None
+    path = Path(job.artifact)
+    return ExportArtifactCache().get(path.stem, path.suffix)
@@ -0,0 +1,56 @@
+"""
+Selección del backend de extracción de datos legacy.
+
+Backends disponibles:
+- ``odbc``: Access vía pyodbc (producción, Windows)
+- ``sqlite``: stand-in SQLite con el mismo esquema (Linux, tests, benchmarks)
+"""
+from __future__ import annotations
+
+from django.conf import settings
+
+from .access_extractor import AccessExtractor, BaseExtractor
+from .sqlite_extractor import SQLiteExtractor
+
+EXTRACTOR_BACKENDS: dict[str, type[BaseExtractor]] = {
+    "odbc": AccessExtractor,
+    "sqlite": SQLiteExtractor,
+}
+
+
+def create_extractor(
+    backend: str | None = None,
+    source: str | None = None,
+) -> BaseExtractor:
+    """
+    Crea el extractor configurado.
+
+    Args:
+        backend: Clave de ``EXTRACTOR_BACKENDS`` (default: ACCESS_EXTRACTOR_BACKEND)
+        source: Connection string u origen del backend (default: settings)
+
+    Raises:
+        ValueError: Si el backend no existe o falta el origen de datos
+    """
+    backend = backend or getattr(settings, "ACCESS_EXTRACTOR_BACKEND", "odbc")
+    if backend not in EXTRACTOR_BACKENDS:
+        raise ValueError(
+            f"Backend de extracción desconocido: {backend}. "
+            f"Opciones: {', '.join(sorted(EXTRACTOR_BACKENDS))}"
+        )
+
+    if not source:
+        if backend == "odbc":
+            if getattr(settings, "ACCESS_DATABASE_PATH", ""):
+                source = getattr(settings, "ACCESS_CONNECTION_STRING", None)
+        else:
+            source = getattr(settings, "ACCESS_SQLITE_PATH", None)
+
+    if not source:
+        setting = "ACCESS_DB_PATH" if backend == "odbc" else "ACCESS_SQLITE_PATH"
+        raise ValueError(
+            f"Falta {setting} en .env para el backend '{backend}'. "
+            "Ver INSTALACION.md para configuración."
+        )
+
+    return EXTRACTOR_BACKENDS[backend](source)
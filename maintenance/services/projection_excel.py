@@ -1,15 +1,24 @@
 """
 Exportador de proyecciones a Excel con formato condicional.
 Replica el estilo y colores del código VB Materfer.
+
+Usa el modo write-only de openpyxl: las filas se escriben a medida que se
+producen y los estilos son ``NamedStyle`` registrados una vez por libro, de
+modo que la memoria no crece con el tamaño de la grilla.
 """
 from __future__ import annotations
 
+from collections.abc import Iterable, Mapping
+from copy import copy
 from datetime import date
-from typing import TYPE_CHECKING
+from typing import IO, TYPE_CHECKING
 
 from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.styles.fonts import DEFAULT_FONT
 from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.worksheet import Worksheet
 
 if TYPE_CHECKING:
     from .projection_grid import ModuleProjectionRow
@@ -50,226 +59,203 @@ class ProjectionExcelExporter:
         }
     }
     
+    # Columnas fijas antes de los meses y sus anchos
+    FIXED_COLUMNS = [
+        ('N° Módulo', 12),
+        ('Intervención', 12),
+        ('Fecha Último Evento', 18),
+        ('Km Acumulado', 15),
+    ]
+    MONTH_COLUMN_WIDTH = 12
+    TITLE_MERGE = 'A1:F1'
+    
+    # Todas las celdas son valores: el libro no necesita recálculo (excel_recalc)
+    WRITES_FORMULAS = False
+    
     def export(
         self,
-        projections: dict[int, list[ModuleProjectionRow]],
-        filepath: str,
+        projections: Mapping[int, list[ModuleProjectionRow]] | Iterable[tuple[int, list[ModuleProjectionRow]]],
+        filepath: str | IO[bytes],
         monthly_km: int = 12_500
     ) -> None:
         """
         Exporta proyecciones a archivo Excel.
         
         Args:
-            projections: Dict con proyecciones por módulo
-            filepath: Ruta del archivo a crear
+            projections: Dict con proyecciones por módulo, o iterable de
+                (module_id, filas) en orden (p. ej.
+                ``MaintenanceProjectionGrid.iter_for_modules``) para escribir
+                cada módulo apenas se proyecta
+            filepath: Ruta del archivo a crear o archivo binario abierto
             monthly_km: Km promedio mensual usado en proyección
         """
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "Proyección Mantenimiento"
+        if isinstance(projections, Mapping):
+            modules = ((module_id, projections[module_id]) for module_id in sorted(projections))
+        else:
+            modules = iter(projections)
         
-        # Configuración de página
-        self._setup_sheet(ws)
+        # Los encabezados de meses salen del primer módulo
+        first = next(modules, None)
+        num_months = len(first[1][0].cells) if first else 0
         
-        # Información de parámetros
-        current_row = self._add_header(ws, monthly_km)
+        wb = Workbook(write_only=True)
+        self._register_styles(wb)
+        ws = wb.create_sheet("Proyección Mantenimiento")
         
-        # Encabezados de columnas
-        current_row = self._add_column_headers(ws, current_row, projections)
+        # Configuración de página y anchos (antes de escribir filas)
+        self._setup_sheet(ws)
+        self._adjust_column_widths(ws, num_months)
         
-        # Datos de proyección por módulo
-        for module_id in sorted(projections.keys()):
-            rows = projections[module_id]
-            current_row = self._add_module_data(ws, current_row, rows)
+        # Información de parámetros
+        self._add_header(ws, monthly_km)
         
-        # Ajustar anchos de columna
-        self._adjust_column_widths(ws)
+        if first is not None:
+            # Encabezados de columnas
+            self._add_column_headers(ws, first[1])
+            
+            # Datos de proyección por módulo
+            self._add_module_data(ws, first[1])
+            for _, rows in modules:
+                self._add_module_data(ws, rows)
         
         # Guardar archivo
         wb.save(filepath)
     
+    def _register_styles(self, wb: Workbook) -> None:
+        """Registra en el libro los estilos con nombre de todas las celdas"""
+        thin = Side(style='thin')
+        thin_border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        centered = Alignment(horizontal='center', vertical='center')
+        right = Alignment(horizontal='right', vertical='center')
+        
+        styles = [
+            NamedStyle('proj_title', font=Font(bold=True, size=14), alignment=Alignment(horizontal='center')),
+            NamedStyle('proj_info', font=Font(size=10)),
+            NamedStyle('proj_input', font=Font(size=10, color='0000FF')),  # Azul para inputs
+            NamedStyle(
+                'proj_header',
+                font=Font(bold=True, size=10),
+                alignment=centered,
+                fill=PatternFill(start_color='CCCCCC', end_color='CCCCCC', fill_type='solid'),
+                border=thin_border,
+            ),
+            NamedStyle('proj_module', font=Font(bold=True, size=10), alignment=centered),
+            NamedStyle('proj_date', font=copy(DEFAULT_FONT), alignment=centered),
+            NamedStyle('proj_initial_km', font=copy(DEFAULT_FONT), number_format='#,##0', alignment=right),
+            NamedStyle(
+                'proj_reset',
+                font=Font(bold=True, size=10),
+                alignment=centered,
+                fill=self._fill(self.COLORS["reset"]["bg"]),
+                border=thin_border,
+            ),
+            NamedStyle(
+                'proj_km',
+                font=copy(DEFAULT_FONT),
+                number_format='#,##0',
+                alignment=right,
+                border=thin_border,
+            ),
+        ]
+        for maint_type in ("DA", "P", "BI", "A"):
+            colors = self.COLORS[maint_type]
+            # Color del tipo según jerarquía
+            styles.append(NamedStyle(
+                f'proj_type_{maint_type}',
+                font=Font(bold=True, size=10, color=colors["text"]),
+                alignment=centered,
+            ))
+            # Formato condicional: celda que excede el umbral
+            styles.append(NamedStyle(
+                f'proj_exceeds_{maint_type}',
+                font=Font(color=colors["text"], size=10),
+                fill=self._fill(colors["bg"]),
+                number_format='#,##0',
+                alignment=right,
+                border=thin_border,
+            ))
+        
+        for style in styles:
+            wb.add_named_style(style)
+    
+    @staticmethod
+    def _fill(color: str) -> PatternFill:
+        return PatternFill(start_color=color, end_color=color, fill_type='solid')
+    
+    @staticmethod
+    def _cell(ws, value, style: str) -> WriteOnlyCell:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style
+        return cell
+    
     def _setup_sheet(self, ws) -> None:
         """Configuración inicial de la hoja"""
         # Configurar orientación y márgenes
-        ws.page_setup.orientation = ws.ORIENTATION_LANDSCAPE
-        ws.page_setup.paperSize = ws.PAPERSIZE_A4
+        ws.page_setup.orientation = Worksheet.ORIENTATION_LANDSCAPE
+        ws.page_setup.paperSize = Worksheet.PAPERSIZE_A4
     
-    def _add_header(self, ws, monthly_km: int) -> int:
-        """Agrega header con información de parámetros"""
+    def _add_header(self, ws, monthly_km: int) -> None:
+        """Agrega header con información de parámetros (filas 1-4)"""
         # Título
-        ws['A1'] = 'PROYECCIÓN DE MANTENIMIENTO - FLOTA CSR'
-        ws['A1'].font = Font(bold=True, size=14)
-        ws['A1'].alignment = Alignment(horizontal='center')
-        ws.merge_cells('A1:F1')
+        ws.append([self._cell(ws, 'PROYECCIÓN DE MANTENIMIENTO - FLOTA CSR', 'proj_title')])
+        ws.merged_cells.add(self.TITLE_MERGE)
         
         # Fecha de generación
-        ws['A2'] = f'Fecha de generación: {date.today().strftime("%d/%m/%Y")}'
-        ws['A2'].font = Font(size=10)
+        ws.append([self._cell(
+            ws, f'Fecha de generación: {date.today().strftime("%d/%m/%Y")}', 'proj_info'
+        )])
         
         # Km promedio mensual
-        ws['A3'] = f'Km promedio mensual: {monthly_km:,} km'
-        ws['A3'].font = Font(size=10, color='0000FF')  # Azul para inputs
+        ws.append([self._cell(ws, f'Km promedio mensual: {monthly_km:,} km', 'proj_input')])
         
-        return 5  # Fila donde empezar los datos
+        # Fila en blanco antes de los datos
+        ws.append([])
     
-    def _add_column_headers(
-        self,
-        ws,
-        start_row: int,
-        projections: dict[int, list[ModuleProjectionRow]]
-    ) -> int:
+    def _add_column_headers(self, ws, first_rows: list[ModuleProjectionRow]) -> None:
         """Agrega encabezados de columnas"""
-        # Obtener cantidad de meses de la primera proyección
-        first_module = next(iter(projections.values()))
-        num_months = len(first_module[0].cells)
-        
-        headers = [
-            'N° Módulo',
-            'Intervención',
-            'Fecha Último Evento',
-            'Km Acumulado'
-        ]
+        headers = [name for name, _ in self.FIXED_COLUMNS]
         
         # Agregar headers de meses
-        for cell in first_module[0].cells:
+        for cell in first_rows[0].cells:
             headers.append(cell.month_date.strftime('%b %y'))
         
-        # Escribir headers
-        for col, header in enumerate(headers, start=1):
-            cell = ws.cell(row=start_row, column=col, value=header)
-            cell.font = Font(bold=True, size=10)
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-            cell.fill = PatternFill(start_color='CCCCCC', end_color='CCCCCC', fill_type='solid')
-            
-            # Bordes
-            thin_border = Border(
-                left=Side(style='thin'),
-                right=Side(style='thin'),
-                top=Side(style='thin'),
-                bottom=Side(style='thin')
-            )
-            cell.border = thin_border
-        
-        return start_row + 1
+        ws.append([self._cell(ws, header, 'proj_header') for header in headers])
     
-    def _add_module_data(
-        self,
-        ws,
-        start_row: int,
-        rows: list[ModuleProjectionRow]
-    ) -> int:
-        """Agrega datos de un módulo (4 filas: DA, P, BI, A)"""
-        current_row = start_row
-        
+    def _add_module_data(self, ws, rows: list[ModuleProjectionRow]) -> None:
+        """Agrega datos de un módulo (4 filas: DA, P, BI, A) y una fila de separación"""
         for row in rows:
-            # Columna 1: N° Módulo
-            cell = ws.cell(row=current_row, column=1, value=row.module_id)
-            cell.font = Font(bold=True, size=10)
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-            
-            # Columna 2: Tipo de Intervención
-            cell = ws.cell(row=current_row, column=2, value=row.intervention_type)
-            cell.font = Font(bold=True, size=10)
-            cell.alignment = Alignment(horizontal='center', vertical='center')
-            
-            # Color del tipo según jerarquía
-            color = self.COLORS[row.intervention_type]["text"]
-            cell.font = Font(bold=True, size=10, color=color)
-            
-            # Columna 3: Fecha último evento
+            maint_type = row.intervention_type
             date_str = (
-                row.last_event_date.strftime('%d/%m/%Y') 
-                if row.last_event_date 
+                row.last_event_date.strftime('%d/%m/%Y')
+                if row.last_event_date
                 else 'N/A'
             )
-            cell = ws.cell(row=current_row, column=3, value=date_str)
-            cell.alignment = Alignment(horizontal='center', vertical='center')
+            values = [
+                self._cell(ws, row.module_id, 'proj_module'),
+                self._cell(ws, maint_type, f'proj_type_{maint_type}'),
+                self._cell(ws, date_str, 'proj_date'),
+                self._cell(ws, row.initial_km, 'proj_initial_km'),
+            ]
             
-            # Columna 4: Km inicial acumulado
-            cell = ws.cell(row=current_row, column=4, value=row.initial_km)
-            cell.number_format = '#,##0'
-            cell.alignment = Alignment(horizontal='right', vertical='center')
-            
-            # Aplicar formato condicional
-            self._apply_cell_format(
-                cell,
-                row.initial_km,
-                row.intervention_type,
-                False
-            )
-            
-            # Columnas 5+: Proyección mensual
-            for idx, grid_cell in enumerate(row.cells, start=5):
-                cell = ws.cell(row=current_row, column=idx)
-                
-                # Si hay reseteo, mostrar código de intervención
+            # Proyección mensual: código de intervención en reseteos, km en el resto
+            exceeds_style = f'proj_exceeds_{maint_type}'
+            for grid_cell in row.cells:
                 if grid_cell.is_reset_point:
-                    cell.value = grid_cell.intervention_code
-                    cell.font = Font(bold=True, size=10)
-                    cell.alignment = Alignment(horizontal='center', vertical='center')
-                    # Color gris para reseteos
-                    cell.fill = PatternFill(
-                        start_color=self.COLORS["reset"]["bg"],
-                        end_color=self.COLORS["reset"]["bg"],
-                        fill_type='solid'
-                    )
+                    values.append(self._cell(ws, grid_cell.intervention_code, 'proj_reset'))
+                elif grid_cell.exceeds_threshold:
+                    values.append(self._cell(ws, grid_cell.km_accumulated, exceeds_style))
                 else:
-                    # Mostrar km acumulado
-                    cell.value = grid_cell.km_accumulated
-                    cell.number_format = '#,##0'
-                    cell.alignment = Alignment(horizontal='right', vertical='center')
-                    
-                    # Aplicar formato condicional
-                    self._apply_cell_format(
-                        cell,
-                        grid_cell.km_accumulated,
-                        row.intervention_type,
-                        grid_cell.exceeds_threshold
-                    )
-                
-                # Bordes
-                thin_border = Border(
-                    left=Side(style='thin'),
-                    right=Side(style='thin'),
-                    top=Side(style='thin'),
-                    bottom=Side(style='thin')
-                )
-                cell.border = thin_border
+                    values.append(self._cell(ws, grid_cell.km_accumulated, 'proj_km'))
             
-            current_row += 1
+            ws.append(values)
         
         # Espacio entre módulos
-        return current_row + 1
+        ws.append([])
     
-    def _apply_cell_format(
-        self,
-        cell,
-        km_value: int,
-        intervention_type: str,
-        exceeds_threshold: bool
-    ) -> None:
-        """Aplica formato condicional a una celda según su valor"""
-        if exceeds_threshold:
-            colors = self.COLORS[intervention_type]
-            cell.fill = PatternFill(
-                start_color=colors["bg"],
-                end_color=colors["bg"],
-                fill_type='solid'
-            )
-            cell.font = Font(color=colors["text"], size=10)
-    
-    def _adjust_column_widths(self, ws) -> None:
-        """Ajusta ancho de columnas automáticamente"""
-        column_widths = {
-            1: 12,  # N° Módulo
-            2: 12,  # Intervención
-            3: 18,  # Fecha
-            4: 15,  # Km Acumulado
-        }
-        
-        # Columnas de meses (ancho estándar)
-        for col in range(5, ws.max_column + 1):
-            column_widths[col] = 12
+    def _adjust_column_widths(self, ws, num_months: int) -> None:
+        """Ancho fijo por columna"""
+        widths = [width for _, width in self.FIXED_COLUMNS]
+        widths += [self.MONTH_COLUMN_WIDTH] * num_months
         
-        for col, width in column_widths.items():
+        for col, width in enumerate(widths, start=1):
             ws.column_dimensions[get_column_letter(col)].width = width
@@ -4,10 +4,15 @@ Implementa lógica de reseteo en cascada idéntica al código VB Materfer.
 """
 from __future__ import annotations
 
-from dataclasses import dataclass
+import bisect
+import json
+import math
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, replace
 from datetime import date, timedelta
 from decimal import Decimal
-from typing import TYPE_CHECKING
+from functools import partial
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator
 
 if TYPE_CHECKING:
     from maintenance.models import FleetModule, MaintenanceEvent
@@ -32,6 +37,34 @@ class ModuleProjectionRow:
     cells: list[GridCell]
 
 
+@dataclass
+class ModuleInputs:
+    """
+    Datos de entrada de la proyección de un módulo (serializables).
+    
+    Con ``km_since`` completo la proyección no consulta la base de datos:
+    es lo que se envía a los procesos de ``iter_for_modules_parallel``.
+    """
+    module_id: int
+    total_accumulated_km: int
+    last_event_dates: dict[str, date]  # Tipo de grilla -> fecha del último evento
+    km_since: dict[date, int] = field(default_factory=dict)  # Km después de cada fecha
+
+
+def _project_chunk(
+    monthly_km: int,
+    months_ahead: int,
+    start_date: date,
+    chunk: list[ModuleInputs]
+) -> list[tuple[int, list[ModuleProjectionRow]]]:
+    """Proyecta un lote de módulos en un proceso del pool."""
+    service = MaintenanceProjectionGrid(monthly_km=monthly_km)
+    return [
+        (inputs.module_id, service.project_inputs(inputs, months_ahead, start_date))
+        for inputs in chunk
+    ]
+
+
 class MaintenanceProjectionGrid:
     """
     Genera grilla de proyección de mantenimiento.
@@ -98,19 +131,56 @@ class MaintenanceProjectionGrid:
         if start_date is None:
             start_date = date.today()
         
-        # Obtener último evento de cada tipo
+        # Obtener fecha del último evento de cada tipo
         last_events = self._get_last_events_by_type(module)
+        inputs = ModuleInputs(
+            module_id=module.id,
+            total_accumulated_km=module.total_accumulated_km or 0,
+            last_event_dates={
+                maint_type: event.event_date for maint_type, event in last_events.items()
+            },
+        )
+        
+        return self.project_inputs(
+            inputs,
+            months_ahead,
+            start_date,
+            km_since=lambda event_date: self._calculate_km_since_date(module, event_date)
+        )
+    
+    def project_inputs(
+        self,
+        inputs: ModuleInputs,
+        months_ahead: int,
+        start_date: date,
+        km_since: Callable[[date], int] | None = None
+    ) -> list[ModuleProjectionRow]:
+        """
+        Proyecta un módulo a partir de sus datos de entrada, sin consultar la BD.
         
+        Args:
+            inputs: Km acumulados, fechas de últimos eventos y km posteriores
+            months_ahead: Cantidad de meses a proyectar
+            start_date: Fecha de inicio
+            km_since: Km recorridos después de una fecha (default: ``inputs.km_since``)
+            
+        Returns:
+            Lista de 4 filas (DA, P, BI, A) con proyección mes a mes
+        """
         # Calcular km inicial para cada tipo según lógica de jerarquía
-        initial_kms = self._calculate_initial_kms(module, last_events)
+        initial_kms = self._calculate_initial_kms(
+            inputs.total_accumulated_km,
+            inputs.last_event_dates,
+            km_since or inputs.km_since.__getitem__
+        )
         
         # Generar filas de proyección
         rows = []
         for maint_type in self.HIERARCHY:
             row = self._generate_row(
-                module=module,
+                module_id=inputs.module_id,
                 maint_type=maint_type,
-                last_event=last_events.get(maint_type),
+                last_event_date=inputs.last_event_dates.get(maint_type),
                 initial_km=initial_kms[maint_type],
                 start_date=start_date,
                 months_ahead=months_ahead
@@ -131,11 +201,163 @@ class MaintenanceProjectionGrid:
         Returns:
             Dict con module_id como key y lista de filas como value
         """
-        return {
-            module.id: self.generate_for_module(
-                module, months_ahead, start_date
+        return dict(self.iter_for_modules(modules, months_ahead, start_date))
+    
+    def iter_for_modules(
+        self,
+        modules: Iterable[FleetModule],
+        months_ahead: int = 24,
+        start_date: date | None = None,
+        workers: int = 1
+    ) -> Iterator[tuple[int, list[ModuleProjectionRow]]]:
+        """
+        Genera la proyección módulo a módulo, a medida que se consume.
+        
+        Args:
+            workers: Con más de 1, usa ``iter_for_modules_parallel``
+        
+        Yields:
+            Tuplas (module_id, filas) en el orden de ``modules``
+        """
+        if workers > 1:
+            yield from self.iter_for_modules_parallel(modules, months_ahead, start_date, workers)
+            return
+        for module in modules:
+            yield module.id, self.generate_for_module(module, months_ahead, start_date)
+    
+    def iter_for_modules_parallel(
+        self,
+        modules: Iterable[FleetModule],
+        months_ahead: int = 24,
+        start_date: date | None = None,
+        workers: int = 2,
+        chunk_size: int | None = None
+    ) -> Iterator[tuple[int, list[ModuleProjectionRow]]]:
+        """
+        Igual que ``iter_for_modules``, repartiendo la proyección en procesos.
+        
+        Los datos de entrada de todos los módulos se cargan de una vez
+        (``load_module_inputs``); cada proceso recibe lotes de módulos y no
+        consulta la base de datos. El resultado es idéntico al serial y en
+        el mismo orden.
+        
+        Args:
+            workers: Procesos del pool
+            chunk_size: Módulos por lote (default: ~4 lotes por proceso)
+        
+        Yields:
+            Tuplas (module_id, filas) en el orden de ``modules``
+        """
+        if start_date is None:
+            start_date = date.today()
+        
+        inputs = self.load_module_inputs(modules)
+        if not inputs:
+            return
+        if chunk_size is None:
+            chunk_size = max(1, math.ceil(len(inputs) / (workers * 4)))
+        chunks = [inputs[i:i + chunk_size] for i in range(0, len(inputs), chunk_size)]
+        
+        project = partial(_project_chunk, self.monthly_km, months_ahead, start_date)
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+            for projected in executor.map(project, chunks):
+                yield from projected
+    
+    def load_module_inputs(self, modules: Iterable[FleetModule]) -> list[ModuleInputs]:
+        """
+        Carga en dos consultas los datos de entrada de varios módulos.
+        
+        Returns:
+            ``ModuleInputs`` con ``km_since`` completo, en el orden de ``modules``
+        """
+        from maintenance.models import MaintenanceEvent, OdometerLog
+        
+        modules = list(modules)
+        module_ids = [module.id for module in modules]
+        
+        # Fecha del último evento por módulo y tipo (solo la fecha afecta la proyección)
+        last_dates: dict[int, dict[str, date]] = {module_id: {} for module_id in module_ids}
+        events = (
+            MaintenanceEvent.objects
+            .filter(
+                fleet_module_id__in=module_ids,
+                profile__code__in=list(self.PROFILE_TO_GRID_CODE),
+            )
+            .values_list('fleet_module_id', 'profile__code', 'event_date')
+        )
+        for module_id, profile_code, event_date in events:
+            maint_type = self.PROFILE_TO_GRID_CODE[profile_code]
+            previous = last_dates[module_id].get(maint_type)
+            if previous is None or event_date > previous:
+                last_dates[module_id][maint_type] = event_date
+        
+        # Km posteriores a cada fecha: sumas acumuladas desde el final por módulo
+        needed = {module_id: set(dates.values()) for module_id, dates in last_dates.items() if dates}
+        readings: dict[int, tuple[list[date], list[int]]] = {
+            module_id: ([], []) for module_id in needed
+        }
+        if needed:
+            logs = (
+                OdometerLog.objects
+                .filter(
+                    fleet_module_id__in=list(needed),
+                    reading_date__gt=min(min(dates) for dates in needed.values()),
+                )
+                .order_by('fleet_module_id', 'reading_date')
+                .values_list('fleet_module_id', 'reading_date', 'daily_delta_km')
             )
-            for module in modules
+            for module_id, reading_date, delta in logs:
+                dates, deltas = readings[module_id]
+                dates.append(reading_date)
+                deltas.append(delta or 0)
+        
+        result = []
+        for module in modules:
+            km_since = {}
+            if module.id in needed:
+                dates, deltas = readings[module.id]
+                suffix_sums = [0] * (len(deltas) + 1)
+                for i in range(len(deltas) - 1, -1, -1):
+                    suffix_sums[i] = suffix_sums[i + 1] + deltas[i]
+                for event_date in needed[module.id]:
+                    km_since[event_date] = int(suffix_sums[bisect.bisect_right(dates, event_date)])
+            result.append(ModuleInputs(
+                module_id=module.id,
+                total_accumulated_km=module.total_accumulated_km or 0,
+                last_event_dates=last_dates[module.id],
+                km_since=km_since,
+            ))
+        return result
+    
+    @classmethod
+    def window(
+        cls,
+        projections: dict[int, list[ModuleProjectionRow]],
+        types: list[str] | None = None,
+        month_from: int = 1,
+        month_to: int | None = None
+    ) -> dict[int, list[ModuleProjectionRow]]:
+        """
+        Recorta proyecciones a ciertos tipos y a una ventana de meses.
+        
+        Args:
+            projections: Resultado de ``generate_for_all_modules``
+            types: Tipos a conservar (default: todos, en orden de jerarquía)
+            month_from: Primer mes de la ventana (1 = mes siguiente al inicio)
+            month_to: Último mes de la ventana, inclusive (default: todos)
+            
+        Returns:
+            Dict con la misma forma, con filas y celdas recortadas
+        """
+        keep = [t for t in cls.HIERARCHY if types is None or t in types]
+        cells = slice(month_from - 1, month_to)
+        return {
+            module_id: [
+                replace(row, cells=row.cells[cells])
+                for row in rows
+                if row.intervention_type in keep
+            ]
+            for module_id, rows in projections.items()
         }
     
     def _get_last_events_by_type(
@@ -161,8 +383,9 @@ class MaintenanceProjectionGrid:
     
     def _calculate_initial_kms(
         self,
-        module: FleetModule,
-        last_events: dict[str, MaintenanceEvent]
+        total_accumulated_km: int,
+        last_event_dates: dict[str, date],
+        km_since: Callable[[date], int]
     ) -> dict[str, int]:
         """
         Calcula km inicial para cada tipo según lógica de jerarquía.
@@ -177,7 +400,7 @@ class MaintenanceProjectionGrid:
         initial_kms = {}
         
         # DA siempre desde 0 (aún no hay eventos DA)
-        initial_kms["DA"] = module.total_accumulated_km or 0
+        initial_kms["DA"] = total_accumulated_km
         
         # Para cada tipo, verificar si hay un evento superior más reciente
         for idx, maint_type in enumerate(self.HIERARCHY[1:], start=1):
@@ -185,17 +408,14 @@ class MaintenanceProjectionGrid:
             superior_types = self.HIERARCHY[:idx]
             
             # Fecha del último evento de este tipo
-            current_event = last_events.get(maint_type)
-            current_date = current_event.event_date if current_event else None
+            current_date = last_event_dates.get(maint_type)
             
             # Buscar el evento superior más reciente
-            most_recent_superior = None
             most_recent_superior_date = None
             
             for sup_type in superior_types:
-                sup_event = last_events.get(sup_type)
-                if sup_event:
-                    sup_date = sup_event.event_date
+                sup_date = last_event_dates.get(sup_type)
+                if sup_date:
                     # Si no hay fecha actual O el superior es más reciente
                     if (current_date is None or 
                         sup_date > current_date or
@@ -203,38 +423,33 @@ class MaintenanceProjectionGrid:
                          self.HIERARCHY.index(sup_type) < self.HIERARCHY.index(maint_type))):
                         if (most_recent_superior_date is None or 
                             sup_date > most_recent_superior_date):
-                            most_recent_superior = sup_event
                             most_recent_superior_date = sup_date
             
             # Determinar km inicial
-            if most_recent_superior:
+            if most_recent_superior_date:
                 # Hay un evento superior más reciente: usar sus km
-                initial_kms[maint_type] = self._calculate_km_since_event(
-                    module, most_recent_superior
-                )
-            elif current_event:
+                initial_kms[maint_type] = km_since(most_recent_superior_date)
+            elif current_date:
                 # Usar km desde último evento de este tipo
-                initial_kms[maint_type] = self._calculate_km_since_event(
-                    module, current_event
-                )
+                initial_kms[maint_type] = km_since(current_date)
             else:
                 # No hay eventos: usar km total del módulo
-                initial_kms[maint_type] = module.total_accumulated_km or 0
+                initial_kms[maint_type] = total_accumulated_km
         
         return initial_kms
     
-    def _calculate_km_since_event(
+    def _calculate_km_since_date(
         self,
         module: FleetModule,
-        event: MaintenanceEvent
+        event_date: date
     ) -> int:
-        """Calcula km recorridos desde un evento"""
+        """Calcula km recorridos desde la fecha de un evento"""
         from maintenance.models import OdometerLog
         
         # Sumar todos los km desde la fecha del evento
         logs_since = OdometerLog.objects.filter(
             fleet_module=module,
-            reading_date__gt=event.event_date
+            reading_date__gt=event_date
         ).order_by('reading_date')
         
         km_since = sum(log.daily_delta_km or 0 for log in logs_since)
@@ -242,9 +457,9 @@ class MaintenanceProjectionGrid:
     
     def _generate_row(
         self,
-        module: FleetModule,
+        module_id: int,
         maint_type: str,
-        last_event: MaintenanceEvent | None,
+        last_event_date: date | None,
         initial_km: int,
         start_date: date,
         months_ahead: int
@@ -282,9 +497,9 @@ class MaintenanceProjectionGrid:
             cells.append(cell)
         
         return ModuleProjectionRow(
-            module_id=module.id,
+            module_id=module_id,
             intervention_type=maint_type,
-            last_event_date=last_event.event_date if last_event else None,
+            last_event_date=last_event_date,
             initial_km=initial_km,
             cells=cells
         )
@@ -321,23 +536,110 @@ class MaintenanceProjectionGrid:
             }
             
             for row in rows:
-                row_data = {
-                    "intervention_type": row.intervention_type,
-                    "last_event_date": row.last_event_date.isoformat() if row.last_event_date else None,
-                    "initial_km": row.initial_km,
-                    "cells": [
-                        {
-                            "month": cell.month_date.strftime("%b %y"),
-                            "km": cell.km_accumulated,
-                            "intervention": cell.intervention_code,
-                            "is_reset": cell.is_reset_point,
-                            "exceeds": cell.exceeds_threshold,
-                        }
-                        for cell in row.cells
-                    ]
-                }
-                module_data["rows"].append(row_data)
+                module_data["rows"].append(self._row_to_dict(row))
             
             result["modules"].append(module_data)
         
         return result
+    
+    def iter_ndjson(
+        self,
+        projections: Iterable[tuple[int, list[ModuleProjectionRow]]],
+        header: dict | None = None
+    ) -> Iterator[str]:
+        """
+        Exporta proyecciones como NDJSON: una línea por fila, a medida que se
+        consumen las proyecciones.
+        
+        La primera línea es ``{"type": "header", "monthly_km": ..., **header}``;
+        cada fila es ``{"type": "row", "module_id": ...}`` con los mismos
+        campos que las filas de ``export_to_dict``.
+        
+        Args:
+            projections: Iterador (module_id, filas) como ``iter_for_modules``
+            header: Campos adicionales de la línea de encabezado
+            
+        Yields:
+            Líneas JSON terminadas en salto de línea
+        """
+        def dumps(data: dict) -> str:
+            return json.dumps(data, separators=(",", ":"), ensure_ascii=False) + "\n"
+        
+        yield dumps({"type": "header", "monthly_km": self.monthly_km, **(header or {})})
+        for module_id, rows in projections:
+            for row in rows:
+                yield dumps({"type": "row", "module_id": module_id, **self._row_to_dict(row)})
+    
+    @staticmethod
+    def _row_to_dict(row: ModuleProjectionRow) -> dict:
+        """Fila en el formato de ``export_to_dict``."""
+        return {
+            "intervention_type": row.intervention_type,
+            "last_event_date": row.last_event_date.isoformat() if row.last_event_date else None,
+            "initial_km": row.initial_km,
+            "cells": [
+                {
+                    "month": cell.month_date.strftime("%b %y"),
+                    "km": cell.km_accumulated,
+                    "intervention": cell.intervention_code,
+                    "is_reset": cell.is_reset_point,
+                    "exceeds": cell.exceeds_threshold,
+                }
+                for cell in row.cells
+            ]
+        }
+    
+    def export_to_columnar(
+        self,
+        projections: dict[int, list[ModuleProjectionRow]]
+    ) -> dict:
+        """
+        Exporta proyecciones en formato columnar compacto para JSON.
+        
+        Los meses van una sola vez en ``months``; cada fila lleva ``km`` como
+        arreglo y ``reset`` / ``exceeds`` como bitmasks: arreglos de palabras
+        de 32 bits donde el bit ``i % 32`` de la palabra ``i // 32`` es el
+        mes ``i`` (en JS: ``(mask[i >> 5] >>> (i & 31)) & 1``). La celda
+        reseteada muestra el tipo de la fila.
+        
+        Returns:
+            Dict con ``format``, ``monthly_km``, ``months`` y ``modules``
+        """
+        first_row = next((rows[0] for rows in projections.values() if rows), None)
+        result = {
+            "format": "columnar",
+            "monthly_km": self.monthly_km,
+            "months": [
+                cell.month_date.strftime("%b %y") for cell in first_row.cells
+            ] if first_row else [],
+            "modules": [],
+        }
+        
+        for module_id in sorted(projections.keys()):
+            result["modules"].append({
+                "module_id": module_id,
+                "rows": [
+                    {
+                        "intervention_type": row.intervention_type,
+                        "last_event_date": row.last_event_date.isoformat() if row.last_event_date else None,
+                        "initial_km": row.initial_km,
+                        "km": [cell.km_accumulated for cell in row.cells],
+                        "reset": self._bitmask(cell.is_reset_point for cell in row.cells),
+                        "exceeds": self._bitmask(cell.exceeds_threshold for cell in row.cells),
+                    }
+                    for row in projections[module_id]
+                ],
+            })
+        
+        return result
+    
+    @staticmethod
+    def _bitmask(flags) -> list[int]:
+        """Empaqueta flags en palabras de 32 bits (seguras como number en JS)."""
+        words = []
+        for index, flag in enumerate(flags):
+            if index % 32 == 0:
+                words.append(0)
+            if flag:
+                words[-1] |= 1 << (index % 32)
+        return words
@@ -0,0 +1,153 @@
+"""
+Renderizado directo de la grilla de proyección a HTML.
+
+Produce exactamente el mismo markup que los bucles ``{% for %}`` que tenía
+``projection.html`` (misma indentación y espacios), pero en una pasada de
+concatenación de strings: clases CSS y números se resuelven por fila y no
+por celda a través del motor de templates.
+"""
+from __future__ import annotations
+
+from django.conf import settings
+from django.template.defaultfilters import floatformat
+from django.utils.html import escape
+from django.utils.safestring import SafeString, mark_safe
+
+from .projection_grid import ModuleProjectionRow
+
+# Indentación del markup original de projection.html
+_I = {n: " " * n for n in (20, 24, 28, 32, 36, 40, 44)}
+
+
+class ProjectionTableRenderer:
+    """
+    Genera el encabezado de meses y el ``<tbody>`` de la grilla de proyección.
+
+    Uso:
+        renderer = ProjectionTableRenderer()
+        months_html = renderer.render_months(projections)
+        rows_html = renderer.render_rows(projections)
+    """
+
+    MODULE_SEPARATOR = (
+        f"\n{_I[24]}<!-- Separador entre módulos -->"
+        f"\n{_I[24]}<tr class=\"module-separator\">"
+        f"\n{_I[28]}<td colspan=\"100\"></td>"
+        f"\n{_I[24]}</tr>"
+        f"\n{_I[20]}"
+    )
+    ROW_START = (
+        f"\n{_I[28]}<tr>"
+        f"\n{_I[32]}<!-- N° Módulo (solo en primera fila del módulo) -->"
+        f"\n{_I[32]}"
+    )
+    MODULE_CELL = (
+        f"\n{_I[36]}<td rowspan=\"{{rowspan}}\" class=\"col-module\">{{module_id}}</td>"
+        f"\n{_I[32]}"
+    )
+    TYPE_CELL = (
+        f"\n{_I[32]}"
+        f"\n{_I[32]}<!-- Tipo de Intervención -->"
+        f"\n{_I[32]}<td class=\"col-intervention type-{{type}}\">"
+        f"\n{_I[36]}{{type}}"
+        f"\n{_I[32]}</td>"
+        f"\n{_I[32]}"
+        f"\n{_I[32]}<!-- Fecha Último Evento -->"
+        f"\n{_I[32]}<td>"
+        f"\n{_I[36]}"
+        f"\n{_I[40]}{{last_event}}"
+        f"\n{_I[36]}"
+        f"\n{_I[32]}</td>"
+        f"\n{_I[32]}"
+        f"\n{_I[32]}<!-- Km Acumulado -->"
+        f"\n{_I[32]}<td class=\"col-km\">{{initial_km}}</td>"
+        f"\n{_I[32]}"
+        f"\n{_I[32]}<!-- Celdas de proyección -->"
+        f"\n{_I[32]}"
+    )
+    ROW_END = f"\n{_I[28]}</tr>\n{_I[24]}"
+    # Celda: clase CSS y contenido son los únicos huecos
+    CELL = (
+        f"\n{_I[36]}<td class=\"col-km \n{_I[40]}{{css}}\">"
+        f"\n{_I[40]}"
+        f"\n{_I[44]}{{content}}"
+        f"\n{_I[40]}"
+        f"\n{_I[36]}</td>"
+        f"\n{_I[32]}"
+    )
+
+    def __init__(self) -> None:
+        # Sin separador de miles, floatformat:0 de un entero es str()
+        grouping = settings.USE_THOUSAND_SEPARATOR
+        self._format_km = (lambda km: str(floatformat(km, 0))) if grouping else str
+
+    def render_months(self, projections: dict[int, list[ModuleProjectionRow]]) -> SafeString:
+        """
+        Celdas ``<th>`` de meses (tomadas de la primera fila del primer módulo).
+
+        Args:
+            projections: Resultado de ``generate_for_all_modules``
+        """
+        parts = [f"\n{_I[28]}"]
+        if projections:
+            rows = projections[min(projections)]
+            parts.append(f"\n{_I[32]}")
+            if rows:
+                parts.append(f"\n{_I[36]}")
+                if rows[0].cells:
+                    parts.append(f"\n{_I[40]}")
+                    for cell in rows[0].cells:
+                        month = escape(cell.month_date.strftime("%b %y"))
+                        parts.append(f"\n{_I[44]}<th>{month}</th>\n{_I[40]}")
+                    parts.append(f"\n{_I[36]}")
+                parts.append(f"\n{_I[32]}")
+            parts.append(f"\n{_I[28]}")
+        parts.append(f"\n{_I[24]}")
+        return mark_safe("".join(parts))
+
+    def render_rows(self, projections: dict[int, list[ModuleProjectionRow]]) -> SafeString:
+        """
+        Filas ``<tr>`` de todos los módulos, ordenados por id.
+
+        Args:
+            projections: Resultado de ``generate_for_all_modules``
+        """
+        format_km = self._format_km
+        cell_template = self.CELL
+        parts = []
+
+        for module_id in sorted(projections):
+            parts.append(f"\n{_I[24]}")
+
+            rows = projections[module_id]
+            for index, row in enumerate(rows):
+                parts.append(self.ROW_START)
+                if index == 0:
+                    parts.append(self.MODULE_CELL.format(module_id=module_id, rowspan=len(rows)))
+
+                intervention_type = escape(row.intervention_type)
+                parts.append(self.TYPE_CELL.format(
+                    type=intervention_type,
+                    # El template recibía la fecha ISO de export_to_dict y
+                    # |date:"d/m/Y" sobre un string da vacío: se conserva
+                    last_event="" if row.last_event_date else "N/A",
+                    initial_km=format_km(row.initial_km),
+                ))
+
+                exceeds_css = f"cell-exceeds-{intervention_type}"
+                parts.extend(
+                    cell_template.format(
+                        css="cell-reset", content=escape(cell.intervention_code)
+                    )
+                    if cell.is_reset_point else
+                    cell_template.format(
+                        css=exceeds_css if cell.exceeds_threshold else "",
+                        content=format_km(cell.km_accumulated),
+                    )
+                    for cell in row.cells
+                )
+                parts.append(self.ROW_END)
+
+            parts.append(self.MODULE_SEPARATOR)
+
+        return mark_safe("".join(parts))
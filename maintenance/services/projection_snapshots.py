@@ -0,0 +1,283 @@
+"""
+Snapshots persistidos de la proyección y diferencias entre ellos.
+
+Cada snapshot guarda la grilla completa como arreglos columnares (una fila
+por módulo y tipo, una columna por mes) comprimidos con zlib en
+``ProjectionSnapshot.data``:
+
+- km de cada celda como diferencia con el mes anterior (partiendo del km
+  inicial de la fila): casi todo es ``monthly_km`` y comprime muy bien.
+- reseteos y excedidos como bits empaquetados.
+
+La comparación alinea las filas por (módulo, tipo) y las columnas por mes
+calendario, y busca las celdas distintas con operaciones de numpy sobre la
+grilla completa; solo se arma JSON para las celdas que cambiaron.
+"""
+from __future__ import annotations
+
+import zlib
+from dataclasses import dataclass
+from datetime import date, timedelta
+from itertools import groupby
+from typing import Iterable, Sequence
+
+import numpy as np
+from django.utils import timezone
+
+from maintenance.models import ProjectionSnapshot
+
+from .projection_grid import MaintenanceProjectionGrid, ModuleProjectionRow
+
+HIERARCHY = MaintenanceProjectionGrid.HIERARCHY
+
+
+@dataclass
+class SnapshotArrays:
+    """Grilla de un snapshot en arreglos de numpy (filas ordenadas por módulo y tipo)."""
+
+    first_month: int  # Mes calendario de la primera columna (año * 12 + mes - 1)
+    module_ids: np.ndarray  # int32[filas]
+    types: np.ndarray  # uint8[filas], índice en HIERARCHY
+    initial_km: np.ndarray  # int32[filas]
+    km: np.ndarray  # int32[filas, meses]
+    reset: np.ndarray  # bool[filas, meses]
+    exceeds: np.ndarray  # bool[filas, meses]
+
+    @property
+    def months(self) -> int:
+        return self.km.shape[1]
+
+    @property
+    def row_keys(self) -> np.ndarray:
+        """Clave única y ordenable de cada fila (módulo, tipo)."""
+        return self.module_ids.astype(np.int64) * len(HIERARCHY) + self.types
+
+    @classmethod
+    def from_projections(
+        cls,
+        projections: Iterable[tuple[int, list[ModuleProjectionRow]]],
+    ) -> SnapshotArrays:
+        """
+        Arma los arreglos a partir de la proyección.
+
+        Args:
+            projections: Iterador (module_id, filas) como ``iter_for_modules``
+        """
+        rows = sorted(
+            (row for _, module_rows in projections for row in module_rows),
+            key=lambda row: (row.module_id, HIERARCHY.index(row.intervention_type)),
+        )
+        months = len(rows[0].cells) if rows else 0
+        first_month = _month_index(rows[0].cells[0].month_date) if months else 0
+
+        return cls(
+            first_month=first_month,
+            module_ids=np.array([row.module_id for row in rows], dtype=np.int32),
+            types=np.array([HIERARCHY.index(row.intervention_type) for row in rows], dtype=np.uint8),
+            initial_km=np.array([row.initial_km for row in rows], dtype=np.int32),
+            km=np.array(
+                [[cell.km_accumulated for cell in row.cells] for row in rows], dtype=np.int32
+            ).reshape(len(rows), months),
+            reset=np.array(
+                [[cell.is_reset_point for cell in row.cells] for row in rows], dtype=bool
+            ).reshape(len(rows), months),
+            exceeds=np.array(
+                [[cell.exceeds_threshold for cell in row.cells] for row in rows], dtype=bool
+            ).reshape(len(rows), months),
+        )
+
+    def encode(self) -> bytes:
+        """Serializa los arreglos (little-endian) y los comprime."""
+        deltas = np.diff(self.km, axis=1, prepend=self.initial_km[:, None])
+        parts = [
+            self.module_ids.astype("<i4"),
+            self.types,
+            self.initial_km.astype("<i4"),
+            deltas.astype("<i4"),
+            np.packbits(self.reset, axis=None),
+            np.packbits(self.exceeds, axis=None),
+        ]
+        return zlib.compress(b"".join(part.tobytes() for part in parts), 9)
+
+    @classmethod
+    def decode(cls, data: bytes, rows: int, months: int, first_month: int) -> SnapshotArrays:
+        """Inverso de ``encode``."""
+        buffer = zlib.decompress(data)
+        cells = rows * months
+        offset = 0
+
+        def take(dtype: str, count: int) -> np.ndarray:
+            nonlocal offset
+            array = np.frombuffer(buffer, dtype=dtype, count=count, offset=offset)
+            offset += array.nbytes
+            return array
+
+        module_ids = take("<i4", rows).astype(np.int32)
+        types = take("u1", rows).copy()
+        initial_km = take("<i4", rows).astype(np.int32)
+        deltas = take("<i4", cells).reshape(rows, months)
+        bits = (cells + 7) // 8
+        reset = np.unpackbits(take("u1", bits), count=cells).astype(bool).reshape(rows, months)
+        exceeds = np.unpackbits(take("u1", bits), count=cells).astype(bool).reshape(rows, months)
+
+        return cls(
+            first_month=first_month,
+            module_ids=module_ids,
+            types=types,
+            initial_km=initial_km,
+            km=(initial_km[:, None] + np.cumsum(deltas, axis=1, dtype=np.int64)).astype(np.int32),
+            reset=reset,
+            exceeds=exceeds,
+        )
+
+
+def _month_index(value: date) -> int:
+    return value.year * 12 + value.month - 1
+
+
+def _month_label(index: int) -> str:
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def take_snapshot(
+    modules: Sequence,
+    months_ahead: int,
+    monthly_km: int,
+    taken_on: date | None = None,
+    workers: int = 1,
+) -> ProjectionSnapshot:
+    """
+    Proyecta los módulos y guarda el snapshot del día.
+
+    Si ya hay uno con la misma fecha y parámetros se reemplaza, así el
+    comando se puede correr más de una vez por día.
+
+    Args:
+        modules: FleetModules a incluir
+        months_ahead: Meses a proyectar
+        monthly_km: Km promedio mensual
+        taken_on: Fecha de inicio de la proyección (default: hoy)
+        workers: Procesos para proyectar (ver ``iter_for_modules_parallel``)
+    """
+    taken_on = taken_on or date.today()
+    grid = MaintenanceProjectionGrid(monthly_km=monthly_km)
+    arrays = SnapshotArrays.from_projections(
+        grid.iter_for_modules(modules, months_ahead=months_ahead, start_date=taken_on, workers=workers)
+    )
+
+    snapshot, _ = ProjectionSnapshot.objects.update_or_create(
+        taken_on=taken_on,
+        months_ahead=months_ahead,
+        monthly_km=monthly_km,
+        defaults={
+            "first_month": date(arrays.first_month // 12, arrays.first_month % 12 + 1, 1)
+            if arrays.months else taken_on.replace(day=1),
+            "module_count": len(np.unique(arrays.module_ids)),
+            "row_count": len(arrays.module_ids),
+            "data": arrays.encode(),
+            "created_at": timezone.now(),
+        },
+    )
+    return snapshot
+
+
+def load_arrays(snapshot: ProjectionSnapshot) -> SnapshotArrays:
+    """Descomprime los arreglos de un snapshot."""
+    return SnapshotArrays.decode(
+        bytes(snapshot.data),
+        rows=snapshot.row_count,
+        months=snapshot.months_ahead if snapshot.row_count else 0,
+        first_month=_month_index(snapshot.first_month),
+    )
+
+
+def diff_arrays(before: SnapshotArrays, after: SnapshotArrays) -> dict:
+    """
+    Celdas distintas entre dos grillas, en los meses que ambas cubren.
+
+    Returns:
+        Dict con ``months`` (primer y último mes comparados), ``changed_cells``,
+        ``modules`` (solo filas con cambios: ``cells`` con ``month`` y pares
+        [antes, después] de ``km``, ``is_reset`` y ``exceeds``), y ``added`` /
+        ``removed`` con las filas (módulo, tipo) de un solo snapshot
+    """
+    first = max(before.first_month, after.first_month)
+    last = min(before.first_month + before.months, after.first_month + after.months)
+    columns_before = slice(first - before.first_month, last - before.first_month)
+    columns_after = slice(first - after.first_month, last - after.first_month)
+
+    keys_before, keys_after = before.row_keys, after.row_keys
+    _, rows_before, rows_after = np.intersect1d(
+        keys_before, keys_after, assume_unique=True, return_indices=True
+    )
+
+    km = (before.km[rows_before, columns_before], after.km[rows_after, columns_after])
+    reset = (before.reset[rows_before, columns_before], after.reset[rows_after, columns_after])
+    exceeds = (before.exceeds[rows_before, columns_before], after.exceeds[rows_after, columns_after])
+    changed_rows, changed_columns = np.nonzero(
+        (km[0] != km[1]) | (reset[0] != reset[1]) | (exceeds[0] != exceeds[1])
+    )
+
+    modules = []
+    cells = zip(changed_rows.tolist(), changed_columns.tolist())
+    for row, row_cells in groupby(cells, key=lambda cell: cell[0]):
+        source = rows_after[row]
+        module_id = int(after.module_ids[source])
+        if not modules or modules[-1]["module_id"] != module_id:
+            modules.append({"module_id": module_id, "rows": []})
+        modules[-1]["rows"].append({
+            "intervention_type": HIERARCHY[after.types[source]],
+            "cells": [
+                {
+                    "month": _month_label(first + column),
+                    "km": [int(km[0][row, column]), int(km[1][row, column])],
+                    "is_reset": [bool(reset[0][row, column]), bool(reset[1][row, column])],
+                    "exceeds": [bool(exceeds[0][row, column]), bool(exceeds[1][row, column])],
+                }
+                for _, column in row_cells
+            ],
+        })
+
+    def rows_only_in(arrays: SnapshotArrays, other_keys: np.ndarray) -> list[dict]:
+        only = np.flatnonzero(~np.isin(arrays.row_keys, other_keys))
+        return [
+            {"module_id": int(arrays.module_ids[i]), "intervention_type": HIERARCHY[arrays.types[i]]}
+            for i in only
+        ]
+
+    return {
+        "months": [_month_label(first), _month_label(last - 1)] if last > first else [],
+        "changed_cells": len(changed_rows),
+        "modules": modules,
+        "added": rows_only_in(after, keys_before),
+        "removed": rows_only_in(before, keys_after),
+    }
+
+
+def diff_snapshots(before: ProjectionSnapshot, after: ProjectionSnapshot) -> dict:
+    """``diff_arrays`` de dos snapshots, con sus datos de referencia."""
+    result = {
+        "from": snapshot_summary(before),
+        "to": snapshot_summary(after),
+    }
+    result.update(diff_arrays(load_arrays(before), load_arrays(after)))
+    return result
+
+
+def snapshot_summary(snapshot: ProjectionSnapshot) -> dict:
+    return {
+        "id": snapshot.pk,
+        "taken_on": snapshot.taken_on.isoformat(),
+        "months_ahead": snapshot.months_ahead,
+        "monthly_km": snapshot.monthly_km,
+        "module_count": snapshot.module_count,
+        "size_bytes": len(snapshot.data),
+    }
+
+
+def prune_snapshots(keep: timedelta) -> int:
+    """Borra los snapshots tomados hace más de ``keep``."""
+    deleted, _ = ProjectionSnapshot.objects.filter(
+        taken_on__lt=date.today() - keep
+    ).delete()
+    return deleted
@@ -0,0 +1,218 @@
+"""
+Exportación tabular (CSV y Parquet) de la proyección y del historial.
+
+Formato largo: una fila por módulo, tipo de intervención y mes, con columnas
+tipadas, para cargar en herramientas de BI sin interpretar el Excel con
+formato. Opcionalmente se exporta también el historial crudo de lecturas
+(``OdometerLog``) y eventos (``MaintenanceEvent``).
+
+Las filas se generan y escriben por lotes de ``batch_size``: el CSV se entrega
+como bloques de bytes y el Parquet escribe un row group por lote. Parquet
+requiere ``pyarrow`` (opcional, no está en requirements.txt).
+"""
+from __future__ import annotations
+
+import csv
+import io
+from dataclasses import dataclass
+from itertools import islice
+from typing import IO, Iterable, Iterator
+
+from maintenance.models import MaintenanceEvent, OdometerLog
+
+from .projection_grid import ModuleProjectionRow
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - dependencia opcional
+    pa = None
+    pq = None
+
+DEFAULT_BATCH_SIZE = 10_000
+FORMATS = ("csv", "parquet")
+
+
+@dataclass(frozen=True)
+class TabularDataset:
+    """Columnas (nombre, tipo) de un dataset exportable."""
+
+    name: str
+    columns: tuple[tuple[str, str], ...]
+
+    @property
+    def column_names(self) -> list[str]:
+        return [name for name, _ in self.columns]
+
+    def arrow_schema(self):
+        types = {
+            "int32": pa.int32(),
+            "int64": pa.int64(),
+            "string": pa.string(),
+            "date": pa.date32(),
+            "bool": pa.bool_(),
+        }
+        return pa.schema([(name, types[kind]) for name, kind in self.columns])
+
+
+PROJECTION = TabularDataset("projection", (
+    ("module_id", "int32"),
+    ("intervention_type", "string"),
+    ("month", "date"),
+    ("km_accumulated", "int64"),
+    ("is_reset_point", "bool"),
+    ("exceeds_threshold", "bool"),
+    ("intervention_code", "string"),
+))
+ODOMETER = TabularDataset("odometer", (
+    ("module_id", "int32"),
+    ("reading_date", "date"),
+    ("odometer_reading", "int64"),
+    ("daily_delta_km", "int64"),
+))
+EVENTS = TabularDataset("events", (
+    ("module_id", "int32"),
+    ("event_date", "date"),
+    ("intervention_type", "string"),
+    ("odometer_km", "int64"),
+))
+
+DATASETS = {dataset.name: dataset for dataset in (PROJECTION, ODOMETER, EVENTS)}
+
+
+def parquet_available() -> bool:
+    return pa is not None
+
+
+def projection_records(
+    projections: Iterable[tuple[int, list[ModuleProjectionRow]]],
+) -> Iterator[tuple]:
+    """
+    Filas del dataset ``projection`` (orden: módulo, tipo, mes).
+
+    Args:
+        projections: Iterador (module_id, filas) como ``iter_for_modules``
+    """
+    for module_id, rows in projections:
+        for row in rows:
+            for cell in row.cells:
+                yield (
+                    module_id,
+                    row.intervention_type,
+                    cell.month_date,
+                    cell.km_accumulated,
+                    cell.is_reset_point,
+                    cell.exceeds_threshold,
+                    cell.intervention_code,
+                )
+
+
+def history_records(
+    dataset: TabularDataset,
+    module_ids: Iterable[int],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[tuple]:
+    """
+    Filas del historial crudo (``odometer`` o ``events``) de los módulos.
+
+    Se leen con un cursor por lotes de ``batch_size`` filas.
+    """
+    module_ids = list(module_ids)
+    if dataset is ODOMETER:
+        queryset = (
+            OdometerLog.objects.filter(fleet_module_id__in=module_ids)
+            .order_by("fleet_module_id", "reading_date", "id")
+            .values_list("fleet_module_id", "reading_date", "odometer_reading", "daily_delta_km")
+        )
+    elif dataset is EVENTS:
+        queryset = (
+            MaintenanceEvent.objects.filter(fleet_module_id__in=module_ids)
+            .order_by("fleet_module_id", "event_date", "id")
+            .values_list("fleet_module_id", "event_date", "profile__code", "odometer_km")
+        )
+    else:
+        raise ValueError(f"Dataset sin historial: {dataset.name}")
+    return queryset.iterator(chunk_size=batch_size)
+
+
+def _batches(records: Iterable[tuple], batch_size: int) -> Iterator[list[tuple]]:
+    records = iter(records)
+    while batch := list(islice(records, batch_size)):
+        yield batch
+
+
+def iter_csv(
+    dataset: TabularDataset,
+    records: Iterable[tuple],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> Iterator[bytes]:
+    """
+    CSV (UTF-8, con encabezado) en un bloque de bytes por lote.
+
+    Fechas en ISO 8601, booleanos como ``true``/``false`` y nulos vacíos.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    writer.writerow(dataset.column_names)
+
+    bool_columns = [i for i, (_, kind) in enumerate(dataset.columns) if kind == "bool"]
+    for batch in _batches(records, batch_size):
+        if bool_columns:
+            batch = [
+                tuple(
+                    ("true" if value else "false") if i in bool_columns else value
+                    for i, value in enumerate(record)
+                )
+                for record in batch
+            ]
+        writer.writerows(batch)
+        yield buffer.getvalue().encode("utf-8")
+        buffer.seek(0)
+        buffer.truncate()
+
+    if buffer.tell():
+        # Dataset vacío: solo el encabezado
+        yield buffer.getvalue().encode("utf-8")
+
+
+def write_csv(
+    dataset: TabularDataset,
+    records: Iterable[tuple],
+    output: str | IO[bytes],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> None:
+    """Escribe el CSV en una ruta o archivo binario abierto."""
+    if isinstance(output, str):
+        with open(output, "wb") as file:
+            write_csv(dataset, records, file, batch_size)
+        return
+    for chunk in iter_csv(dataset, records, batch_size):
+        output.write(chunk)
+
+
+def write_parquet(
+    dataset: TabularDataset,
+    records: Iterable[tuple],
+    output: str | IO[bytes],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> None:
+    """
+    Escribe el Parquet (un row group por lote) en una ruta o archivo binario.
+
+    Raises:
+        RuntimeError: Si pyarrow no está instalado
+    """
+    if pa is None:
+        raise RuntimeError("La exportación Parquet requiere pyarrow (pip install pyarrow)")
+
+    schema = dataset.arrow_schema()
+    with pq.ParquetWriter(output, schema, compression="zstd") as writer:
+        for batch in _batches(records, batch_size):
+            columns = list(zip(*batch))
+            writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array(values, type=field.type) for values, field in zip(columns, schema)],
+                schema=schema,
+            ))
+
+
+WRITERS = {"csv": write_csv, "parquet": write_parquet}
@@ -0,0 +1,369 @@
+"""
+Escritor directo de XLSX para proyecciones grandes.
+
+Genera el SpreadsheetML de la hoja de proyección como texto y lo comprime en
+un zip a medida que se producen las filas, sin modelo de objetos por celda.
+La tabla de estilos es fija y reproduce el formato de
+``ProjectionExcelExporter`` (mismos colores, fuentes, bordes y anchos).
+
+El zip se escribe en un stream no posicionable, de modo que ``iter_bytes``
+entrega bloques del archivo mientras se genera (respuestas en streaming).
+"""
+from __future__ import annotations
+
+import zipfile
+from collections.abc import Iterable, Iterator, Mapping
+from datetime import date
+from itertools import chain
+from typing import IO, TYPE_CHECKING
+from xml.sax.saxutils import escape, quoteattr
+
+from openpyxl.utils import get_column_letter
+
+from .projection_excel import ProjectionExcelExporter
+
+if TYPE_CHECKING:
+    from .projection_grid import ModuleProjectionRow
+
+XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+NS_REL = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+NS_PKG_REL = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+
+class _ChunkBuffer:
+    """Destino no posicionable del zip: acumula bytes hasta que se drenan."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self.size = 0
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        self.size = 0
+        return data
+
+
+class ProjectionXlsxWriter:
+    """
+    Exporta proyecciones a XLSX escribiendo el XML directamente.
+
+    Misma interfaz y mismo resultado visual que ``ProjectionExcelExporter``;
+    el costo es proporcional a los bytes escritos.
+
+    Uso:
+        ProjectionXlsxWriter().export(projections, "proyeccion.xlsx")
+        response = StreamingHttpResponse(ProjectionXlsxWriter().iter_bytes(projections))
+    """
+
+    COLORS = ProjectionExcelExporter.COLORS
+    FIXED_COLUMNS = ProjectionExcelExporter.FIXED_COLUMNS
+    MONTH_COLUMN_WIDTH = ProjectionExcelExporter.MONTH_COLUMN_WIDTH
+    TITLE_MERGE = ProjectionExcelExporter.TITLE_MERGE
+    SHEET_TITLE = "Proyección Mantenimiento"
+    # Los textos van como inlineStr: nunca se escriben fórmulas
+    WRITES_FORMULAS = False
+
+    # Bytes acumulados antes de entregar un bloque
+    CHUNK_SIZE = 64 * 1024
+
+    # Índices de cellXfs de _styles_xml
+    STYLE_TITLE = 1
+    STYLE_INFO = 2
+    STYLE_INPUT = 3
+    STYLE_HEADER = 4
+    STYLE_MODULE = 5
+    STYLE_TYPE = {"DA": 6, "P": 7, "BI": 8, "A": 9}
+    STYLE_DATE = 10
+    STYLE_INITIAL_KM = 11
+    STYLE_RESET = 12
+    STYLE_KM = 13
+    STYLE_EXCEEDS = {"DA": 14, "P": 15, "BI": 16, "A": 17}
+
+    def export(
+        self,
+        projections: Mapping[int, list[ModuleProjectionRow]] | Iterable[tuple[int, list[ModuleProjectionRow]]],
+        filepath: str | IO[bytes],
+        monthly_km: int = 12_500
+    ) -> None:
+        """
+        Exporta proyecciones a archivo XLSX.
+
+        Args:
+            projections: Dict con proyecciones por módulo, o iterable de
+                (module_id, filas) en orden
+            filepath: Ruta del archivo a crear o archivo binario abierto
+            monthly_km: Km promedio mensual usado en proyección
+        """
+        if isinstance(filepath, str):
+            with open(filepath, "wb") as output:
+                self.export(projections, output, monthly_km)
+            return
+
+        for chunk in self.iter_bytes(projections, monthly_km):
+            filepath.write(chunk)
+
+    def iter_bytes(
+        self,
+        projections: Mapping[int, list[ModuleProjectionRow]] | Iterable[tuple[int, list[ModuleProjectionRow]]],
+        monthly_km: int = 12_500
+    ) -> Iterator[bytes]:
+        """
+        Genera el archivo XLSX en bloques de ~``CHUNK_SIZE`` bytes.
+
+        Yields:
+            Bloques consecutivos del zip
+        """
+        if isinstance(projections, Mapping):
+            modules = ((module_id, projections[module_id]) for module_id in sorted(projections))
+        else:
+            modules = iter(projections)
+
+        # Los encabezados de meses salen del primer módulo
+        first = next(modules, None)
+        months = [cell.month_date.strftime("%b %y") for cell in first[1][0].cells] if first else []
+
+        buffer = _ChunkBuffer()
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for name, content in self._package_parts():
+                archive.writestr(name, content)
+
+            with archive.open("xl/worksheets/sheet1.xml", "w") as sheet:
+                sheet.write(self._sheet_start(len(months)).encode("utf-8"))
+                sheet.write(self._header_rows(monthly_km, months).encode("utf-8"))
+
+                if first is not None:
+                    row_number = 6
+                    columns = [get_column_letter(col) for col in range(1, 5 + len(months))]
+                    for _, rows in chain([first], modules):
+                        xml, row_number = self._module_rows(rows, row_number, columns)
+                        sheet.write(xml.encode("utf-8"))
+                        if buffer.size >= self.CHUNK_SIZE:
+                            yield buffer.drain()
+
+                sheet.write(self._sheet_end().encode("utf-8"))
+
+        yield buffer.drain()
+
+    def _module_rows(
+        self,
+        rows: list[ModuleProjectionRow],
+        row_number: int,
+        columns: list[str]
+    ) -> tuple[str, int]:
+        """
+        XML de las filas de un módulo (4 filas: DA, P, BI, A) más la fila de
+        separación, que se omite por estar vacía.
+
+        Returns:
+            Tupla (XML, número de la primera fila del módulo siguiente)
+        """
+        parts = []
+        for row in rows:
+            maint_type = row.intervention_type
+            r = str(row_number)
+            date_str = (
+                row.last_event_date.strftime("%d/%m/%Y")
+                if row.last_event_date
+                else "N/A"
+            )
+            parts.append(
+                f'<row r="{r}">'
+                f'<c r="A{r}" s="{self.STYLE_MODULE}"><v>{row.module_id}</v></c>'
+                f'{_string_cell("B" + r, self.STYLE_TYPE[maint_type], maint_type)}'
+                f'{_string_cell("C" + r, self.STYLE_DATE, date_str)}'
+                f'<c r="D{r}" s="{self.STYLE_INITIAL_KM}"><v>{row.initial_km}</v></c>'
+            )
+
+            # Proyección mensual: código de intervención en reseteos, km en el resto
+            km_style = self.STYLE_KM
+            exceeds_style = self.STYLE_EXCEEDS[maint_type]
+            for column, grid_cell in zip(columns[4:], row.cells):
+                if grid_cell.is_reset_point:
+                    parts.append(_string_cell(column + r, self.STYLE_RESET, grid_cell.intervention_code))
+                else:
+                    style = exceeds_style if grid_cell.exceeds_threshold else km_style
+                    parts.append(f'<c r="{column}{r}" s="{style}"><v>{grid_cell.km_accumulated}</v></c>')
+
+            parts.append("</row>")
+            row_number += 1
+
+        # Espacio entre módulos
+        return "".join(parts), row_number + 1
+
+    def _header_rows(self, monthly_km: int, months: list[str]) -> str:
+        """Título, parámetros (filas 1-3) y encabezados de columnas (fila 5)"""
+        parts = [
+            f'<row r="1">{_string_cell("A1", self.STYLE_TITLE, "PROYECCIÓN DE MANTENIMIENTO - FLOTA CSR")}</row>',
+            f'<row r="2">{_string_cell("A2", self.STYLE_INFO, "Fecha de generación: " + date.today().strftime("%d/%m/%Y"))}</row>',
+            f'<row r="3">{_string_cell("A3", self.STYLE_INPUT, f"Km promedio mensual: {monthly_km:,} km")}</row>',
+        ]
+        if months:
+            headers = [name for name, _ in self.FIXED_COLUMNS] + months
+            parts.append('<row r="5">')
+            parts.extend(
+                _string_cell(f"{get_column_letter(col)}5", self.STYLE_HEADER, header)
+                for col, header in enumerate(headers, start=1)
+            )
+            parts.append("</row>")
+        return "".join(parts)
+
+    def _sheet_start(self, num_months: int) -> str:
+        """Inicio de la hoja con anchos de columna"""
+        widths = [width for _, width in self.FIXED_COLUMNS]
+        widths += [self.MONTH_COLUMN_WIDTH] * num_months
+        cols = "".join(
+            f'<col min="{col}" max="{col}" width="{width}" customWidth="1"/>'
+            for col, width in enumerate(widths, start=1)
+        )
+        return (
+            f'{XML_HEADER}<worksheet xmlns="{NS_MAIN}" xmlns:r="{NS_REL}">'
+            '<sheetViews><sheetView workbookViewId="0"/></sheetViews>'
+            '<sheetFormatPr defaultRowHeight="15"/>'
+            f'<cols>{cols}</cols>'
+            '<sheetData>'
+        )
+
+    def _sheet_end(self) -> str:
+        """Celdas combinadas y configuración de página (A4 apaisado)"""
+        return (
+            '</sheetData>'
+            f'<mergeCells count="1"><mergeCell ref="{self.TITLE_MERGE}"/></mergeCells>'
+            '<pageMargins left="0.75" right="0.75" top="1" bottom="1" header="0.5" footer="0.5"/>'
+            '<pageSetup orientation="landscape" paperSize="9"/>'
+            '</worksheet>'
+        )
+
+    def _package_parts(self) -> list[tuple[str, str]]:
+        """Partes fijas del paquete: tipos, relaciones, libro y estilos"""
+        return [
+            ("[Content_Types].xml", (
+                f'{XML_HEADER}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+                '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+                '<Default Extension="xml" ContentType="application/xml"/>'
+                '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+                '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+                '<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>'
+                '</Types>'
+            )),
+            ("_rels/.rels", (
+                f'{XML_HEADER}<Relationships xmlns="{NS_PKG_REL}">'
+                f'<Relationship Id="rId1" Type="{NS_REL}/officeDocument" Target="xl/workbook.xml"/>'
+                '</Relationships>'
+            )),
+            ("xl/workbook.xml", (
+                f'{XML_HEADER}<workbook xmlns="{NS_MAIN}" xmlns:r="{NS_REL}">'
+                '<bookViews><workbookView/></bookViews>'
+                f'<sheets><sheet name={quoteattr(self.SHEET_TITLE)} sheetId="1" r:id="rId1"/></sheets>'
+                '</workbook>'
+            )),
+            ("xl/_rels/workbook.xml.rels", (
+                f'{XML_HEADER}<Relationships xmlns="{NS_PKG_REL}">'
+                f'<Relationship Id="rId1" Type="{NS_REL}/worksheet" Target="worksheets/sheet1.xml"/>'
+                f'<Relationship Id="rId2" Type="{NS_REL}/styles" Target="styles.xml"/>'
+                '</Relationships>'
+            )),
+            ("xl/styles.xml", self._styles_xml()),
+        ]
+
+    def _styles_xml(self) -> str:
+        """
+        Tabla de estilos fija; el orden de ``cellXfs`` corresponde a las
+        constantes ``STYLE_*``.
+        """
+        types = ("DA", "P", "BI", "A")
+        fonts = [
+            # 0: fuente por defecto del libro
+            '<font><sz val="11"/><color theme="1"/><name val="Calibri"/><family val="2"/><scheme val="minor"/></font>',
+            '<font><b val="1"/><sz val="14"/></font>',                        # 1: título
+            '<font><sz val="10"/></font>',                                    # 2: info
+            '<font><color rgb="000000FF"/><sz val="10"/></font>',             # 3: input
+            '<font><b val="1"/><sz val="10"/></font>',                        # 4: negrita
+        ]
+        fonts += [  # 5-8: tipo de intervención
+            f'<font><b val="1"/><color rgb="00{self.COLORS[t]["text"]}"/><sz val="10"/></font>' for t in types
+        ]
+        fonts += [  # 9-12: celda que excede
+            f'<font><color rgb="00{self.COLORS[t]["text"]}"/><sz val="10"/></font>' for t in types
+        ]
+
+        def solid(color: str) -> str:
+            return (
+                f'<fill><patternFill patternType="solid"><fgColor rgb="00{color}"/>'
+                f'<bgColor rgb="00{color}"/></patternFill></fill>'
+            )
+
+        fills = [
+            '<fill><patternFill/></fill>',
+            '<fill><patternFill patternType="gray125"/></fill>',
+            solid("CCCCCC"),                        # 2: encabezados
+            solid(self.COLORS["reset"]["bg"]),      # 3: reseteo
+        ]
+        fills += [solid(self.COLORS[t]["bg"]) for t in types]  # 4-7
+
+        thin = '<left style="thin"/><right style="thin"/><top style="thin"/><bottom style="thin"/>'
+        borders = [
+            '<border><left/><right/><top/><bottom/><diagonal/></border>',
+            f'<border>{thin}<diagonal/></border>',
+        ]
+
+        center = '<alignment horizontal="center" vertical="center"/>'
+        right = '<alignment horizontal="right" vertical="center"/>'
+
+        def xf(font=0, fill=0, border=0, num_fmt=0, alignment=''):
+            attrs = f'numFmtId="{num_fmt}" fontId="{font}" fillId="{fill}" borderId="{border}" xfId="0"'
+            flags = ''.join(
+                f' apply{name}="1"' for name, used in (
+                    ("NumberFormat", num_fmt), ("Font", font), ("Fill", fill),
+                    ("Border", border), ("Alignment", alignment),
+                ) if used
+            )
+            if alignment:
+                return f'<xf {attrs}{flags}>{alignment}</xf>'
+            return f'<xf {attrs}{flags}/>'
+
+        # numFmtId 3 es el formato integrado '#,##0'
+        cell_xfs = [
+            xf(),                                                               # 0
+            xf(font=1, alignment='<alignment horizontal="center"/>'),          # 1 título
+            xf(font=2),                                                         # 2 info
+            xf(font=3),                                                         # 3 input
+            xf(font=4, fill=2, border=1, alignment=center),                     # 4 encabezado
+            xf(font=4, alignment=center),                                       # 5 módulo
+        ]
+        cell_xfs += [xf(font=5 + i, alignment=center) for i in range(4)]       # 6-9 tipo
+        cell_xfs += [
+            xf(alignment=center),                                               # 10 fecha
+            xf(num_fmt=3, alignment=right),                                     # 11 km inicial
+            xf(font=4, fill=3, border=1, alignment=center),                     # 12 reseteo
+            xf(num_fmt=3, border=1, alignment=right),                           # 13 km
+        ]
+        cell_xfs += [
+            xf(font=9 + i, fill=4 + i, border=1, num_fmt=3, alignment=right)   # 14-17 excede
+            for i in range(4)
+        ]
+
+        return (
+            f'{XML_HEADER}<styleSheet xmlns="{NS_MAIN}">'
+            f'<fonts count="{len(fonts)}">{"".join(fonts)}</fonts>'
+            f'<fills count="{len(fills)}">{"".join(fills)}</fills>'
+            f'<borders count="{len(borders)}">{"".join(borders)}</borders>'
+            '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+            f'<cellXfs count="{len(cell_xfs)}">{"".join(cell_xfs)}</cellXfs>'
+            '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>'
+            '</styleSheet>'
+        )
+
+
+def _string_cell(ref: str, style: int, value: str | None) -> str:
+    """Celda de texto inline (sin tabla de strings compartidos)."""
+    return f'<c r="{ref}" s="{style}" t="inlineStr"><is><t>{escape(str(value))}</t></is></c>'
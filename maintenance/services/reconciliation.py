@@ -0,0 +1,142 @@
+"""
+Reconciliación por particiones entre Access y Django.
+
+Ambos lados se resumen con el mismo agregado (cantidad, suma de km y fecha
+máxima) por módulo y, para los módulos que difieren, por módulo y mes. Solo
+las particiones distintas se vuelven a sincronizar: como en un árbol de
+Merkle, un módulo sin diferencias se descarta con una sola comparación.
+"""
+from __future__ import annotations
+
+from calendar import monthrange
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db.models import Count, Max, Sum
+from django.db.models.functions import ExtractMonth, ExtractYear
+
+from maintenance.models import MaintenanceEvent, OdometerLog
+
+from .access_extractor import PartitionChecksum
+
+
+def reading_checksums(
+    module_numbers: Optional[Iterable[int]] = None,
+    since: Optional[date] = None,
+    by_month: bool = False,
+) -> Dict[tuple, PartitionChecksum]:
+    """
+    Agregados de ``OdometerLog`` con las mismas claves que
+    ``BaseExtractor.get_reading_checksums``.
+
+    Args:
+        module_numbers: Limitar a estos módulos
+        since: Considerar solo lecturas desde esta fecha
+        by_month: Particionar además por año/mes
+
+    Returns:
+        Dict (módulo[, año, mes]) → PartitionChecksum
+    """
+    return _checksums(
+        OdometerLog.objects.all(),
+        date_field="reading_date",
+        km_field="odometer_reading",
+        module_numbers=module_numbers,
+        since=since,
+        by_month=by_month,
+    )
+
+
+def event_checksums(
+    module_numbers: Optional[Iterable[int]] = None,
+    since: Optional[date] = None,
+    by_month: bool = False,
+    maintenance_types: Optional[Iterable[str]] = None,
+) -> Dict[tuple, PartitionChecksum]:
+    """
+    Agregados de ``MaintenanceEvent`` con las mismas claves que
+    ``BaseExtractor.get_event_checksums``.
+
+    Args:
+        module_numbers: Limitar a estos módulos
+        since: Considerar solo eventos desde esta fecha
+        by_month: Particionar además por año/mes
+        maintenance_types: Limitar a estos códigos de perfil
+
+    Returns:
+        Dict (módulo[, año, mes]) → PartitionChecksum
+    """
+    events = MaintenanceEvent.objects.all()
+    if maintenance_types is not None:
+        events = events.filter(profile__code__in=list(maintenance_types))
+    return _checksums(
+        events,
+        date_field="event_date",
+        km_field="odometer_km",
+        module_numbers=module_numbers,
+        since=since,
+        by_month=by_month,
+    )
+
+
+def _checksums(
+    queryset,
+    date_field: str,
+    km_field: str,
+    module_numbers: Optional[Iterable[int]],
+    since: Optional[date],
+    by_month: bool,
+) -> Dict[tuple, PartitionChecksum]:
+    """Agrupa ``queryset`` por módulo (y mes) con COUNT/SUM/MAX."""
+    if module_numbers is not None:
+        queryset = queryset.filter(fleet_module_id__in=list(module_numbers))
+    if since is not None:
+        queryset = queryset.filter(**{f"{date_field}__gte": since})
+
+    group_by = ["fleet_module_id"]
+    if by_month:
+        queryset = queryset.annotate(
+            year=ExtractYear(date_field), month=ExtractMonth(date_field)
+        )
+        group_by += ["year", "month"]
+
+    rows = (
+        queryset.order_by()
+        .values(*group_by)
+        .annotate(count=Count("id"), km_total=Sum(km_field), last_date=Max(date_field))
+    )
+    return {
+        tuple(row[column] for column in group_by): PartitionChecksum(
+            count=row["count"],
+            km_total=row["km_total"] or 0,
+            last_date=row["last_date"],
+        )
+        for row in rows
+    }
+
+
+def diff_partitions(
+    source: Dict[tuple, PartitionChecksum],
+    target: Dict[tuple, PartitionChecksum],
+) -> List[tuple]:
+    """
+    Claves cuyo agregado difiere (o falta en uno de los lados).
+
+    Returns:
+        Lista ordenada de claves de partición
+    """
+    return sorted(
+        key for key in source.keys() | target.keys()
+        if source.get(key) != target.get(key)
+    )
+
+
+def month_bounds(year: int, month: int) -> Tuple[date, date]:
+    """
+    Rango [inicio, fin) de un mes calendario.
+
+    Returns:
+        Tupla (primer día del mes, primer día del mes siguiente)
+    """
+    start = date(year, month, 1)
+    return start, start + timedelta(days=monthrange(year, month)[1])
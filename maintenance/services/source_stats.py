@@ -0,0 +1,85 @@
+"""
+Estadísticas cacheadas del origen de datos legacy.
+
+``test_connection`` ejecuta tres COUNT sobre tablas completas de Access; sus
+resultados (y un fingerprint del esquema de las tablas de origen) se guardan
+en la caché de Django con vigencia ``ACCESS_STATS_TTL``. La entrada se
+invalida además cuando cambia la fecha de modificación del archivo .accdb,
+de modo que una sincronización rutinaria sobre un origen sin cambios no
+repite esas consultas.
+"""
+from __future__ import annotations
+
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from .access_extractor import BaseExtractor, content_hash
+
+CACHE_PREFIX = "access_stats"
+
+
+def _cache_key(extractor: BaseExtractor, kind: str) -> str:
+    """Clave por backend y origen (sin exponer el connection string)."""
+    source = content_hash(extractor.__class__.__name__, extractor.source)
+    return f"{CACHE_PREFIX}:{kind}:{source}"
+
+
+def get_connection_stats(
+    extractor: BaseExtractor,
+    compute: bool = True,
+    refresh: bool = False,
+    ttl: Optional[int] = None,
+) -> Dict[str, Any]:
+    """
+    Retorna las estadísticas del origen, desde caché si siguen vigentes.
+
+    Args:
+        extractor: Extractor conectado
+        compute: Si no hay caché vigente, calcularlas (False = retornar {})
+        refresh: Ignorar la caché y recalcular
+        ttl: Vigencia en segundos (default: ACCESS_STATS_TTL)
+
+    Returns:
+        Dict de ``test_connection`` más ``schema_fingerprint``,
+        ``computed_at`` (ISO), ``cached`` y ``schema_changed``
+    """
+    key = _cache_key(extractor, "stats")
+    mtime = extractor.source_mtime()
+
+    cached = None if refresh else cache.get(key)
+    if cached is not None and cached["source_mtime"] == mtime:
+        return {**cached["stats"], "cached": True, "schema_changed": False}
+
+    if not compute:
+        return {}
+
+    stats = extractor.test_connection()
+    if not stats.get("connected") or "error" in stats:
+        return stats
+
+    # El fingerprint previo se conserva sin vencimiento para detectar cambios
+    schema_key = _cache_key(extractor, "schema")
+    fingerprint = extractor.get_schema_fingerprint()
+    previous = cache.get(schema_key)
+    cache.set(schema_key, fingerprint, timeout=None)
+
+    stats["schema_fingerprint"] = fingerprint
+    stats["computed_at"] = timezone.now().isoformat()
+    cache.set(
+        key,
+        {"stats": stats, "source_mtime": mtime},
+        timeout=ttl if ttl is not None else getattr(settings, "ACCESS_STATS_TTL", 3600),
+    )
+    return {
+        **stats,
+        "cached": False,
+        "schema_changed": previous is not None and previous != fingerprint,
+    }
+
+
+def invalidate_connection_stats(extractor: BaseExtractor) -> None:
+    """Descarta las estadísticas cacheadas del origen."""
+    cache.delete(_cache_key(extractor, "stats"))
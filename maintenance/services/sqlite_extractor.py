@@ -0,0 +1,211 @@
+"""
+Stand-in SQLite del backend Access para hosts sin driver ODBC.
+
+Replica las columnas que consume ``BaseExtractor`` de las tablas
+A_00_Módulos, A_00_Kilometrajes, A_00_OT_Simaf y 12_CambioMódulos, de modo
+que ``sync_from_access`` pueda ejecutarse, perfilarse y testearse en Linux.
+``populate_synthetic_data`` genera historiales de cualquier tamaño para
+medir el throughput de la sincronización.
+"""
+from __future__ import annotations
+
+import random
+import sqlite3
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Sequence
+
+from .access_extractor import BaseExtractor
+
+
+# Esquema mínimo equivalente al de DB_CCEE_Mantenimiento (fechas como texto ISO)
+SCHEMA_SQL = """
+CREATE TABLE IF NOT EXISTS A_00_Módulos (
+    Id_Módulos INTEGER PRIMARY KEY,
+    Módulos TEXT,
+    Clase_Vehículos INTEGER
+);
+CREATE TABLE IF NOT EXISTS A_00_Kilometrajes (
+    Id_Kilometrajes INTEGER PRIMARY KEY,
+    Módulo INTEGER,
+    kilometraje REAL,
+    Fecha TEXT
+);
+CREATE TABLE IF NOT EXISTS A_00_OT_Simaf (
+    Id_OT_Simaf INTEGER PRIMARY KEY,
+    Módulo INTEGER,
+    Tarea TEXT,
+    Km REAL,
+    Fecha_Inicio TEXT,
+    Fecha_Fin TEXT
+);
+CREATE TABLE IF NOT EXISTS [12_CambioMódulos] (
+    Id_CambMódulo INTEGER PRIMARY KEY,
+    Formación TEXT,
+    Módulo TEXT,
+    Cabina TEXT,
+    Fecha TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_kilometrajes_fecha ON A_00_Kilometrajes (Fecha);
+CREATE INDEX IF NOT EXISTS ix_ot_simaf_fecha ON A_00_OT_Simaf (Fecha_Fin);
+"""
+
+# Clase_Vehículos de la flota CSR en Access
+CSR_VEHICLE_CLASS = 3
+
+
+class SQLiteExtractor(BaseExtractor):
+    """Extractor sobre un archivo SQLite con el esquema de Access."""
+
+    DB_ERRORS = (sqlite3.Error,)
+
+    def __init__(self, db_path: str):
+        """
+        Inicializa el extractor.
+
+        Args:
+            db_path: Ruta al archivo SQLite (se abre en solo lectura)
+        """
+        super().__init__(db_path)
+        self.db_path = db_path
+
+    def source_path(self) -> str:
+        """Archivo SQLite de origen."""
+        return self.db_path
+
+    def _open_connection(self) -> sqlite3.Connection:
+        """
+        Abre el archivo en modo solo lectura, como ``ReadOnly=1`` en ODBC.
+
+        Los clones reutilizados (``keep_warm``) pasan de un hilo a otro, como
+        las conexiones pyodbc; nunca se usan desde dos hilos a la vez.
+        """
+        uri = Path(self.db_path).resolve().as_uri() + "?mode=ro"
+        return sqlite3.connect(uri, uri=True, check_same_thread=False)
+
+    def _execute(self, cursor, query: str, params: Sequence = ()) -> None:
+        """Pasa las fechas como texto ISO (comparables con las columnas)."""
+        cursor.execute(
+            query,
+            [p.isoformat() if isinstance(p, date) else p for p in params],
+        )
+
+    def _top_clause(self, limit: int) -> str:
+        """SQLite no soporta ``TOP``."""
+        return ""
+
+    def _limit_clause(self, limit: int) -> str:
+        """Límite al final de la consulta."""
+        return f"LIMIT {limit}"
+
+    def _year_month_exprs(self, column: str) -> tuple[str, str]:
+        """Año y mes desde la fecha en texto ISO."""
+        return (
+            f"CAST(strftime('%Y', {column}) AS INTEGER)",
+            f"CAST(strftime('%m', {column}) AS INTEGER)",
+        )
+
+    def _task_prefix_expr(self, column: str) -> str:
+        """Equivalente SQLite de ``UCase(Left(Trim(...), 2))``."""
+        return f"upper(substr(trim({column}), 1, 2))"
+
+
+def create_schema(conn: sqlite3.Connection) -> None:
+    """Crea las tablas del stand-in si no existen."""
+    conn.executescript(SCHEMA_SQL)
+
+
+def _format_datetime(value: date) -> str:
+    """Formatea una fecha como el DATETIME de Access (medianoche)."""
+    return datetime(value.year, value.month, value.day).isoformat(sep=" ")
+
+
+def populate_synthetic_data(
+    conn: sqlite3.Connection,
+    modules: int = 86,
+    days: int = 365,
+    start_date: date | None = None,
+    daily_km: int = 400,
+    seed: int = 0,
+) -> dict[str, int]:
+    """
+    Genera un historial sintético reproducible en el esquema de Access.
+
+    Por módulo: una lectura diaria, una IQ cada 15 días, una IB cada 60 y
+    una AN cada 450, más una asignación de formación en 12_CambioMódulos.
+    Se agregan dos módulos de otra clase de vehículo para ejercitar el
+    filtro ``Clase_Vehículos = 3``.
+
+    Args:
+        conn: Conexión SQLite con el esquema creado
+        modules: Cantidad de módulos CSR (M01, M02...)
+        days: Días de historial por módulo
+        start_date: Fecha de la primera lectura (default: hoy - days)
+        daily_km: Km diarios promedio (se aplica una variación aleatoria)
+        seed: Semilla para resultados reproducibles
+
+    Returns:
+        Dict con la cantidad de filas insertadas por tabla
+    """
+    rng = random.Random(seed)
+    if start_date is None:
+        start_date = date.today() - timedelta(days=days)
+
+    module_rows = [
+        (module_num, f"M{module_num:02d}", CSR_VEHICLE_CLASS)
+        for module_num in range(1, modules + 1)
+    ]
+    module_rows += [
+        (modules + 1, "T01", 2),
+        (modules + 2, "H01", 1),
+    ]
+    conn.executemany("INSERT INTO A_00_Módulos VALUES (?, ?, ?)", module_rows)
+
+    readings = 0
+    events = 0
+    formations = []
+    for module_num in range(1, modules + 1):
+        odometer = rng.randint(200_000, 1_500_000)
+        reading_rows = []
+        event_rows = []
+        for offset in range(days):
+            current = start_date + timedelta(days=offset)
+            odometer += max(0, int(rng.gauss(daily_km, daily_km * 0.25)))
+            fecha = _format_datetime(current)
+            reading_rows.append((module_num, odometer, fecha))
+
+            for interval, task in ((450, "AN1"), (60, "IB"), (15, "IQ1")):
+                if offset and offset % interval == 0:
+                    event_rows.append((module_num, task, odometer, fecha, fecha))
+                    break
+
+        conn.executemany(
+            "INSERT INTO A_00_Kilometrajes (Módulo, kilometraje, Fecha) VALUES (?, ?, ?)",
+            reading_rows,
+        )
+        conn.executemany(
+            "INSERT INTO A_00_OT_Simaf (Módulo, Tarea, Km, Fecha_Inicio, Fecha_Fin) "
+            "VALUES (?, ?, ?, ?, ?)",
+            event_rows,
+        )
+        readings += len(reading_rows)
+        events += len(event_rows)
+        formations.append((
+            f"F{120 + (module_num - 1) // 2}",
+            f"M{module_num:02d}",
+            "A" if module_num % 2 else "B",
+            _format_datetime(start_date),
+        ))
+
+    conn.executemany(
+        "INSERT INTO [12_CambioMódulos] (Formación, Módulo, Cabina, Fecha) VALUES (?, ?, ?, ?)",
+        formations,
+    )
+    conn.commit()
+
+    return {
+        "modules": modules,
+        "readings": readings,
+        "events": events,
+        "formations": len(formations),
+    }
@@ -0,0 +1,87 @@
+"""
+Exclusión mutua entre procesos de sincronización a nivel de base de datos.
+
+En PostgreSQL usa un advisory lock de sesión (``pg_try_advisory_lock``),
+que el servidor libera solo si el proceso muere. En otros motores (SQLite
+en desarrollo y tests) usa un lease en la tabla ``SyncLock`` con
+vencimiento, para que un proceso caído no bloquee para siempre.
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+import socket
+import uuid
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Iterator
+
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+
+from maintenance.models import SyncLock
+
+DEFAULT_LEASE_TTL = timedelta(hours=1)
+
+
+def lock_key(name: str) -> int:
+    """Clave bigint (con signo) estable para ``pg_try_advisory_lock``."""
+    digest = hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+@contextmanager
+def advisory_lock(name: str, lease_ttl: timedelta = DEFAULT_LEASE_TTL) -> Iterator[bool]:
+    """
+    Intenta tomar el lock ``name`` sin bloquear.
+
+    Uso:
+        with advisory_lock("sync_from_access") as acquired:
+            if acquired:
+                ...
+
+    Args:
+        name: Nombre del recurso a proteger
+        lease_ttl: Vencimiento del lease (solo motores sin advisory locks)
+
+    Yields:
+        True si se obtuvo el lock, False si lo tiene otro proceso
+    """
+    if connection.vendor == "postgresql":
+        key = lock_key(name)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_try_advisory_lock(%s)", [key])
+            acquired = cursor.fetchone()[0]
+        try:
+            yield acquired
+        finally:
+            if acquired:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_unlock(%s)", [key])
+        return
+
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    acquired = _acquire_lease(name, owner, lease_ttl)
+    try:
+        yield acquired
+    finally:
+        if acquired:
+            SyncLock.objects.filter(name=name, owner=owner).delete()
+
+
+def _acquire_lease(name: str, owner: str, lease_ttl: timedelta) -> bool:
+    """Crea el lease o toma uno vencido; False si hay uno vigente."""
+    now = timezone.now()
+    expires_at = now + lease_ttl
+    with transaction.atomic():
+        taken = SyncLock.objects.filter(name=name, expires_at__lt=now).update(
+            owner=owner, expires_at=expires_at
+        )
+        if taken:
+            return True
+        try:
+            with transaction.atomic():
+                SyncLock.objects.create(name=name, owner=owner, expires_at=expires_at)
+        except IntegrityError:
+            return False
+    return True
@@ -0,0 +1,31 @@
+"""
+Receivers que versionan los datos de cada módulo (ver ``data_versions``).
+
+Cubren altas, modificaciones y bajas vía ORM. Las cargas masivas
+(``bulk_create`` / ``update``) no emiten señales y llaman a
+``bump_module_versions`` explícitamente.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import FleetModule, MaintenanceEvent, MaintenanceProfile, OdometerLog
+from .services.data_versions import bump_module_versions
+
+
+@receiver([post_save, post_delete], sender=OdometerLog)
+@receiver([post_save, post_delete], sender=MaintenanceEvent)
+def bump_module_of_row(sender, instance, **kwargs) -> None:
+    """Una lectura o evento cambia la versión de su módulo."""
+    bump_module_versions([instance.fleet_module_id])
+
+
+@receiver([post_save, post_delete], sender=FleetModule)
+def bump_module(sender, instance, **kwargs) -> None:
+    """Cambios del módulo (tipo, km acumulado) cambian su versión."""
+    bump_module_versions([instance.id])
+
+
+@receiver(post_save, sender=MaintenanceProfile)
+def bump_all_modules(sender, instance, **kwargs) -> None:
+    """Un perfil renombrado afecta el último evento mostrado de cualquier módulo."""
+    bump_module_versions(FleetModule.objects.values_list("id", flat=True))
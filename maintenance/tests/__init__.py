@@ -1 +1,5 @@
 """Tests para la aplicación de mantenimiento."""
+
+# Caché en memoria para los tests: no comparten fragmentos con la caché de
+# archivos del proyecto (se aplica con ``override_settings(CACHES=...)``)
+LOCMEM_CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
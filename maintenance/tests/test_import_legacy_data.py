@@ -11,11 +11,13 @@ from io import StringIO
 from pathlib import Path
 
 from django.core.management import call_command
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
 from maintenance.models import FleetModule, MaintenanceEvent, MaintenanceProfile, OdometerLog
+from maintenance.tests import LOCMEM_CACHES
 
 
+@override_settings(CACHES=LOCMEM_CACHES)
 class ImportLegacyDataCommandTests(TestCase):
     """Tests para el comando de importación de datos legacy."""
 
@@ -1,13 +1,17 @@
 """
 Tests unitarios para los modelos de mantenimiento.
 
-Valida comportamiento de FleetModule, OdometerLog, MaintenanceEvent y ProjectionService.
+Valida comportamiento de FleetModule, OdometerLog, MaintenanceEvent, ProjectionService
+y MaintenanceProjectionGrid.
 """
 from __future__ import annotations
 
+import io
+import json
 from datetime import date, timedelta
 
-from django.test import TestCase
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from maintenance.models import (
@@ -16,9 +20,19 @@ from maintenance.models import (
     MaintenanceProfile,
     OdometerLog,
     ProjectionService,
+    ProjectionSnapshot,
 )
+from maintenance.services.projection_grid import MaintenanceProjectionGrid
+from maintenance.services.projection_snapshots import (
+    SnapshotArrays,
+    diff_snapshots,
+    load_arrays,
+    take_snapshot,
+)
+from maintenance.tests import LOCMEM_CACHES
 
 
+@override_settings(CACHES=LOCMEM_CACHES)
 class FleetModuleTests(TestCase):
     """Tests para el modelo FleetModule."""
 
@@ -50,7 +64,54 @@ class FleetModuleTests(TestCase):
         module.update_accumulated_km()
         self.assertEqual(module.total_accumulated_km, 1050000)
 
+    def test_recompute_odometer_deltas_after_bulk_create(self):
+        """Recalcula deltas y acumulado de lecturas creadas sin save()."""
+        module = FleetModule.objects.create(
+            id=1,
+            module_type=FleetModule.ModuleType.CUADRUPLA,
+            in_service_date=date(2015, 1, 1),
+        )
+        OdometerLog.objects.bulk_create([
+            OdometerLog(fleet_module=module, reading_date=date(2025, 1, 15), odometer_reading=1050000),
+            OdometerLog(fleet_module=module, reading_date=date(2025, 1, 1), odometer_reading=1000000),
+            OdometerLog(fleet_module=module, reading_date=date(2025, 2, 1), odometer_reading=1080000),
+        ])
+
+        changed = module.recompute_odometer_deltas()
 
+        deltas = list(
+            module.odometer_logs.order_by("reading_date").values_list("daily_delta_km", flat=True)
+        )
+        self.assertEqual(deltas, [None, 50000, 30000])
+        self.assertEqual(changed, 2)
+        self.assertEqual(module.recompute_odometer_deltas(), 0)
+        module.refresh_from_db()
+        self.assertEqual(module.total_accumulated_km, 1080000)
+
+    def test_recompute_odometer_deltas_since_uses_previous_reading(self):
+        """Con ``since`` solo recalcula desde esa fecha, anclado en la lectura previa."""
+        module = FleetModule.objects.create(
+            id=1,
+            module_type=FleetModule.ModuleType.CUADRUPLA,
+            in_service_date=date(2015, 1, 1),
+        )
+        OdometerLog.objects.create(
+            fleet_module=module, reading_date=date(2025, 1, 1), odometer_reading=1000000
+        )
+        OdometerLog.objects.bulk_create([
+            OdometerLog(fleet_module=module, reading_date=date(2025, 1, 10), odometer_reading=1020000),
+        ])
+
+        changed = module.recompute_odometer_deltas(since=date(2025, 1, 10))
+
+        self.assertEqual(changed, 1)
+        log = module.odometer_logs.get(reading_date=date(2025, 1, 10))
+        self.assertEqual(log.daily_delta_km, 20000)
+        module.refresh_from_db()
+        self.assertEqual(module.total_accumulated_km, 1020000)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
 class OdometerLogTests(TestCase):
     """Tests para el modelo OdometerLog."""
 
@@ -89,6 +150,7 @@ class OdometerLogTests(TestCase):
         self.assertEqual(self.module.total_accumulated_km, 1000000)
 
 
+@override_settings(CACHES=LOCMEM_CACHES)
 class MaintenanceEventTests(TestCase):
     """Tests para el modelo MaintenanceEvent."""
 
@@ -118,6 +180,7 @@ class MaintenanceEventTests(TestCase):
         self.assertEqual(str(event), "IQ en módulo 01 (2025-01-01)")
 
 
+@override_settings(CACHES=LOCMEM_CACHES)
 class MaintenanceProfileTests(TestCase):
     """Tests para el modelo MaintenanceProfile."""
 
@@ -135,6 +198,7 @@ class MaintenanceProfileTests(TestCase):
         self.assertEqual(str(profile), "IQ - Inspección Quincenal")
 
 
+@override_settings(CACHES=LOCMEM_CACHES)
 class ProjectionServiceTests(TestCase):
     """Tests para el servicio de proyección."""
 
@@ -216,3 +280,161 @@ class ProjectionServiceTests(TestCase):
         )
         avg = self.service._estimate_average_daily_km(new_module)
         self.assertIsNone(avg)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class MaintenanceProjectionGridParallelTests(TestCase):
+    """Tests para la proyección paralela (--workers) de MaintenanceProjectionGrid."""
+
+    def setUp(self):
+        """Módulos con eventos de distinta jerarquía y lecturas posteriores."""
+        profiles = {
+            code: MaintenanceProfile.objects.create(name=code, code=code, km_interval=1000)
+            for code in ("DE", "P", "BI", "A")
+        }
+        events = {
+            1: [("P", date(2024, 1, 10)), ("A", date(2023, 6, 1)), ("BI", date(2024, 1, 10))],
+            2: [("DE", date(2022, 3, 1)), ("A", date(2024, 5, 1))],
+            3: [],
+            4: [("A", date(2025, 12, 1))],
+        }
+        self.modules = []
+        for module_id, module_events in events.items():
+            module = FleetModule.objects.create(
+                id=module_id,
+                module_type=FleetModule.ModuleType.CUADRUPLA,
+                in_service_date=date(2015, 1, 1),
+                total_accumulated_km=900_000 + module_id * 100_000,
+            )
+            for code, event_date in module_events:
+                MaintenanceEvent.objects.create(
+                    fleet_module=module, profile=profiles[code], event_date=event_date, odometer_km=0
+                )
+            for month in range(1, 13):
+                OdometerLog.objects.create(
+                    fleet_module=module,
+                    reading_date=date(2024, month, 1),
+                    odometer_reading=module_id * 1_000 + month * 9_000,
+                )
+            self.modules.append(module)
+        self.grid = MaintenanceProjectionGrid(monthly_km=25_000)
+        self.start = date(2026, 1, 15)
+
+    def test_bulk_inputs_match_serial(self):
+        """Los datos cargados de una vez proyectan igual que las consultas por módulo."""
+        serial = list(self.grid.iter_for_modules(self.modules, 36, self.start))
+        with self.assertNumQueries(2):
+            inputs = self.grid.load_module_inputs(self.modules)
+
+        self.assertEqual(
+            [(i.module_id, self.grid.project_inputs(i, 36, self.start)) for i in inputs], serial
+        )
+
+    def test_parallel_matches_serial(self):
+        """Con procesos y lotes chicos el resultado es idéntico y en el mismo orden."""
+        serial = list(self.grid.iter_for_modules(self.modules, 36, self.start))
+        parallel = list(self.grid.iter_for_modules_parallel(
+            reversed(self.modules), 36, self.start, workers=2, chunk_size=1
+        ))
+
+        self.assertEqual(parallel, serial[::-1])
+
+    def test_command_workers_output_is_deterministic(self):
+        """generate_projection --workers produce el mismo JSON que el serial."""
+        outputs = []
+        for workers in ("1", "3"):
+            out = io.StringIO()
+            call_command("generate_projection", "--all", "--json", "--months", "12",
+                         "--workers", workers, stdout=out)
+            outputs.append(json.loads(out.getvalue()))
+
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(len(outputs[0]["modules"]), 4)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ProjectionSnapshotTests(TestCase):
+    """Tests para los snapshots comprimidos de la proyección y su comparación."""
+
+    def setUp(self):
+        """Tres módulos, uno con un evento A reciente."""
+        profile = MaintenanceProfile.objects.create(name="Anual", code="A", km_interval=187_500)
+        self.modules = [
+            FleetModule.objects.create(
+                id=module_id,
+                module_type=FleetModule.ModuleType.CUADRUPLA,
+                in_service_date=date(2015, 1, 1),
+                total_accumulated_km=100_000 * module_id,
+            )
+            for module_id in (1, 2, 3)
+        ]
+        MaintenanceEvent.objects.create(
+            fleet_module=self.modules[0], profile=profile, event_date=date(2025, 6, 1), odometer_km=0
+        )
+
+    def test_roundtrip_and_compression(self):
+        """Los arreglos guardados reproducen la grilla y ocupan una fracción del JSON."""
+        snapshot = take_snapshot(self.modules, 60, 15_000, taken_on=date(2026, 1, 15))
+        grid = MaintenanceProjectionGrid(monthly_km=15_000)
+        projections = dict(grid.iter_for_modules(self.modules, 60, date(2026, 1, 15)))
+        expected = SnapshotArrays.from_projections(projections.items())
+
+        arrays = load_arrays(ProjectionSnapshot.objects.get(pk=snapshot.pk))
+        for name in ("module_ids", "types", "initial_km", "km", "reset", "exceeds"):
+            self.assertEqual(getattr(arrays, name).tolist(), getattr(expected, name).tolist(), name)
+        self.assertEqual(snapshot.first_month, date(2026, 2, 1))
+        self.assertEqual((snapshot.module_count, snapshot.row_count), (3, 12))
+        self.assertLess(len(snapshot.data) * 20, len(json.dumps(grid.export_to_dict(projections))))
+
+    def test_diff_returns_only_changed_cells(self):
+        """Solo las celdas del módulo modificado, con pares [antes, después]."""
+        before = take_snapshot(self.modules, 24, 15_000, taken_on=date(2026, 1, 15))
+        FleetModule.objects.filter(id=3).update(total_accumulated_km=310_000)
+        FleetModule.objects.create(
+            id=4,
+            module_type=FleetModule.ModuleType.TRIPLA,
+            in_service_date=date(2015, 1, 1),
+            total_accumulated_km=0,
+        )
+        after = take_snapshot(
+            FleetModule.objects.order_by("id"), 24, 15_000, taken_on=date(2026, 1, 20)
+        )
+
+        diff = diff_snapshots(before, after)
+
+        self.assertEqual(diff["months"], ["2026-02", "2028-01"])
+        self.assertEqual([module["module_id"] for module in diff["modules"]], [3])
+        self.assertEqual([r["intervention_type"] for r in diff["added"]], ["DA", "P", "BI", "A"])
+        self.assertEqual(diff["removed"], [])
+        rows = {row["intervention_type"]: row["cells"] for row in diff["modules"][0]["rows"]}
+        self.assertEqual(rows["P"][0], {
+            "month": "2026-02", "km": [315_000, 325_000], "is_reset": [False, False], "exceeds": [False, False],
+        })
+        self.assertEqual(diff["changed_cells"], sum(len(cells) for cells in rows.values()))
+
+    def test_diff_aligns_calendar_months(self):
+        """Snapshots con distinto mes de inicio se comparan en los meses comunes."""
+        before = take_snapshot(self.modules, 12, 15_000, taken_on=date(2026, 1, 15))
+        after = take_snapshot(self.modules, 12, 15_000, taken_on=date(2026, 3, 15))
+
+        diff = diff_snapshots(before, after)
+
+        self.assertEqual(diff["months"], ["2026-04", "2027-01"])
+        cell = diff["modules"][1]["rows"][0]["cells"][0]
+        self.assertEqual(cell["month"], "2026-04")
+        self.assertEqual(cell["km"], [245_000, 215_000])
+
+    def test_command_replaces_snapshot_of_the_day(self):
+        """Correr el comando dos veces el mismo día deja un solo snapshot."""
+        for _ in range(2):
+            out = io.StringIO()
+            call_command(
+                "snapshot_projection", "--date", "2026-01-15", "--months", "12", "--compare", stdout=out
+            )
+
+        self.assertEqual(ProjectionSnapshot.objects.count(), 1)
+        self.assertIn("Sin snapshot anterior", out.getvalue())
+
+        out = io.StringIO()
+        call_command("snapshot_projection", "--date", "2026-02-15", "--months", "12", "--compare", stdout=out)
+        self.assertIn("Respecto del 2026-01-15", out.getvalue())
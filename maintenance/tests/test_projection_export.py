@@ -0,0 +1,566 @@
+"""
+Tests de la exportación de proyecciones a Excel.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import os
+import tempfile
+from datetime import date, timedelta
+from pathlib import Path
+from unittest import mock, skipUnless
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from openpyxl import Workbook, load_workbook
+
+from maintenance.models import ExportJob, FleetModule, MaintenanceEvent, MaintenanceProfile, OdometerLog
+from maintenance.services.excel_recalc import check_formula_errors
+from maintenance.services.export_cache import (
+    ExportArtifactCache,
+    projection_workbook,
+    projection_workbook_key,
+)
+from maintenance.services.export_jobs import claim_next_job, requeue_stale_jobs, run_job
+from maintenance.services.projection_excel import ProjectionExcelExporter
+from maintenance.services.projection_grid import MaintenanceProjectionGrid
+from maintenance.services.projection_tabular import parquet_available
+from maintenance.services.projection_xlsx import ProjectionXlsxWriter
+from maintenance.tests import LOCMEM_CACHES
+
+GENERATE_PROJECTION = "maintenance.management.commands.generate_projection"
+
+
+def _use_temp_export_cache(test_case: TestCase) -> Path:
+    """Apunta EXPORT_CACHE_DIR a un directorio temporal durante el test."""
+    directory = test_case.enterContext(tempfile.TemporaryDirectory())
+    test_case.enterContext(override_settings(EXPORT_CACHE_DIR=directory))
+    return Path(directory)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ProjectionExcelExporterTests(TestCase):
+    """Tests para ProjectionExcelExporter."""
+
+    def setUp(self):
+        """Dos módulos proyectados con reseteos y celdas que exceden."""
+        _use_temp_export_cache(self)
+        self.modules = [
+            FleetModule.objects.create(
+                id=module_id,
+                module_type=FleetModule.ModuleType.CUADRUPLA,
+                in_service_date=date(2015, 1, 1),
+                total_accumulated_km=1_400_000,
+            )
+            for module_id in (2, 1)
+        ]
+        self.grid = MaintenanceProjectionGrid(monthly_km=40_000)
+        self.start = date(2026, 1, 15)
+
+    def _export(self, projections) -> io.BytesIO:
+        output = io.BytesIO()
+        ProjectionExcelExporter().export(projections, output, monthly_km=40_000)
+        output.seek(0)
+        return output
+
+    def test_layout_and_styles(self):
+        """Encabezado, filas por módulo y estilos de reseteo y tipo."""
+        projections = self.grid.generate_for_all_modules(self.modules, 6, self.start)
+        ws = load_workbook(self._export(projections)).active
+
+        self.assertEqual(ws.title, "Proyección Mantenimiento")
+        self.assertEqual([str(r) for r in ws.merged_cells.ranges], ["A1:F1"])
+        self.assertEqual(ws["A3"].value, "Km promedio mensual: 40,000 km")
+        self.assertEqual(ws["E5"].value, "Feb 26")
+        self.assertEqual(ws["E5"].fill.fgColor.rgb, "00CCCCCC")
+
+        # Módulo 1 primero; DA se resetea en el 3er mes (1.400.000 + 3 × 40.000)
+        self.assertEqual([ws.cell(row=r, column=1).value for r in range(6, 12)], [1, 1, 1, 1, None, 2])
+        self.assertEqual(ws["B6"].font.color.rgb, "00FF0000")
+        reset = ws["G6"]
+        self.assertEqual(reset.value, "DA")
+        self.assertTrue(reset.font.b)
+        self.assertEqual(reset.fill.fgColor.rgb, "00D8D8D8")
+        self.assertEqual(ws["E6"].number_format, "#,##0")
+        self.assertEqual(ws["E6"].border.left.style, "thin")
+        self.assertEqual(ws.column_dimensions["C"].width, 18)
+
+    def test_iterator_input_matches_dict(self):
+        """Escribir módulo a módulo produce las mismas celdas que el dict."""
+        ordered = sorted(self.modules, key=lambda module: module.id)
+        from_dict = load_workbook(self._export(
+            self.grid.generate_for_all_modules(ordered, 12, self.start)
+        )).active
+        from_iter = load_workbook(self._export(
+            self.grid.iter_for_modules(ordered, 12, self.start)
+        )).active
+
+        self.assertEqual(
+            [[c.value for c in row] for row in from_dict.iter_rows()],
+            [[c.value for c in row] for row in from_iter.iter_rows()],
+        )
+
+    def test_export_view_streams_file(self):
+        """La vista responde con el archivo en streaming como adjunto."""
+        response = self.client.get(reverse("maintenance:projection_export"), {"months": 6})
+
+        self.assertTrue(response.streaming)
+        self.assertIn("attachment;", response["Content-Disposition"])
+        ws = load_workbook(io.BytesIO(b"".join(response.streaming_content))).active
+        # Encabezados hasta la fila 5, 4 filas + separador por módulo (sin el último)
+        self.assertEqual(ws.max_row, 5 + 2 * 5 - 1)
+
+    def test_export_view_error_is_json(self):
+        """Un error al generar el libro responde 500 con JSON, como los jobs."""
+        with mock.patch(
+            "maintenance.views_projection.projection_workbook", side_effect=OSError("disco lleno")
+        ):
+            response = self.client.get(reverse("maintenance:projection_export"))
+
+        self.assertEqual(response.status_code, 500)
+        self.assertEqual(response["Content-Type"], "application/json")
+        self.assertEqual(response.json(), {"error": "Error al exportar a Excel: disco lleno"})
+
+
+def _cell_snapshot(ws) -> list:
+    """Valor y estilo visible de cada celda, para comparar hojas."""
+    return [
+        (
+            cell.coordinate,
+            cell.value,
+            cell.font.b,
+            cell.font.sz,
+            cell.font.color.rgb if cell.font.color else None,
+            cell.fill.fill_type,
+            cell.fill.fgColor.rgb,
+            cell.border.left.style if cell.border.left else None,
+            cell.alignment.horizontal,
+            cell.number_format,
+        )
+        for row in ws.iter_rows()
+        for cell in row
+    ]
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ProjectionXlsxWriterTests(TestCase):
+    """Tests para ProjectionXlsxWriter (XML directo)."""
+
+    def setUp(self):
+        self.modules = [
+            FleetModule.objects.create(
+                id=module_id,
+                module_type=FleetModule.ModuleType.CUADRUPLA,
+                in_service_date=date(2015, 1, 1),
+                total_accumulated_km=1_200_000 + module_id * 150_000,
+            )
+            for module_id in (1, 2, 3)
+        ]
+        self.grid = MaintenanceProjectionGrid(monthly_km=40_000)
+        self.start = date(2026, 1, 15)
+
+    def _load(self, exporter, months: int):
+        output = io.BytesIO()
+        exporter.export(
+            self.grid.iter_for_modules(self.modules, months, self.start),
+            output,
+            monthly_km=40_000,
+        )
+        output.seek(0)
+        return load_workbook(output).active
+
+    def test_matches_openpyxl_exporter(self):
+        """Mismas celdas, estilos, merges, anchos y página que el exportador openpyxl."""
+        expected = self._load(ProjectionExcelExporter(), 24)
+        actual = self._load(ProjectionXlsxWriter(), 24)
+
+        self.assertEqual(actual.title, expected.title)
+        self.assertEqual(_cell_snapshot(actual), _cell_snapshot(expected))
+        self.assertEqual(
+            [str(r) for r in actual.merged_cells.ranges],
+            [str(r) for r in expected.merged_cells.ranges],
+        )
+        self.assertEqual(
+            {k: d.width for k, d in actual.column_dimensions.items()},
+            {k: d.width for k, d in expected.column_dimensions.items()},
+        )
+        self.assertEqual(actual.page_setup.orientation, "landscape")
+        self.assertEqual(actual.page_setup.fitToWidth, expected.page_setup.fitToWidth)
+
+    def test_iter_bytes_yields_bounded_chunks(self):
+        """Se emiten varios bloques no vacíos que juntos forman un xlsx válido."""
+        writer = ProjectionXlsxWriter()
+        writer.CHUNK_SIZE = 1024
+        chunks = list(writer.iter_bytes(
+            self.grid.iter_for_modules(self.modules, 60, self.start), monthly_km=40_000
+        ))
+
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(chunk for chunk in chunks))
+        ws = load_workbook(io.BytesIO(b"".join(chunks))).active
+        self.assertEqual(ws.max_row, 5 + 3 * 5 - 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ExportArtifactCacheTests(TestCase):
+    """Tests para la caché de archivos exportados."""
+
+    def setUp(self):
+        self.directory = _use_temp_export_cache(self)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.modules = [
+                FleetModule.objects.create(
+                    id=module_id,
+                    module_type=FleetModule.ModuleType.CUADRUPLA,
+                    in_service_date=date(2015, 1, 1),
+                    total_accumulated_km=1_000_000,
+                )
+                for module_id in (1, 2)
+            ]
+        self.start = date(2026, 1, 15)
+
+    def _workbook(self, **overrides) -> Path:
+        params = {"months_ahead": 6, "monthly_km": 40_000, "start_date": self.start, **overrides}
+        return projection_workbook(self.modules, **params)
+
+    def test_same_version_and_params_reuse_file(self):
+        """Se genera una vez por combinación de versión de datos y parámetros."""
+        with mock.patch.object(
+            ProjectionXlsxWriter, "export", autospec=True, side_effect=ProjectionXlsxWriter.export
+        ) as export:
+            first = self._workbook()
+            second = self._workbook()
+            other_km = self._workbook(monthly_km=20_000)
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other_km)
+        self.assertEqual(export.call_count, 2)
+        self.assertEqual(load_workbook(first).active["A3"].value, "Km promedio mensual: 40,000 km")
+
+    def test_data_change_invalidates(self):
+        """Un cambio de datos del módulo produce un artefacto nuevo."""
+        before = self._workbook()
+        with self.captureOnCommitCallbacks(execute=True):
+            OdometerLog.objects.create(
+                fleet_module=self.modules[0],
+                reading_date=date(2026, 1, 10),
+                odometer_reading=1_000,
+            )
+
+        self.assertNotEqual(self._workbook(), before)
+
+    def test_evicts_least_recently_used(self):
+        """Al superar max_bytes se borran primero los artefactos menos usados."""
+        cache = ExportArtifactCache(self.directory, max_bytes=25)
+
+        def build(content: bytes):
+            return lambda output: output.write(content)
+
+        old = cache.get_or_build("old", ".bin", build(b"x" * 10))
+        used = cache.get_or_build("used", ".bin", build(b"x" * 10))
+        os.utime(old, (1, 1))
+        os.utime(used, (2, 2))
+        cache.get("used", ".bin")
+        new = cache.get_or_build("new", ".bin", build(b"x" * 10))
+
+        self.assertFalse(old.exists())
+        self.assertTrue(used.exists())
+        self.assertTrue(new.exists())
+
+    def test_failed_build_leaves_no_artifact(self):
+        """Un error al generar no publica un archivo parcial ni deja el lock."""
+        cache = ExportArtifactCache(self.directory)
+
+        def build(output):
+            output.write(b"parcial")
+            raise RuntimeError("falla")
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_build("roto", ".xlsx", build)
+        self.assertEqual(list(self.directory.iterdir()), [])
+
+    def test_view_and_command_share_cached_file(self):
+        """La vista y generate_projection --excel reutilizan el mismo artefacto."""
+        url = reverse("maintenance:projection_export")
+        params = {"months": 6, "monthly_km": 40_000}
+        with mock.patch.object(
+            ProjectionXlsxWriter, "export", autospec=True, side_effect=ProjectionXlsxWriter.export
+        ) as export:
+            first = self.client.get(url, params)
+            second = self.client.get(url, params)
+            output = self.directory / "salida.xlsx"
+            call_command("generate_projection", "--all", "--excel", "--months", "6",
+                         "--km", "40000", "--output", str(output), stdout=io.StringIO())
+
+        self.assertEqual(export.call_count, 1)
+        self.assertEqual(b"".join(first.streaming_content), b"".join(second.streaming_content))
+        self.assertEqual(len(list(self.directory.glob("*.xlsx"))), 2)
+        self.assertEqual(load_workbook(output).active.max_row, 5 + 2 * 5 - 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ExportJobQueueTests(TestCase):
+    """Tests para la cola de exportaciones y run_export_worker."""
+
+    def setUp(self):
+        self.directory = _use_temp_export_cache(self)
+        with self.captureOnCommitCallbacks(execute=True):
+            for module_id in (1, 2, 3):
+                FleetModule.objects.create(
+                    id=module_id,
+                    module_type=FleetModule.ModuleType.CUADRUPLA,
+                    in_service_date=date(2015, 1, 1),
+                    total_accumulated_km=1_000_000,
+                )
+        self.enqueue_url = reverse("maintenance:projection_export_enqueue")
+
+    def _enqueue(self, **params):
+        return self.client.post(self.enqueue_url, {"months": 6, "monthly_km": 40_000, **params})
+
+    def _run_worker(self) -> str:
+        out = io.StringIO()
+        call_command("run_export_worker", "--once", stdout=out)
+        return out.getvalue()
+
+    def test_enqueue_poll_and_download(self):
+        """El job queda en cola, el worker lo genera y se descarga al terminar."""
+        response = self._enqueue()
+        self.assertEqual(response.status_code, 202)
+        job = response.json()
+        self.assertEqual((job["status"], job["total"], job["download_url"]), ("PENDING", 3, None))
+        # Un pedido igual mientras está en cola reutiliza el job
+        self.assertEqual(self._enqueue().json()["id"], job["id"])
+
+        self.assertIn(f"Job #{job['id']}", self._run_worker())
+
+        state = self.client.get(job["status_url"]).json()
+        self.assertEqual((state["status"], state["progress"], state["percent"]), ("OK", 3, 100))
+        download = self.client.get(state["download_url"])
+        self.assertIn("attachment;", download["Content-Disposition"])
+        ws = load_workbook(io.BytesIO(b"".join(download.streaming_content))).active
+        self.assertEqual(ws.max_row, 5 + 3 * 5 - 1)
+
+        # Con el libro en caché, un pedido nuevo nace terminado
+        response = self._enqueue()
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.json()["id"], job["id"])
+        self.assertIsNotNone(response.json()["download_url"])
+
+    def test_failed_job_reports_error(self):
+        """Un error de generación queda en el job; la descarga responde 409."""
+        job = self._enqueue().json()
+        with mock.patch.object(ProjectionXlsxWriter, "export", side_effect=RuntimeError("disco lleno")):
+            self._run_worker()
+
+        state = self.client.get(job["status_url"]).json()
+        self.assertEqual(state["status"], "ERROR")
+        self.assertEqual(state["error"], "RuntimeError: disco lleno")
+        download_url = reverse("maintenance:projection_export_download", args=[job["id"]])
+        self.assertEqual(self.client.get(download_url).status_code, 409)
+
+    def test_evicted_artifact_is_gone(self):
+        """Si el archivo salió de la caché, la descarga responde 410."""
+        job = self._enqueue().json()
+        self._run_worker()
+        for path in self.directory.glob("*.xlsx"):
+            path.unlink()
+
+        state = self.client.get(job["status_url"]).json()
+        self.assertEqual(self.client.get(state["download_url"]).status_code, 410)
+
+    def test_claim_and_requeue_stale(self):
+        """Cada job lo toma un solo worker; uno sin avance vuelve a la cola."""
+        self._enqueue()
+        job = claim_next_job("worker-a")
+        self.assertEqual((job.status, job.worker), (ExportJob.Status.RUNNING, "worker-a"))
+        self.assertIsNone(claim_next_job("worker-b"))
+
+        self.assertEqual(requeue_stale_jobs(), 0)
+        ExportJob.objects.filter(pk=job.pk).update(
+            heartbeat_at=timezone.now() - timedelta(minutes=15)
+        )
+        self.assertEqual(requeue_stale_jobs(), 1)
+        self.assertEqual(claim_next_job("worker-b").pk, job.pk)
+
+    def test_job_heartbeats_while_waiting_for_lock(self):
+        """Esperando el lock de otro worker, el job sigue informando que está vivo."""
+        self._enqueue()
+        job = claim_next_job("worker-a")
+        stale = timezone.now() - timedelta(minutes=15)
+        ExportJob.objects.filter(pk=job.pk).update(heartbeat_at=stale)
+        key = projection_workbook_key([1, 2, 3], 6, 40_000, date.fromisoformat(job.params["start_date"]))
+        lock_path = self.directory / f"{key}.lock"
+        lock_path.touch()
+        heartbeats = []
+
+        def other_worker_finishes(_seconds):
+            heartbeats.append(ExportJob.objects.get(pk=job.pk).heartbeat_at)
+            lock_path.unlink()
+
+        with mock.patch("maintenance.services.export_jobs.HEARTBEAT_INTERVAL", timedelta(0)), \
+                mock.patch("maintenance.services.export_cache.time.sleep", other_worker_finishes):
+            job = run_job(job)
+
+        self.assertEqual(job.status, ExportJob.Status.OK)
+        self.assertEqual(len(heartbeats), 1)
+        self.assertGreater(heartbeats[0], stale)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class TabularExportTests(TestCase):
+    """Tests para la exportación CSV/Parquet en formato largo."""
+
+    def setUp(self):
+        self.directory = _use_temp_export_cache(self)
+        self.modules = [
+            FleetModule.objects.create(
+                id=module_id,
+                module_type=FleetModule.ModuleType.CUADRUPLA,
+                in_service_date=date(2015, 1, 1),
+                total_accumulated_km=1_400_000,
+            )
+            for module_id in (1, 2)
+        ]
+        for day, reading in ((1, 1_000), (2, 1_500)):
+            OdometerLog.objects.create(
+                fleet_module=self.modules[0], reading_date=date(2026, 1, day), odometer_reading=reading
+            )
+        profile = MaintenanceProfile.objects.create(
+            code="P", name="Preventivo", maintenance_type="P", km_interval=750_000
+        )
+        MaintenanceEvent.objects.create(
+            fleet_module=self.modules[1], profile=profile, event_date=date(2025, 6, 1), odometer_km=900_000
+        )
+        self.url = reverse("maintenance:projection_export_tabular")
+
+    def _csv(self, response) -> list[dict]:
+        content = b"".join(response.streaming_content).decode("utf-8")
+        return list(csv.DictReader(io.StringIO(content)))
+
+    def test_projection_csv_long_format(self):
+        """Una fila por módulo, tipo y mes, con flags true/false."""
+        response = self.client.get(self.url, {"months": 6, "monthly_km": 40_000})
+
+        self.assertTrue(response.streaming)
+        self.assertIn(".csv", response["Content-Disposition"])
+        rows = self._csv(response)
+        self.assertEqual(len(rows), 2 * 4 * 6)
+        self.assertEqual(
+            list(rows[0]),
+            ["module_id", "intervention_type", "month", "km_accumulated",
+             "is_reset_point", "exceeds_threshold", "intervention_code"],
+        )
+        self.assertEqual(rows[0]["module_id"], "1")
+        self.assertEqual(len({date.fromisoformat(row["month"]) for row in rows}), 6)
+        # DA se resetea en el 3er mes (1.400.000 + 3 × 40.000)
+        # Módulo 1 (1.500 km por sus lecturas): A se resetea en el 5to mes
+        reset = next(row for row in rows if row["is_reset_point"] == "true")
+        self.assertEqual(
+            (reset["module_id"], reset["intervention_type"], reset["km_accumulated"], reset["intervention_code"]),
+            ("1", "A", "0", "A"),
+        )
+        self.assertEqual({row["exceeds_threshold"] for row in rows} - {"true"}, {"false"})
+
+    def test_history_datasets(self):
+        """Lecturas y eventos crudos de los módulos activos."""
+        odometer = self._csv(self.client.get(self.url, {"dataset": "odometer"}))
+        events = self._csv(self.client.get(self.url, {"dataset": "events"}))
+
+        self.assertEqual(
+            [(r["module_id"], r["reading_date"], r["odometer_reading"]) for r in odometer],
+            [("1", "2026-01-01", "1000"), ("1", "2026-01-02", "1500")],
+        )
+        self.assertEqual(odometer[1]["daily_delta_km"], "500")
+        self.assertEqual(
+            [(r["module_id"], r["intervention_type"], r["odometer_km"]) for r in events],
+            [("2", "P", "900000")],
+        )
+
+    def test_invalid_params(self):
+        """Formato o dataset desconocido responde 400; Parquet sin pyarrow, 501."""
+        self.assertEqual(self.client.get(self.url, {"format": "xml"}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {"dataset": "otros"}).status_code, 400)
+        with mock.patch("maintenance.views_projection.parquet_available", return_value=False):
+            self.assertEqual(self.client.get(self.url, {"format": "parquet"}).status_code, 501)
+
+    @skipUnless(parquet_available(), "pyarrow no instalado")
+    def test_parquet_typed_columns(self):
+        """El Parquet conserva los tipos (fecha, enteros, booleanos)."""
+        import pyarrow.parquet as pq
+
+        response = self.client.get(self.url, {"format": "parquet", "months": 6})
+        table = pq.read_table(io.BytesIO(b"".join(response.streaming_content)))
+
+        self.assertEqual(table.num_rows, 2 * 4 * 6)
+        self.assertEqual(str(table.schema.field("month").type), "date32[day]")
+        self.assertEqual(str(table.schema.field("is_reset_point").type), "bool")
+
+    def test_command_writes_projection_and_history(self):
+        """generate_projection --csv --history escribe los tres archivos."""
+        output = self.directory / "bi.csv"
+        call_command("generate_projection", "--all", "--csv", "--history", "--months", "3",
+                     "--batch-size", "5", "--output", str(output), stdout=io.StringIO())
+
+        with open(output, newline="", encoding="utf-8") as file:
+            self.assertEqual(len(list(csv.DictReader(file))), 2 * 4 * 3)
+        self.assertTrue((self.directory / "bi_odometer.csv").exists())
+        self.assertTrue((self.directory / "bi_events.csv").exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ExcelVerificationTests(TestCase):
+    """Tests para la verificación del Excel de generate_projection."""
+
+    def setUp(self):
+        self.directory = _use_temp_export_cache(self)
+        FleetModule.objects.create(
+            id=1,
+            module_type=FleetModule.ModuleType.CUADRUPLA,
+            in_service_date=date(2015, 1, 1),
+            total_accumulated_km=1_000_000,
+        )
+
+    def _generate(self, *args) -> str:
+        out = io.StringIO()
+        call_command("generate_projection", "--module", "1", "--excel", "--months", "3",
+                     "--output", str(self.directory / "salida.xlsx"), *args, stdout=out)
+        return out.getvalue()
+
+    def test_no_formulas_skips_recalc(self):
+        """Sin fórmulas no se lanza LibreOffice: se verifica el libro en proceso."""
+        with mock.patch("subprocess.run") as run, \
+                mock.patch(f"{GENERATE_PROJECTION}.recalculate_excel") as recalc:
+            output = self._generate()
+
+        run.assert_not_called()
+        recalc.assert_not_called()
+        self.assertIn("Verificado: 0 fórmulas, sin errores", output)
+
+    def test_formula_writer_recalculates(self):
+        """Un escritor con fórmulas pasa por el recálculo de LibreOffice."""
+        result = {"status": "success", "total_errors": 0, "total_formulas": 2}
+        with mock.patch.object(ProjectionXlsxWriter, "WRITES_FORMULAS", True), \
+                mock.patch(f"{GENERATE_PROJECTION}.recalculate_excel", return_value=result) as recalc:
+            output = self._generate("--no-cache")
+
+        recalc.assert_called_once_with(str(self.directory / "salida.xlsx"))
+        self.assertIn("Fórmulas recalculadas", output)
+        self.assertIn("Verificado: 2 fórmulas", output)
+
+    def test_check_formula_errors_streaming(self):
+        """check_formula_errors cuenta fórmulas y ubica errores en modo read-only."""
+        wb = Workbook()
+        ws = wb.active
+        ws.title = "Hoja"
+        ws["A1"] = "=1+1"
+        ws["B2"] = "#DIV/0!"
+        path = self.directory / "formulas.xlsx"
+        wb.save(path)
+
+        result = check_formula_errors(str(path))
+
+        self.assertEqual(result["total_formulas"], 1)
+        self.assertEqual(result["error_summary"], {"#DIV/0!": {"count": 1, "locations": ["Hoja!B2"]}})
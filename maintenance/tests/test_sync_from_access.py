@@ -0,0 +1,697 @@
+"""
+Tests del comando sync_from_access usando el stand-in SQLite de Access.
+
+Valida extracción por lotes, formaciones, carga masiva y recálculo de deltas.
+"""
+from __future__ import annotations
+
+import os
+import sqlite3
+import tempfile
+from datetime import date
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from maintenance.models import (
+    FleetModule,
+    MaintenanceEvent,
+    MaintenanceProfile,
+    OdometerLog,
+    SourceRowHash,
+    SyncLock,
+    SyncPhaseMetric,
+    SyncRun,
+)
+from maintenance.services.access_extractor import BaseExtractor
+from maintenance.services.concurrent_extraction import ConcurrentExtraction
+from maintenance.services.reconciliation import event_checksums, reading_checksums
+from maintenance.services.source_stats import get_connection_stats
+from maintenance.services.sqlite_extractor import SQLiteExtractor, create_schema
+from maintenance.services.sync_lock import advisory_lock
+from maintenance.tests import LOCMEM_CACHES
+
+
+def build_access_stub(path: Path) -> None:
+    """Crea un stand-in mínimo: M01 y M45 (CSR) más un módulo de otra clase."""
+    conn = sqlite3.connect(path)
+    create_schema(conn)
+    conn.executemany(
+        "INSERT INTO A_00_Módulos VALUES (?, ?, ?)",
+        [(1, "M01", 3), (45, "M45", 3), (90, "T01", 2)],
+    )
+    conn.executemany(
+        "INSERT INTO A_00_Kilometrajes (Módulo, kilometraje, Fecha) VALUES (?, ?, ?)",
+        [
+            (1, 1_000_000, "2025-01-01 00:00:00"),
+            (1, 1_050_000, "2025-01-15 00:00:00"),
+            (1, 1_080_000, "2025-02-01 00:00:00"),
+            (45, 500_000, "2025-01-10 00:00:00"),
+            (90, 10_000, "2025-01-10 00:00:00"),
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO A_00_OT_Simaf (Módulo, Tarea, Km, Fecha_Inicio, Fecha_Fin) VALUES (?, ?, ?, ?, ?)",
+        [
+            (1, "IQ1", 1_000_000, "2025-01-01 00:00:00", "2025-01-02 00:00:00"),
+            (1, "AN1", 1_050_000, "2025-01-14 00:00:00", "2025-01-15 00:00:00"),
+            (45, "XX", 500_000, "2025-01-10 00:00:00", "2025-01-10 00:00:00"),
+            (90, "IQ1", 10_000, "2025-01-10 00:00:00", "2025-01-10 00:00:00"),
+        ],
+    )
+    conn.executemany(
+        "INSERT INTO [12_CambioMódulos] (Formación, Módulo, Cabina, Fecha) VALUES (?, ?, ?, ?)",
+        [
+            ("F120", "M01", "A", "2015-08-31 00:00:00"),
+            ("F130", "M01", "B", "2024-05-01 00:00:00"),
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+def _rename_readings_table(path: Path) -> None:
+    """Simula una falla de consulta: la tabla de lecturas deja de existir."""
+    conn = sqlite3.connect(path)
+    conn.execute("ALTER TABLE A_00_Kilometrajes RENAME TO A_00_Kilometrajes_old")
+    conn.commit()
+    conn.close()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SQLiteExtractorTests(TestCase):
+    """Tests del extractor sobre el stand-in SQLite."""
+
+    def setUp(self):
+        self.db_path = Path(tempfile.mkdtemp()) / "access_stub.sqlite3"
+        build_access_stub(self.db_path)
+
+    def test_iter_readings_yields_batches_of_requested_size(self):
+        """Las lecturas se entregan en lotes de ``batch_size`` (solo CSR)."""
+        with SQLiteExtractor(str(self.db_path)) as extractor:
+            batches = list(extractor.iter_odometer_readings(batch_size=2))
+
+        self.assertEqual([len(batch) for batch in batches], [2, 2])
+        self.assertEqual(batches[0][0].reading_date, date(2025, 2, 1))
+
+    def test_get_active_modules_uses_latest_formation(self):
+        """Cada módulo toma la formación de su cambio más reciente."""
+        with SQLiteExtractor(str(self.db_path)) as extractor:
+            modules = {m.module_id: m for m in extractor.get_active_modules()}
+
+        self.assertEqual(set(modules), {"M01", "M45"})
+        self.assertEqual(modules["M01"].formation, "F130")
+        self.assertEqual(modules["M01"].cabin_position, "B")
+        self.assertIsNone(modules["M45"].formation)
+
+    def test_base_extractor_requires_open_connection(self):
+        """``BaseExtractor`` es abstracto: un backend debe implementar ``_open_connection``."""
+        with self.assertRaises(TypeError):
+            BaseExtractor(str(self.db_path))
+
+    def test_latest_odometer_reading_uses_limit(self):
+        """``limit`` se traduce a LIMIT en SQLite."""
+        with SQLiteExtractor(str(self.db_path)) as extractor:
+            self.assertEqual(extractor.get_latest_odometer_reading("M01"), 1_080_000)
+
+    def test_counts_match_extracted_rows(self):
+        """Los COUNT del modo prueba coinciden con lo que se extraería."""
+        with SQLiteExtractor(str(self.db_path)) as extractor:
+            since = date(2025, 1, 10)
+            self.assertEqual(
+                extractor.count_maintenance_events(since_date=since),
+                len(extractor.get_maintenance_events(since_date=since)),
+            )
+            self.assertEqual(
+                extractor.count_odometer_readings(since_date=since),
+                len(extractor.get_odometer_readings(since_date=since)),
+            )
+            self.assertEqual(len(extractor.get_maintenance_events(limit=1)), 1)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ConcurrentExtractionTests(TestCase):
+    """Tests de la extracción concurrente por streams."""
+
+    def setUp(self):
+        self.db_path = Path(tempfile.mkdtemp()) / "access_stub.sqlite3"
+        build_access_stub(self.db_path)
+        self.extractor = SQLiteExtractor(str(self.db_path))
+
+    def test_streams_match_sequential_extraction(self):
+        """Con 1 o 3 hilos el resultado coincide con la extracción secuencial."""
+        with self.extractor as extractor:
+            expected_events = extractor.get_maintenance_events()
+            expected_readings = extractor.get_odometer_readings()
+
+        for workers in (1, 3):
+            with ConcurrentExtraction(self.extractor, max_workers=workers, queue_size=1) as extraction:
+                extraction.start(
+                    modules=True,
+                    events={"batch_size": 1},
+                    readings={"batch_size": 1},
+                )
+                modules = extraction.modules()
+                events = [e for batch in extraction.event_batches() for e in batch]
+                readings = [r for batch in extraction.reading_batches() for r in batch]
+
+            self.assertEqual(len(modules), 2)
+            self.assertEqual(events, expected_events)
+            self.assertEqual(readings, expected_readings)
+
+    def test_keep_warm_reuses_stream_connections(self):
+        """Con ``keep_warm`` los clones quedan conectados para la próxima corrida."""
+        self.extractor.keep_warm = True
+        with ConcurrentExtraction(self.extractor, max_workers=1) as extraction:
+            extraction.start(modules=True, readings={})
+            extraction.modules()
+            list(extraction.reading_batches())
+        warm = {id(clone.conn) for clone in self.extractor._idle_clones}
+
+        with ConcurrentExtraction(self.extractor, max_workers=1) as extraction:
+            extraction.start(modules=True, readings={})
+            extraction.modules()
+            list(extraction.reading_batches())
+
+        self.assertEqual(len(warm), 1)
+        self.assertEqual({id(clone.conn) for clone in self.extractor._idle_clones}, warm)
+        self.extractor.disconnect()
+        self.assertEqual(self.extractor._idle_clones, [])
+
+    def test_close_releases_blocked_producers(self):
+        """Cerrar sin consumir todos los lotes no bloquea el pool."""
+        with ConcurrentExtraction(self.extractor, queue_size=1) as extraction:
+            extraction.start(modules=False, readings={"batch_size": 1})
+            next(iter(extraction.reading_batches()))
+
+    def test_producer_errors_are_raised_on_consume(self):
+        """Un error de conexión del productor se propaga al consumidor."""
+        missing = SQLiteExtractor(str(self.db_path.with_name("missing.sqlite3")))
+        with ConcurrentExtraction(missing) as extraction:
+            extraction.start(modules=True)
+            with self.assertRaises(RuntimeError):
+                extraction.modules()
+
+    def test_query_errors_discard_warm_clone(self):
+        """Un error de consulta llega al consumidor y el clon no vuelve al pool."""
+        _rename_readings_table(self.db_path)
+        self.extractor.keep_warm = True
+        with ConcurrentExtraction(self.extractor, max_workers=1) as extraction:
+            extraction.start(modules=False, readings={})
+            with self.assertRaises(sqlite3.OperationalError):
+                list(extraction.reading_batches())
+
+        self.assertEqual(self.extractor._idle_clones, [])
+
+    def test_dead_warm_clone_is_replaced(self):
+        """Antes de reutilizar un clon ocioso se verifica con una consulta real."""
+        self.extractor.keep_warm = True
+        dead = self.extractor.acquire_clone()
+        self.extractor.release_clone(dead)
+        dead.conn.close()  # la conexión sigue asignada pero ya no responde
+
+        clone = self.extractor.acquire_clone()
+
+        self.assertIsNot(clone, dead)
+        self.assertIsNone(dead.conn)
+        self.assertTrue(clone.is_alive())
+        self.extractor.release_clone(clone)
+        self.extractor.disconnect()
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SyncFromAccessCommandTests(TestCase):
+    """Tests del comando de sincronización con backend SQLite."""
+
+    def setUp(self):
+        self.db_path = Path(tempfile.mkdtemp()) / "access_stub.sqlite3"
+        build_access_stub(self.db_path)
+        MaintenanceProfile.objects.create(name="Inspección Quincenal", code="IQ")
+        MaintenanceProfile.objects.create(name="Revisión Anual", code="A")
+
+    def _sync(self, *args, **options):
+        out = StringIO()
+        call_command(
+            "sync_from_access",
+            *args,
+            backend="sqlite",
+            source=str(self.db_path),
+            since="2024-01-01",
+            stdout=out,
+            **options,
+        )
+        return out.getvalue()
+
+    def test_sync_skips_when_lock_is_held(self):
+        """Con el lock tomado (p. ej. por un ciclo de sync_daemon) no se sincroniza."""
+        with advisory_lock("sync_from_access") as acquired:
+            self.assertTrue(acquired)
+            output = self._sync()
+
+        self.assertIn("Otra sincronización tiene el lock 'sync_from_access'", output)
+        self.assertFalse(FleetModule.objects.exists())
+        self.assertFalse(SyncLock.objects.exists())
+
+        self._sync()
+        self.assertEqual(FleetModule.objects.count(), 2)
+        self.assertFalse(SyncLock.objects.exists())
+
+    def test_sync_loads_modules_events_and_readings(self):
+        """Sincroniza módulos CSR, eventos reconocidos y lecturas con deltas."""
+        self._sync(batch_size=2)
+
+        self.assertEqual(list(FleetModule.objects.values_list("id", flat=True)), [1, 45])
+        self.assertEqual(MaintenanceEvent.objects.count(), 2)
+        self.assertEqual(OdometerLog.objects.count(), 4)
+
+        deltas = list(
+            OdometerLog.objects.filter(fleet_module_id=1)
+            .order_by("reading_date")
+            .values_list("daily_delta_km", flat=True)
+        )
+        self.assertEqual(deltas, [None, 50_000, 30_000])
+        self.assertEqual(FleetModule.objects.get(id=1).total_accumulated_km, 1_080_000)
+
+    def test_sync_twice_is_idempotent(self):
+        """Una segunda corrida no crea registros nuevos."""
+        self._sync()
+        output = self._sync()
+
+        self.assertIn("0 lecturas sincronizadas", output)
+        self.assertEqual(MaintenanceEvent.objects.count(), 2)
+        self.assertEqual(OdometerLog.objects.count(), 4)
+
+    def test_sync_updates_corrected_event_km(self):
+        """Un evento existente con km distinto se actualiza."""
+        self._sync()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("UPDATE A_00_OT_Simaf SET Km = 1001000 WHERE Tarea = 'IQ1' AND Módulo = 1")
+        conn.commit()
+        conn.close()
+
+        self._sync("--events-only")
+
+        event = MaintenanceEvent.objects.get(fleet_module_id=1, profile__code="IQ")
+        self.assertEqual(event.odometer_km, 1_001_000)
+
+    def test_unchanged_rows_are_skipped_by_hash(self):
+        """Las filas ya sincronizadas sin cambios no se vuelven a escribir."""
+        self._sync()
+        output = self._sync()
+
+        self.assertIn("2 eventos sin cambios", output)
+        self.assertIn("4 lecturas sin cambios", output)
+        self.assertEqual(SourceRowHash.objects.count(), 6)
+
+    def test_sync_applies_corrected_reading(self):
+        """Una lectura corregida en Access actualiza km y recalcula deltas."""
+        self._sync()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "UPDATE A_00_Kilometrajes SET kilometraje = 1060000 "
+            "WHERE Módulo = 1 AND Fecha = '2025-01-15 00:00:00'"
+        )
+        conn.commit()
+        conn.close()
+
+        output = self._sync("--readings-only")
+
+        self.assertIn("1 lecturas sincronizadas", output)
+        deltas = list(
+            OdometerLog.objects.filter(fleet_module_id=1)
+            .order_by("reading_date")
+            .values_list("odometer_reading", "daily_delta_km")
+        )
+        self.assertEqual(
+            deltas,
+            [(1_000_000, None), (1_060_000, 60_000), (1_080_000, 20_000)],
+        )
+
+    def test_reading_moved_to_another_date_replaces_old_row(self):
+        """Una corrección de Fecha mueve la lectura (mismo Id_Kilometrajes) sin duplicarla."""
+        self._sync()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "UPDATE A_00_Kilometrajes SET Fecha = '2025-01-20 00:00:00' "
+            "WHERE Módulo = 1 AND Fecha = '2025-01-15 00:00:00'"
+        )
+        conn.commit()
+        conn.close()
+
+        output = self._sync("--readings-only")
+
+        self.assertIn("1 lecturas sincronizadas", output)
+        readings = list(
+            OdometerLog.objects.filter(fleet_module_id=1)
+            .order_by("reading_date")
+            .values_list("reading_date", "odometer_reading", "daily_delta_km")
+        )
+        self.assertEqual(readings, [
+            (date(2025, 1, 1), 1_000_000, None),
+            (date(2025, 1, 20), 1_050_000, 50_000),
+            (date(2025, 2, 1), 1_080_000, 30_000),
+        ])
+
+    def test_reading_moved_onto_existing_date_deletes_old_row(self):
+        """Si la fecha corregida ya tiene lectura, la fila anterior se borra."""
+        self._sync()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "UPDATE A_00_Kilometrajes SET Fecha = '2025-02-01 00:00:00', kilometraje = 1090000 "
+            "WHERE Módulo = 1 AND Fecha = '2025-01-15 00:00:00'"
+        )
+        conn.commit()
+        conn.close()
+
+        self._sync("--readings-only")
+
+        readings = list(
+            OdometerLog.objects.filter(fleet_module_id=1)
+            .order_by("reading_date")
+            .values_list("reading_date", "odometer_reading", "daily_delta_km")
+        )
+        self.assertEqual(readings, [
+            (date(2025, 1, 1), 1_000_000, None),
+            (date(2025, 2, 1), 1_090_000, 90_000),
+        ])
+
+    def test_event_moved_to_another_date_replaces_old_row(self):
+        """Una corrección de Fecha_Fin mueve el evento (mismo Id_OT_Simaf)."""
+        self._sync()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "UPDATE A_00_OT_Simaf SET Fecha_Fin = '2025-01-16 00:00:00' WHERE Tarea = 'AN1'"
+        )
+        conn.commit()
+        conn.close()
+
+        self._sync("--events-only")
+
+        self.assertEqual(
+            list(
+                MaintenanceEvent.objects.filter(fleet_module_id=1, profile__code="A")
+                .values_list("event_date", flat=True)
+            ),
+            [date(2025, 1, 16)],
+        )
+        self.assertEqual(MaintenanceEvent.objects.count(), 2)
+
+    def test_test_mode_reuses_cached_stats(self):
+        """Tras una corrida real, ``--test`` muestra los totales en caché."""
+        self._sync()
+        output = self._sync("--test")
+
+        self.assertIn("Lecturas en Access: 4", output)
+        self.assertIn("estadísticas en caché", output)
+
+    def test_test_mode_does_not_write(self):
+        """``--test`` solo informa, sin modificar la BD."""
+        output = self._sync("--test")
+
+        self.assertIn("Se sincronizarían 4 lecturas", output)
+        self.assertIn("Se sincronizarían 2 eventos", output)
+        self.assertNotIn("Lecturas en Access", output)
+        self.assertEqual(FleetModule.objects.count(), 0)
+        self.assertEqual(OdometerLog.objects.count(), 0)
+
+    @override_settings(ACCESS_SQLITE_PATH="")
+    def test_missing_source_raises_command_error(self):
+        """Sin origen configurado el comando falla con un mensaje claro."""
+        with self.assertRaises(CommandError):
+            call_command("sync_from_access", backend="sqlite", stdout=StringIO())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ReconcileAccessCommandTests(TestCase):
+    """Tests de la reconciliación por particiones (módulo, mes)."""
+
+    def setUp(self):
+        self.db_path = Path(tempfile.mkdtemp()) / "access_stub.sqlite3"
+        build_access_stub(self.db_path)
+        MaintenanceProfile.objects.create(name="Inspección Quincenal", code="IQ")
+        MaintenanceProfile.objects.create(name="Revisión Anual", code="A")
+        call_command(
+            "sync_from_access",
+            backend="sqlite",
+            source=str(self.db_path),
+            since="2024-01-01",
+            stdout=StringIO(),
+        )
+
+    def _reconcile(self, *args, **options):
+        out = StringIO()
+        call_command(
+            "reconcile_access",
+            *args,
+            backend="sqlite",
+            source=str(self.db_path),
+            stdout=out,
+            **options,
+        )
+        return out.getvalue()
+
+    def test_checksums_match_after_sync(self):
+        """Los agregados por mes coinciden en ambos lados tras sincronizar."""
+        with SQLiteExtractor(str(self.db_path)) as extractor:
+            access = extractor.get_reading_checksums(by_month=True)
+            events = extractor.get_event_checksums(by_month=True)
+
+        self.assertEqual(set(access), {(1, 2025, 1), (1, 2025, 2), (45, 2025, 1)})
+        self.assertEqual(access[(1, 2025, 1)].count, 2)
+        self.assertEqual(access[(1, 2025, 1)].km_total, 2_050_000)
+        self.assertEqual(access, reading_checksums(by_month=True))
+        self.assertEqual(events, event_checksums(by_month=True))
+
+    def test_reconcile_without_differences(self):
+        """Sin diferencias no se resincroniza ninguna partición."""
+        output = self._reconcile()
+
+        self.assertIn("Eventos sin diferencias", output)
+        self.assertIn("Lecturas sin diferencias", output)
+
+    def test_reconcile_with_duplicated_source_rows(self):
+        """Filas repetidas en Access cuentan una vez por clave, como las escribe el sync."""
+        conn = sqlite3.connect(self.db_path)
+        conn.execute(
+            "INSERT INTO A_00_Kilometrajes (Módulo, kilometraje, Fecha) VALUES (?, ?, ?)",
+            (1, 1_060_000, "2025-01-15 00:00:00"),
+        )
+        conn.execute(
+            "INSERT INTO A_00_OT_Simaf (Módulo, Tarea, Km, Fecha_Inicio, Fecha_Fin) VALUES (?, ?, ?, ?, ?)",
+            (1, "AN2", 1_049_000, "2025-01-14 00:00:00", "2025-01-15 00:00:00"),
+        )
+        conn.commit()
+        conn.close()
+        call_command(
+            "sync_from_access",
+            backend="sqlite",
+            source=str(self.db_path),
+            since="2024-01-01",
+            stdout=StringIO(),
+        )
+
+        with SQLiteExtractor(str(self.db_path)) as extractor:
+            access = extractor.get_reading_checksums(by_month=True)
+            events = extractor.get_event_checksums(by_month=True)
+
+        self.assertEqual(access[(1, 2025, 1)].count, 2)
+        self.assertEqual(access[(1, 2025, 1)].km_total, 2_050_000)
+        self.assertEqual(access, reading_checksums(by_month=True))
+        self.assertEqual(events[(1, 2025, 1)].count, 2)
+        self.assertEqual(events, event_checksums(by_month=True))
+        output = self._reconcile()
+        self.assertIn("Eventos sin diferencias", output)
+        self.assertIn("Lecturas sin diferencias", output)
+
+    def test_reconcile_restores_only_differing_partition(self):
+        """Una lectura borrada en Django se recupera aunque su hash siga registrado."""
+        OdometerLog.objects.filter(fleet_module_id=1, reading_date=date(2025, 1, 15)).delete()
+
+        output = self._reconcile("--readings-only")
+
+        self.assertIn("1 particiones de lecturas con diferencias", output)
+        self.assertIn("Módulo 01 - 01/2025", output)
+        self.assertIn("1 lecturas resincronizadas", output)
+        deltas = list(
+            OdometerLog.objects.filter(fleet_module_id=1)
+            .order_by("reading_date")
+            .values_list("daily_delta_km", flat=True)
+        )
+        self.assertEqual(deltas, [None, 50_000, 30_000])
+
+    def test_dry_run_does_not_write(self):
+        """``--dry-run`` informa las particiones sin modificar la BD."""
+        MaintenanceEvent.objects.filter(fleet_module_id=1, profile__code="A").delete()
+
+        output = self._reconcile("--dry-run", "--events-only")
+
+        self.assertIn("1 particiones de eventos con diferencias", output)
+        self.assertEqual(MaintenanceEvent.objects.count(), 1)
+
+    def test_reconcile_deletes_rows_missing_from_access(self):
+        """Las filas que ya no están en Access se borran y la partición converge."""
+        OdometerLog.objects.create(fleet_module_id=1, reading_date=date(2025, 1, 20), odometer_reading=1_070_000)
+        MaintenanceEvent.objects.create(
+            fleet_module_id=1,
+            profile=MaintenanceProfile.objects.get(code="IQ"),
+            event_date=date(2025, 1, 20),
+            odometer_km=1_070_000,
+        )
+
+        output = self._reconcile()
+
+        self.assertIn("eventos resincronizados, 1 borrados", output)
+        self.assertIn("lecturas resincronizadas, 1 borradas", output)
+        self.assertFalse(OdometerLog.objects.filter(reading_date=date(2025, 1, 20)).exists())
+        self.assertFalse(MaintenanceEvent.objects.filter(event_date=date(2025, 1, 20)).exists())
+        self.assertEqual(
+            list(OdometerLog.objects.filter(fleet_module_id=1).order_by("reading_date")
+                 .values_list("daily_delta_km", flat=True)),
+            [None, 50_000, 30_000],
+        )
+        output = self._reconcile()
+        self.assertIn("Eventos sin diferencias", output)
+        self.assertIn("Lecturas sin diferencias", output)
+
+    def test_django_only_partitions_need_delete_orphans(self):
+        """Un mes sin filas en Access se informa sin resolver salvo con ``--delete-orphans``."""
+        OdometerLog.objects.create(fleet_module_id=1, reading_date=date(2025, 3, 5), odometer_reading=1_100_000)
+
+        output = self._reconcile("--readings-only")
+
+        self.assertIn("Módulo 01 - 03/2025 (solo en Django, sin resolver", output)
+        self.assertTrue(OdometerLog.objects.filter(reading_date=date(2025, 3, 5)).exists())
+
+        output = self._reconcile("--readings-only", "--delete-orphans")
+
+        self.assertIn("(solo en Django, se elimina)", output)
+        self.assertFalse(OdometerLog.objects.filter(reading_date=date(2025, 3, 5)).exists())
+        self.assertIn("Lecturas sin diferencias", self._reconcile("--readings-only"))
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SyncDaemonCommandTests(TestCase):
+    """Tests del daemon de sincronización (lock, backoff y métricas)."""
+
+    def setUp(self):
+        self.db_path = Path(tempfile.mkdtemp()) / "access_stub.sqlite3"
+        build_access_stub(self.db_path)
+
+    def _daemon(self, *args, source=None, **options):
+        out = StringIO()
+        with patch("maintenance.management.commands.sync_daemon.time.sleep") as sleep:
+            call_command(
+                "sync_daemon",
+                *args,
+                backend="sqlite",
+                source=source or str(self.db_path),
+                since="2024-01-01",
+                stdout=out,
+                **options,
+            )
+        return out.getvalue(), [c.args[0] for c in sleep.call_args_list]
+
+    def test_records_phase_metrics_per_cycle(self):
+        """Cada ciclo registra duración y filas por fase."""
+        _, sleeps = self._daemon(max_cycles=2, interval=30)
+
+        self.assertEqual(sleeps, [30])
+        runs = list(SyncRun.objects.order_by("started_at"))
+        self.assertEqual([run.status for run in runs], [SyncRun.Status.OK] * 2)
+        phases = {m.phase: m.row_count for m in runs[0].phases.all()}
+        self.assertEqual(phases, {"connect": 0, "modules": 2, "events": 0, "readings": 4})
+        self.assertEqual(SyncPhaseMetric.objects.filter(run=runs[1], phase="readings").get().row_count, 0)
+
+    def test_backs_off_exponentially_on_errors(self):
+        """Los fallos consecutivos duplican la espera hasta el máximo."""
+        missing = str(self.db_path.with_name("missing.sqlite3"))
+
+        _, sleeps = self._daemon(source=missing, max_cycles=4, backoff_base=10, backoff_max=25)
+
+        self.assertEqual(sleeps, [10, 20, 25])
+        self.assertEqual(
+            list(SyncRun.objects.order_by("started_at").values_list("consecutive_failures", flat=True)),
+            [1, 2, 3, 4],
+        )
+        self.assertFalse(SyncRun.objects.exclude(status=SyncRun.Status.ERROR).exists())
+
+    def test_query_errors_fail_the_cycle(self):
+        """Un error de consulta en la extracción se registra como fallo, con backoff."""
+        _rename_readings_table(self.db_path)
+
+        output, sleeps = self._daemon(max_cycles=2, backoff_base=10)
+
+        self.assertEqual(sleeps, [10])
+        runs = list(SyncRun.objects.order_by("started_at"))
+        self.assertEqual([run.status for run in runs], [SyncRun.Status.ERROR] * 2)
+        self.assertEqual([run.consecutive_failures for run in runs], [1, 2])
+        self.assertIn("A_00_Kilometrajes", runs[0].error)
+
+    def test_skips_cycle_when_lock_is_held(self):
+        """Si otra instancia tiene el lock, el ciclo no sincroniza."""
+        with advisory_lock("sync_from_access") as acquired:
+            self.assertTrue(acquired)
+            output, _ = self._daemon(max_cycles=1)
+
+        self.assertIn("Otra instancia está sincronizando", output)
+        self.assertFalse(SyncRun.objects.exists())
+        self.assertFalse(SyncLock.objects.exists())
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class SourceStatsCacheTests(TestCase):
+    """Tests de la caché de estadísticas y fingerprint de esquema."""
+
+    def setUp(self):
+        self.db_path = Path(tempfile.mkdtemp()) / "access_stub.sqlite3"
+        build_access_stub(self.db_path)
+
+    def _stats(self, **kwargs):
+        with SQLiteExtractor(str(self.db_path)) as extractor:
+            with patch.object(extractor, "test_connection", wraps=extractor.test_connection) as probe:
+                stats = get_connection_stats(extractor, **kwargs)
+            return stats, probe.call_count
+
+    def test_second_call_is_served_from_cache(self):
+        """Sin cambios en el origen, los COUNT no se repiten."""
+        first, first_calls = self._stats()
+        second, second_calls = self._stats()
+
+        self.assertEqual((first_calls, second_calls), (1, 0))
+        self.assertFalse(first["cached"])
+        self.assertTrue(second["cached"])
+        self.assertEqual(second["readings_count"], 4)
+        self.assertEqual(second["schema_fingerprint"], first["schema_fingerprint"])
+
+    def test_source_mtime_change_invalidates(self):
+        """Modificar el archivo de origen invalida la caché."""
+        self._stats()
+        mtime = os.stat(self.db_path).st_mtime
+        os.utime(self.db_path, (mtime + 10, mtime + 10))
+
+        stats, calls = self._stats()
+
+        self.assertEqual(calls, 1)
+        self.assertFalse(stats["cached"])
+
+    def test_schema_change_is_reported(self):
+        """Un cambio de columnas se informa al recalcular."""
+        self._stats()
+        conn = sqlite3.connect(self.db_path)
+        conn.execute("ALTER TABLE A_00_Kilometrajes ADD COLUMN Observaciones TEXT")
+        conn.commit()
+        conn.close()
+
+        stats, _ = self._stats(refresh=True)
+
+        self.assertTrue(stats["schema_changed"])
+
+    def test_compute_false_does_not_query(self):
+        """Con ``compute=False`` y sin caché no se ejecutan COUNT."""
+        stats, calls = self._stats(compute=False)
+
+        self.assertEqual((stats, calls), ({}, 0))
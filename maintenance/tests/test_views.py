@@ -0,0 +1,608 @@
+"""
+Tests de las vistas del dashboard y de la grilla de proyección.
+
+Valida métricas por módulo, que la cantidad de consultas no crezca con la
+flota y que las tarjetas cacheadas se invaliden al escribir datos.
+"""
+from __future__ import annotations
+
+import io
+import json
+import time
+from datetime import date, timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import transaction
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from maintenance.models import (
+    FleetModule,
+    MaintenanceEvent,
+    MaintenanceProfile,
+    OdometerLog,
+    ProjectionSnapshot,
+)
+from maintenance.services.data_versions import (
+    bump_module_versions,
+    changed_since,
+    delta_token,
+    get_module_versions,
+    parse_delta_token,
+)
+from maintenance.services.projection_grid import MaintenanceProjectionGrid
+from maintenance.services.projection_html import ProjectionTableRenderer
+from maintenance.services.projection_snapshots import take_snapshot
+from maintenance.tests import LOCMEM_CACHES
+
+# Bucles que tenía projection.html, como referencia del markup esperado
+LEGACY_MONTHS_TEMPLATE = (
+    '{% with first_module=projections.modules|first %}\n'
+    '                            {% if first_module %}\n'
+    '                                {% with first_row=first_module.rows|first %}\n'
+    '                                    {% if first_row %}\n'
+    '                                        {% for cell in first_row.cells %}\n'
+    '                                            <th>{{ cell.month }}</th>\n'
+    '                                        {% endfor %}\n'
+    '                                    {% endif %}\n'
+    '                                {% endwith %}\n'
+    '                            {% endif %}\n'
+    '                        {% endwith %}'
+)
+LEGACY_ROWS_TEMPLATE = (
+    '{% for module in projections.modules %}\n'
+    '                        {% for row in module.rows %}\n'
+    '                            <tr>\n'
+    '                                <!-- N° Módulo (solo en primera fila del módulo) -->\n'
+    '                                {% if forloop.first %}\n'
+    '                                    <td rowspan="4" class="col-module">{{ module.module_id }}</td>\n'
+    '                                {% endif %}\n'
+    '                                \n'
+    '                                <!-- Tipo de Intervención -->\n'
+    '                                <td class="col-intervention type-{{ row.intervention_type }}">\n'
+    '                                    {{ row.intervention_type }}\n'
+    '                                </td>\n'
+    '                                \n'
+    '                                <!-- Fecha Último Evento -->\n'
+    '                                <td>\n'
+    '                                    {% if row.last_event_date %}\n'
+    '                                        {{ row.last_event_date|date:"d/m/Y" }}\n'
+    '                                    {% else %}\n'
+    '                                        N/A\n'
+    '                                    {% endif %}\n'
+    '                                </td>\n'
+    '                                \n'
+    '                                <!-- Km Acumulado -->\n'
+    '                                <td class="col-km">{{ row.initial_km|floatformat:0 }}</td>\n'
+    '                                \n'
+    '                                <!-- Celdas de proyección -->\n'
+    '                                {% for cell in row.cells %}\n'
+    '                                    <td class="col-km \n'
+    '                                        {% if cell.is_reset %}cell-reset{% elif cell.exceeds %}cell-exceeds-{{ row.intervention_type }}{% endif %}">\n'
+    '                                        {% if cell.is_reset %}\n'
+    '                                            {{ cell.intervention }}\n'
+    '                                        {% else %}\n'
+    '                                            {{ cell.km|floatformat:0 }}\n'
+    '                                        {% endif %}\n'
+    '                                    </td>\n'
+    '                                {% endfor %}\n'
+    '                            </tr>\n'
+    '                        {% endfor %}\n'
+    '                        <!-- Separador entre módulos -->\n'
+    '                        <tr class="module-separator">\n'
+    '                            <td colspan="100"></td>\n'
+    '                        </tr>\n'
+    '                    {% endfor %}'
+)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class DashboardViewTests(TestCase):
+    """Tests para dashboard_view."""
+
+    def setUp(self):
+        """Crea perfiles y un helper de módulos con lecturas y eventos."""
+        cache.clear()
+        self.today = date.today()
+        self.iq = MaintenanceProfile.objects.create(name="Inspección Quincenal", code="IQ")
+        self.anual = MaintenanceProfile.objects.create(name="Revisión Anual", code="A")
+
+    def _create_module(self, module_id: int) -> FleetModule:
+        """Módulo con 3 lecturas diarias de 500 km y dos eventos."""
+        module = FleetModule.objects.create(
+            id=module_id,
+            module_type=FleetModule.ModuleType.CUADRUPLA,
+            in_service_date=date(2015, 1, 1),
+        )
+        for offset, reading in ((2, 1_000_000), (1, 1_000_500), (0, 1_001_000)):
+            OdometerLog.objects.create(
+                fleet_module=module,
+                reading_date=self.today - timedelta(days=offset),
+                odometer_reading=reading,
+            )
+        MaintenanceEvent.objects.create(
+            fleet_module=module, profile=self.iq,
+            event_date=self.today - timedelta(days=20), odometer_km=990_000,
+        )
+        MaintenanceEvent.objects.create(
+            fleet_module=module, profile=self.anual,
+            event_date=self.today - timedelta(days=10), odometer_km=995_000,
+        )
+        return module
+
+    def test_module_metrics(self):
+        """Promedio, último evento y km desde el evento por módulo."""
+        self._create_module(1)
+
+        response = self.client.get(reverse("maintenance:dashboard"))
+
+        data = response.context["modules_data"][0]
+        self.assertEqual(data["daily_avg_km"], 500)
+        self.assertIn('<span class="event-type">A</span>', data["html"])
+        self.assertIn("10 días", data["html"])
+        self.assertIn("6.000 km", data["html"])
+        self.assertEqual(response.context["stats"]["total_modules"], 1)
+
+    def test_query_count_is_constant(self):
+        """En frío, la misma cantidad de consultas con 1 o 6 módulos."""
+        self._create_module(1)
+        with self.assertNumQueries(2):
+            self.client.get(reverse("maintenance:dashboard"))
+
+        for module_id in range(2, 7):
+            self._create_module(module_id)
+        cache.clear()
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("maintenance:dashboard"))
+
+        self.assertEqual(len(response.context["modules_data"]), 6)
+
+    def test_warm_dashboard_renders_from_cache(self):
+        """Con la caché caliente solo se consulta la lista de módulos."""
+        for module_id in range(1, 4):
+            self._create_module(module_id)
+        cold = self.client.get(reverse("maintenance:dashboard"))
+
+        with self.assertNumQueries(1):
+            warm = self.client.get(reverse("maintenance:dashboard"))
+
+        self.assertEqual(warm.content, cold.content)
+
+    def test_write_invalidates_only_that_module(self):
+        """Una lectura nueva cambia la versión del módulo y recalcula su tarjeta."""
+        with self.captureOnCommitCallbacks(execute=True):
+            for module_id in range(1, 4):
+                module = self._create_module(module_id)
+        self.client.get(reverse("maintenance:dashboard"))
+        before = get_module_versions([1, 2, 3])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            OdometerLog.objects.create(
+                fleet_module=module,
+                reading_date=self.today + timedelta(days=1),
+                odometer_reading=1_001_700,
+            )
+
+        after = get_module_versions([1, 2, 3])
+        self.assertNotEqual(after[3], before[3])
+        self.assertEqual(after[1], before[1])
+
+        # Lista de módulos + métricas y último evento del módulo 3
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("maintenance:dashboard"))
+        self.assertIn("1.001.700 km", response.context["modules_data"][2]["html"])
+
+    def test_bump_is_deferred_to_commit(self):
+        """Dentro de una transacción la versión cambia recién en el commit."""
+        before = get_module_versions([1])
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            bump_module_versions([1])
+            bump_module_versions([1])
+            self.assertEqual(get_module_versions([1]), before)
+
+        callbacks[0]()
+        bumped = get_module_versions([1])
+        self.assertNotEqual(bumped, before)
+        # El resto de los registros del mismo callback no vuelve a publicar
+        for callback in callbacks[1:]:
+            callback()
+        self.assertEqual(get_module_versions([1]), bumped)
+
+    def test_bump_survives_rolled_back_savepoint(self):
+        """Un rollback que descarta el callback no impide publicar después."""
+        before = get_module_versions([1])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    bump_module_versions([1])
+                    raise RuntimeError
+            bump_module_versions([1])
+
+        self.assertNotEqual(get_module_versions([1]), before)
+
+    def test_filtered_dashboard_query_count(self):
+        """Con filtro solo se calcula la tarjeta del módulo elegido."""
+        for module_id in range(1, 4):
+            self._create_module(module_id)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("maintenance:dashboard"), {"module": "2"})
+
+        self.assertEqual([d["module_id"] for d in response.context["modules_data"]], [2])
+        self.assertEqual(len(response.context["all_modules"]), 3)
+        self.assertIsNone(response.context["stats"])
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ProjectionTableRendererTests(TestCase):
+    """Tests para ProjectionTableRenderer."""
+
+    def setUp(self):
+        """Dos módulos, uno con eventos, proyectados con reseteos."""
+        anual = MaintenanceProfile.objects.create(name="Revisión Anual", code="A")
+        modules = []
+        for module_id in (3, 1):
+            modules.append(FleetModule.objects.create(
+                id=module_id,
+                module_type=FleetModule.ModuleType.TRIPLA,
+                in_service_date=date(2015, 1, 1),
+                total_accumulated_km=1_400_000,
+            ))
+        MaintenanceEvent.objects.create(
+            fleet_module=modules[0], profile=anual,
+            event_date=date(2025, 3, 1), odometer_km=1_300_000,
+        )
+        self.grid = MaintenanceProjectionGrid(monthly_km=40_000)
+        self.projections = self.grid.generate_for_all_modules(
+            modules, months_ahead=30, start_date=date(2026, 1, 31)
+        )
+
+    def test_matches_legacy_template_markup(self):
+        """Mismo HTML, byte a byte, que los bucles {% for %} del template."""
+        context = Context({"projections": self.grid.export_to_dict(self.projections)})
+        renderer = ProjectionTableRenderer()
+
+        self.assertEqual(
+            renderer.render_months(self.projections),
+            Template(LEGACY_MONTHS_TEMPLATE).render(context),
+        )
+        rows_html = renderer.render_rows(self.projections)
+        self.assertEqual(rows_html, Template(LEGACY_ROWS_TEMPLATE).render(context))
+        self.assertIn("cell-reset", rows_html)
+
+    def test_projection_view_injects_rendered_rows(self):
+        """La vista incluye las filas renderizadas en la página."""
+        response = self.client.get(reverse("maintenance:projection_view"), {"months": 12})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '<td rowspan="4" class="col-module">1</td>', html=False)
+        self.assertContains(response, "<th>", count=12)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ProjectionApiPaginationTests(TestCase):
+    """Tests para los bloques de projection_api y la grilla paginada."""
+
+    def setUp(self):
+        """Doce módulos sin eventos."""
+        for module_id in range(1, 13):
+            FleetModule.objects.create(
+                id=module_id,
+                module_type=FleetModule.ModuleType.CUADRUPLA,
+                in_service_date=date(2015, 1, 1),
+                total_accumulated_km=100_000,
+            )
+
+    def _get(self, **params):
+        return self.client.get(reverse("maintenance:projection_api"), {"months": 24, **params})
+
+    def test_module_block_and_next_cursor(self):
+        """limit corta el bloque y next_module_from apunta al siguiente."""
+        data = self._get(module_from=3, limit=4).json()
+
+        self.assertEqual([m["module_id"] for m in data["modules"]], [3, 4, 5, 6])
+        self.assertEqual(data["page"]["next_module_from"], 7)
+        self.assertEqual(data["page"]["total_modules"], 12)
+
+        last = self._get(module_from=11, limit=4).json()
+        self.assertEqual([m["module_id"] for m in last["modules"]], [11, 12])
+        self.assertIsNone(last["page"]["next_module_from"])
+
+    def test_types_and_month_window(self):
+        """La ventana recorta tipos y meses sin cambiar los valores."""
+        full = self._get(module_to=1).json()["modules"][0]["rows"]
+        data = self._get(module_to=1, types="a,bi", month_from=5, month_to=8).json()
+
+        rows = data["modules"][0]["rows"]
+        self.assertEqual([r["intervention_type"] for r in rows], ["BI", "A"])
+        self.assertEqual(rows[1]["cells"], full[3]["cells"][4:8])
+        self.assertNotIn("rows_html", data)
+
+    def test_html_rows_for_the_page(self):
+        """html=1 devuelve las filas de la grilla del bloque en lugar del JSON."""
+        data = self._get(module_from=2, limit=1, types="DA,A", html=1).json()
+
+        self.assertIn('<td rowspan="2" class="col-module">2</td>', data["rows_html"])
+        self.assertNotIn("modules", data)
+
+    def test_invalid_window_returns_400(self):
+        """Parámetros de bloque inválidos devuelven 400 con el motivo."""
+        for params in ({"limit": 0}, {"month_from": 10, "month_to": 5},
+                       {"month_to": 25}, {"types": "X"}, {"module_from": "a"}):
+            response = self._get(**params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn("error", response.json())
+
+    def test_projection_view_renders_first_block(self):
+        """La página trae solo el primer bloque y el cursor del siguiente."""
+        response = self.client.get(reverse("maintenance:projection_view"))
+
+        self.assertContains(response, 'class="col-module">', count=10)
+        self.assertContains(response, 'data-next="11"')
+        self.assertEqual(response.context["total_modules"], 12)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ProjectionApiColumnarTests(TestCase):
+    """Tests para format=columnar y GET condicional de projection_api."""
+
+    def setUp(self):
+        """Un módulo cerca del umbral A para tener reseteos."""
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.module = FleetModule.objects.create(
+                id=1,
+                module_type=FleetModule.ModuleType.CUADRUPLA,
+                in_service_date=date(2015, 1, 1),
+                total_accumulated_km=150_000,
+            )
+
+    def _get(self, headers=None, **params):
+        return self.client.get(
+            reverse("maintenance:projection_api"),
+            {"months": 40, "monthly_km": 20_000, **params},
+            headers=headers,
+        )
+
+    def test_columnar_matches_nested(self):
+        """Mismos km y flags que el formato anidado, con eje de meses compartido."""
+        nested = self._get().json()["modules"][0]["rows"]
+        columnar = self._get(format="columnar").json()
+
+        self.assertEqual(columnar["months"], [c["month"] for c in nested[0]["cells"]])
+        for row, expected in zip(columnar["modules"][0]["rows"], nested):
+            self.assertEqual(row["km"], [c["km"] for c in expected["cells"]])
+            for flag in ("reset", "exceeds"):
+                decoded = [
+                    bool(row[flag][i // 32] >> (i % 32) & 1) for i in range(len(row["km"]))
+                ]
+                key = "is_reset" if flag == "reset" else "exceeds"
+                self.assertEqual(decoded, [c[key] for c in expected["cells"]])
+        self.assertEqual(len(columnar["modules"][0]["rows"][0]["reset"]), 2)
+
+    def test_conditional_get_until_data_changes(self):
+        """304 con el mismo ETag; una lectura nueva cambia la versión y el ETag."""
+        first = self._get(format="columnar")
+        self.assertTrue(first.has_header("Last-Modified"))
+
+        cached = self._get(format="columnar", headers={"If-None-Match": first["ETag"]})
+        self.assertEqual(cached.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            OdometerLog.objects.create(
+                fleet_module=self.module, reading_date=date.today(), odometer_reading=160_000,
+            )
+
+        changed = self._get(format="columnar", headers={"If-None-Match": first["ETag"]})
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], first["ETag"])
+
+    def test_gzip_and_invalid_format(self):
+        """Respuesta comprimida si el cliente acepta gzip; formato desconocido es 400."""
+        response = self._get(format="columnar", headers={"Accept-Encoding": "gzip"})
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+        self.assertEqual(self._get(format="xml").status_code, 400)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ProjectionNdjsonTests(TestCase):
+    """Tests para la salida NDJSON de projection_api y generate_projection."""
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            for module_id in (1, 2, 3):
+                FleetModule.objects.create(
+                    id=module_id,
+                    module_type=FleetModule.ModuleType.CUADRUPLA,
+                    in_service_date=date(2015, 1, 1),
+                    total_accumulated_km=150_000 * module_id,
+                )
+
+    def _get(self, **params):
+        return self.client.get(
+            reverse("maintenance:projection_api"), {"months": 12, "monthly_km": 20_000, **params}
+        )
+
+    @staticmethod
+    def _lines(content: bytes) -> list[dict]:
+        return [json.loads(line) for line in content.decode("utf-8").splitlines()]
+
+    def test_api_streams_one_line_per_row(self):
+        """Encabezado con page/params y luego las filas del formato anidado, en orden."""
+        response = self._get(format="ndjson", limit=2, types="DA,A", month_to=6)
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response["Content-Type"], "application/x-ndjson")
+        header, *rows = self._lines(b"".join(response.streaming_content))
+        nested = self._get(limit=2, types="DA,A", month_to=6).json()
+
+        self.assertEqual(header["type"], "header")
+        self.assertEqual(header["page"], nested["page"])
+        self.assertEqual(header["params"], nested["params"])
+        self.assertEqual(
+            [{k: v for k, v in row.items() if k not in ("type", "module_id")} for row in rows],
+            [row for module in nested["modules"] for row in module["rows"]],
+        )
+        self.assertEqual([(r["module_id"], r["intervention_type"]) for r in rows],
+                         [(1, "DA"), (1, "A"), (2, "DA"), (2, "A")])
+        self.assertEqual(len(rows[0]["cells"]), 6)
+
+    def test_api_reports_errors_in_stream(self):
+        """Un error a mitad del streaming queda como última línea."""
+        with mock.patch(
+            "maintenance.services.projection_grid.MaintenanceProjectionGrid.generate_for_module",
+            side_effect=RuntimeError("sin datos"),
+        ):
+            lines = self._lines(b"".join(self._get(format="ndjson").streaming_content))
+
+        self.assertEqual([line["type"] for line in lines], ["header", "error"])
+        self.assertEqual(lines[-1]["error"], "sin datos")
+
+    def test_command_ndjson_matches_json(self):
+        """generate_projection --ndjson emite las mismas filas que --json."""
+        outputs = {}
+        for flag in ("--json", "--ndjson"):
+            out = io.StringIO()
+            call_command("generate_projection", "--all", flag, "--months", "6", stdout=out)
+            outputs[flag] = out.getvalue()
+
+        header, *rows = self._lines(outputs["--ndjson"].encode("utf-8"))
+        full = json.loads(outputs["--json"])
+        self.assertEqual(header["monthly_km"], full["monthly_km"])
+        self.assertEqual(
+            [(row.pop("type"), row.pop("module_id"), row) for row in rows],
+            [("row", module["module_id"], row) for module in full["modules"] for row in module["rows"]],
+        )
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ProjectionSnapshotViewTests(TestCase):
+    """Tests para el listado y la comparación de snapshots."""
+
+    def setUp(self):
+        self.module = FleetModule.objects.create(
+            id=1,
+            module_type=FleetModule.ModuleType.CUADRUPLA,
+            in_service_date=date(2015, 1, 1),
+            total_accumulated_km=100_000,
+        )
+        self.first = take_snapshot([self.module], 12, 15_000, taken_on=date(2026, 1, 10))
+        FleetModule.objects.filter(id=1).update(total_accumulated_km=120_000)
+        self.module.refresh_from_db()
+        self.second = take_snapshot([self.module], 12, 15_000, taken_on=date(2026, 1, 11))
+
+    def test_diff_defaults_to_latest_pair(self):
+        """Sin parámetros compara el último snapshot con el anterior."""
+        data = self.client.get(reverse("maintenance:projection_snapshot_diff")).json()
+
+        self.assertEqual((data["from"]["id"], data["to"]["id"]), (self.first.pk, self.second.pk))
+        self.assertEqual(data["changed_cells"], 4 * 12)
+        explicit = self.client.get(
+            reverse("maintenance:projection_snapshot_diff"), {"from": self.second.pk, "to": self.second.pk}
+        ).json()
+        self.assertEqual(explicit["modules"], [])
+
+    def test_list_and_errors(self):
+        """Listado del más reciente al más viejo; ids inválidos o inexistentes."""
+        listed = self.client.get(reverse("maintenance:projection_snapshots")).json()["snapshots"]
+        self.assertEqual([s["id"] for s in listed], [self.second.pk, self.first.pk])
+
+        url = reverse("maintenance:projection_snapshot_diff")
+        self.assertEqual(self.client.get(url, {"to": "x"}).status_code, 400)
+        self.assertEqual(self.client.get(url, {"to": 999}).status_code, 404)
+        self.assertEqual(self.client.get(url, {"to": self.first.pk}).status_code, 404)
+        ProjectionSnapshot.objects.all().delete()
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+@override_settings(CACHES=LOCMEM_CACHES)
+class ProjectionApiDeltaTests(TestCase):
+    """Tests para since=<version> en projection_api."""
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.modules = [
+                FleetModule.objects.create(
+                    id=module_id,
+                    module_type=FleetModule.ModuleType.CUADRUPLA,
+                    in_service_date=date(2015, 1, 1),
+                    total_accumulated_km=100_000 * module_id,
+                )
+                for module_id in (1, 2, 3)
+            ]
+        # Sin margen: un cambio se ve en la consulta inmediata siguiente
+        patcher = mock.patch("maintenance.services.data_versions.DELTA_SKEW_MS", 0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _get(self, **params):
+        time.sleep(0.002)  # Los tokens tienen resolución de milisegundos
+        return self.client.get(reverse("maintenance:projection_api"), {"months": 12, **params})
+
+    def test_since_returns_only_changed_modules(self):
+        """Solo el módulo con una lectura nueva; sin cambios, ningún módulo y sin proyectar."""
+        first = self._get().json()
+        self.assertNotIn("delta", first)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            OdometerLog.objects.create(
+                fleet_module=self.modules[1], reading_date=date.today(), odometer_reading=250_000,
+            )
+        self.modules[1].refresh_from_db()
+
+        delta = self._get(since=first["version"]).json()
+        self.assertEqual(delta["delta"], {
+            "since": first["version"], "full": False, "changed_modules": [2],
+        })
+        self.assertEqual(
+            delta["modules"], self._get(module_from=2, module_to=2).json()["modules"]
+        )
+        self.assertEqual(delta["page"]["total_modules"], 3)
+
+        with self.assertNumQueries(1):
+            unchanged = self._get(since=delta["version"]).json()
+        self.assertEqual(unchanged["modules"], [])
+        self.assertEqual(unchanged["delta"]["changed_modules"], [])
+
+    def test_since_from_other_params_returns_full_block(self):
+        """Un token de otros parámetros devuelve el bloque completo; uno mal formado es 400."""
+        version = self._get(months=24).json()["version"]
+
+        data = self._get(since=version).json()
+        self.assertTrue(data["delta"]["full"])
+        self.assertEqual([m["module_id"] for m in data["modules"]], [1, 2, 3])
+
+        self.assertEqual(self._get(since="abc").status_code, 400)
+
+    def test_ndjson_header_carries_delta(self):
+        """El encabezado NDJSON lleva version y delta; solo van las filas cambiadas."""
+        version = self._get().json()["version"]
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_module_versions([3])
+
+        response = self._get(since=version, format="ndjson")
+        header, *rows = [
+            json.loads(line) for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual(header["delta"]["changed_modules"], [3])
+        self.assertIn("version", header)
+        self.assertEqual({row["module_id"] for row in rows}, {3})
+
+    def test_delta_token_roundtrip_and_undated_versions(self):
+        """El token conserva scope y fecha; un token de versión sin fecha no cuenta como cambio."""
+        since, scope = parse_delta_token(delta_token("abc"))
+        self.assertEqual(scope, "abc")
+
+        time.sleep(0.002)
+        with self.captureOnCommitCallbacks(execute=True):
+            bump_module_versions([1])
+        versions = {**get_module_versions([1, 2]), 2: "9acef308eeee"}
+        self.assertEqual(changed_since(versions, since), {1})
@@ -12,5 +12,15 @@ urlpatterns = [
     # Proyección de mantenimiento
     path('projection/', views.projection_view, name='projection_view'),
     path('projection/export/', views.projection_export_excel, name='projection_export'),
+    path('projection/export/tabular/', views.projection_export_tabular, name='projection_export_tabular'),
+    path('projection/export/jobs/', views.projection_export_enqueue, name='projection_export_enqueue'),
+    path('projection/export/jobs/<int:job_id>/', views.projection_export_job, name='projection_export_job'),
+    path(
+        'projection/export/jobs/<int:job_id>/download/',
+        views.projection_export_download,
+        name='projection_export_download',
+    ),
     path('projection/api/', views.projection_api, name='projection_api'),
+    path('projection/snapshots/', views.projection_snapshots, name='projection_snapshots'),
+    path('projection/snapshots/diff/', views.projection_snapshot_diff, name='projection_snapshot_diff'),
 ]
\ No newline at end of file
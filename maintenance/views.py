@@ -3,17 +3,33 @@ Vistas para Dashboard y proyección de mantenimiento.
 """
 from maintenance.views_projection import (
     projection_api,
+    projection_export_download,
+    projection_export_enqueue,
     projection_export_excel,
+    projection_export_job,
+    projection_export_tabular,
+    projection_snapshot_diff,
+    projection_snapshots,
     projection_view,
 )
 
 from datetime import date, timedelta
+from typing import List
 
+from django.core.cache import cache
+from django.db.models import Count, OuterRef, Q, Subquery, Sum
 from django.http import HttpRequest, HttpResponse
 from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
 from django.views.decorators.http import require_http_methods
 
-from maintenance.models import FleetModule, OdometerLog, MaintenanceEvent
+from maintenance.models import FleetModule, MaintenanceEvent
+from maintenance.services.access_extractor import content_hash
+from maintenance.services.data_versions import get_module_versions
+
+DASHBOARD_CACHE_PREFIX = "dashboard"
+DASHBOARD_CACHE_TIMEOUT = 60 * 60 * 24
 
 
 # Las vistas de proyección se importan desde maintenance.views_projection
@@ -26,103 +42,157 @@ def dashboard_view(request: HttpRequest) -> HttpResponse:
     # Obtener parámetro de filtro
     module_filter = request.GET.get('module', '')
     
-    # Fecha actual y primer día del mes
+    # Fecha actual (los fragmentos cacheados son válidos por día)
     today = date.today()
-    first_day_of_month = date(today.year, today.month, 1)
     
-    # Query base de módulos (excluir fuera de servicio)
-    modules_query = FleetModule.objects.exclude(id__in=[47, 67]).order_by('id')
+    # Módulos en servicio: una sola consulta liviana, también para el selector
+    all_modules = list(FleetModule.objects.exclude(id__in=[47, 67]).order_by('id'))
+    modules = all_modules
     
     # Si hay filtro, aplicarlo
     if module_filter:
         try:
             module_id = int(module_filter)
-            modules_query = modules_query.filter(id=module_id)
+            modules = [module for module in all_modules if module.id == module_id]
         except ValueError:
             pass
     
+    # Tarjetas renderizadas desde caché, por (módulo, versión de datos, día);
+    # solo las ausentes se calculan y renderizan
+    month_name = today.strftime('%B %Y')
+    versions = get_module_versions(module.id for module in modules)
+    card_keys = {
+        module.id: f"{DASHBOARD_CACHE_PREFIX}:card:{module.id}:{versions[module.id]}:{today.isoformat()}"
+        for module in modules
+    }
+    cards = cache.get_many(card_keys.values())
+    
+    missing = [module.id for module in modules if card_keys[module.id] not in cards]
+    if missing:
+        rendered = {}
+        for data in _build_modules_data(missing, today):
+            module_id = data['module'].id
+            rendered[card_keys[module_id]] = {
+                'module_id': module_id,
+                'html': render_to_string(
+                    'maintenance/_module_card.html',
+                    {'data': data, 'month_name': month_name},
+                ).strip(),
+                'km_this_month': data['km_this_month'],
+                'daily_avg_km': data['daily_avg_km'],
+            }
+        cache.set_many(rendered, timeout=DASHBOARD_CACHE_TIMEOUT)
+        cards.update(rendered)
+    
+    modules_data = [
+        {**cards[card_keys[module.id]], 'html': mark_safe(cards[card_keys[module.id]]['html'])}
+        for module in modules
+        if card_keys[module.id] in cards
+    ]
+    
+    # Estadísticas generales, cacheadas por las versiones de toda la flota
+    if not module_filter:
+        stats_key = f"{DASHBOARD_CACHE_PREFIX}:stats:" + content_hash(
+            today, *(f"{module.id}:{versions[module.id]}" for module in modules)
+        )
+        stats = cache.get(stats_key)
+        if stats is None:
+            total_modules = len(modules_data)
+            total_km_month = sum(m['km_this_month'] for m in modules_data)
+            avg_daily_fleet = sum(m['daily_avg_km'] for m in modules_data) / total_modules if total_modules > 0 else 0
+            
+            stats = {
+                'total_modules': total_modules,
+                'total_km_month': total_km_month,
+                'avg_daily_fleet': int(avg_daily_fleet),
+            }
+            cache.set(stats_key, stats, timeout=DASHBOARD_CACHE_TIMEOUT)
+    else:
+        stats = None
+    
+    context = {
+        'modules_data': modules_data,
+        'stats': stats,
+        'month_name': month_name,
+        'filtered_module': module_filter,
+        'all_modules': all_modules,
+    }
+    
+    return render(request, 'maintenance/dashboard.html', context)
+
+
+def _build_modules_data(module_ids: List[int], today: date) -> List[dict]:
+    """
+    Calcula las métricas de las tarjetas de los módulos indicados.
+    
+    Todas las métricas salen de una consulta: Sum/Count condicionales sobre
+    los deltas (solo positivos) y fecha, km y tipo del último evento por
+    subconsultas.
+    
+    Returns:
+        Lista de dicts (module, km_this_month, last_event, daily_avg_km)
+    """
+    first_day_of_month = date(today.year, today.month, 1)
+    thirty_days_ago = today - timedelta(days=30)
+    
+    positive_delta = Q(odometer_logs__daily_delta_km__gt=0)
+    last_event = (
+        MaintenanceEvent.objects.filter(fleet_module=OuterRef('pk'))
+        .order_by('-event_date', '-id')
+    )
+    modules = list(
+        FleetModule.objects.filter(id__in=module_ids).order_by('id').annotate(
+            km_this_month=Sum(
+                'odometer_logs__daily_delta_km',
+                filter=positive_delta & Q(odometer_logs__reading_date__gte=first_day_of_month),
+                default=0,
+            ),
+            recent_km=Sum(
+                'odometer_logs__daily_delta_km',
+                filter=positive_delta & Q(odometer_logs__reading_date__gte=thirty_days_ago),
+                default=0,
+            ),
+            recent_count=Count(
+                'odometer_logs',
+                filter=positive_delta & Q(odometer_logs__reading_date__gte=thirty_days_ago),
+            ),
+            last_event_date=Subquery(last_event.values('event_date')[:1]),
+            last_event_km=Subquery(last_event.values('odometer_km')[:1]),
+            last_event_type=Subquery(last_event.values('profile__code')[:1]),
+        )
+    )
+    
     # Construir datos de cada módulo
     modules_data = []
     
-    for module in modules_query:
-        # ✅ FIX: Usar daily_delta_km en lugar de restar lecturas
-        # Esto es más preciso y respeta los deltas ya calculados
-        month_deltas = OdometerLog.objects.filter(
-            fleet_module=module,
-            reading_date__gte=first_day_of_month
-        ).values_list('daily_delta_km', flat=True)
-        
-        # Sumar todos los deltas del mes (ignora None)
-        km_this_month = sum(km for km in month_deltas if km is not None and km > 0)
-        
-        # Último evento de mantenimiento
-        last_event = MaintenanceEvent.objects.filter(
-            fleet_module=module
-        ).order_by('-event_date', '-id').first()
-        
-        if last_event:
-            days_since_event = (today - last_event.event_date).days
-            
-            # ✅ FIX: Calcular km desde evento usando current_km - km_at_event
-            current_km = module.total_accumulated_km
-            km_since_event = current_km - last_event.odometer_km
+    for module in modules:
+        if module.last_event_date:
+            days_since_event = (today - module.last_event_date).days
             
-            # Validación: no puede ser negativo
-            if km_since_event < 0:
-                km_since_event = 0
+            # Km desde evento: current_km - km_at_event (nunca negativo)
+            km_since_event = max(module.total_accumulated_km - module.last_event_km, 0)
                 
             last_event_data = {
-                'type': last_event.profile.code,
-                'date': last_event.event_date,
+                'type': module.last_event_type,
+                'date': module.last_event_date,
                 'days_ago': days_since_event,
                 'km_since': km_since_event,
-                'km_at_event': last_event.odometer_km,
+                'km_at_event': module.last_event_km,
             }
         else:
             last_event_data = None
         
-        # ✅ FIX: Promedio diario usando daily_delta_km
-        thirty_days_ago = today - timedelta(days=30)
-        recent_deltas = OdometerLog.objects.filter(
-            fleet_module=module,
-            reading_date__gte=thirty_days_ago
-        ).values_list('daily_delta_km', 'reading_date')
-        
-        # Filtrar solo deltas positivos y calcular promedio
-        valid_deltas = [km for km, _ in recent_deltas if km is not None and km > 0]
-        
-        if valid_deltas:
-            daily_avg = sum(valid_deltas) / len(valid_deltas)
+        # Promedio diario de los deltas positivos de los últimos 30 días
+        if module.recent_count:
+            daily_avg = module.recent_km / module.recent_count
         else:
             daily_avg = 0
         
         modules_data.append({
             'module': module,
-            'km_this_month': int(km_this_month),
+            'km_this_month': int(module.km_this_month),
             'last_event': last_event_data,
             'daily_avg_km': int(daily_avg),
         })
     
-    # Estadísticas generales
-    if not module_filter:
-        total_modules = len(modules_data)
-        total_km_month = sum(m['km_this_month'] for m in modules_data)
-        avg_daily_fleet = sum(m['daily_avg_km'] for m in modules_data) / total_modules if total_modules > 0 else 0
-        
-        stats = {
-            'total_modules': total_modules,
-            'total_km_month': total_km_month,
-            'avg_daily_fleet': int(avg_daily_fleet),
-        }
-    else:
-        stats = None
-    
-    context = {
-        'modules_data': modules_data,
-        'stats': stats,
-        'month_name': today.strftime('%B %Y'),
-        'filtered_module': module_filter,
-        'all_modules': FleetModule.objects.exclude(id__in=[47, 67]).order_by('id'),
-    }
-    
-    return render(request, 'maintenance/dashboard.html', context)
+    return modules_data
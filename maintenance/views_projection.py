@@ -3,18 +3,122 @@ Vistas para proyección de mantenimiento.
 """
 from __future__ import annotations
 
-import os
-import tempfile
-from datetime import date
+from datetime import date, datetime, time
 
 from django.contrib import messages
-from django.http import HttpRequest, HttpResponse, FileResponse
-from django.shortcuts import render
-from django.views.decorators.http import require_http_methods
+from django.http import FileResponse, HttpRequest, HttpResponse, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, render
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import condition, require_http_methods
 
-from maintenance.models import FleetModule
+from maintenance.models import ExportJob, FleetModule, ProjectionSnapshot
+from maintenance.services.access_extractor import content_hash
+from maintenance.services.data_versions import (
+    changed_since,
+    delta_token,
+    get_module_versions,
+    parse_delta_token,
+    version_timestamp,
+)
+from maintenance.services.export_cache import ExportArtifactCache, artifact_key, projection_workbook
+from maintenance.services.export_jobs import enqueue_projection_export, job_artifact
 from maintenance.services.projection_grid import MaintenanceProjectionGrid
-from maintenance.services.projection_excel import ProjectionExcelExporter
+from maintenance.services.projection_html import ProjectionTableRenderer
+from maintenance.services.projection_snapshots import diff_snapshots
+from maintenance.services.projection_tabular import (
+    DATASETS,
+    FORMATS as TABULAR_FORMATS,
+    PROJECTION,
+    history_records,
+    iter_csv,
+    parquet_available,
+    projection_records,
+    write_parquet,
+)
+
+
+# Módulos por bloque de la grilla paginada (aprox. una pantalla)
+GRID_PAGE_SIZE = 10
+GRID_MAX_PAGE_SIZE = 100
+
+# Formatos de projection_api
+API_FORMATS = ('nested', 'columnar', 'ndjson')
+
+# Parámetros de projection_api que no cambian los datos (no invalidan ``since``)
+API_DELTA_IGNORED = ('since', 'format', 'html')
+
+
+def _active_modules() -> list[FleetModule]:
+    """Módulos activos (excluir 47 y 67 que están fuera de servicio)."""
+    return list(FleetModule.objects.exclude(id__in=[47, 67]).order_by('id'))
+
+
+def _module_page(
+    modules: list[FleetModule],
+    module_from: int | None = None,
+    module_to: int | None = None,
+    limit: int | None = None
+) -> tuple[list[FleetModule], int | None]:
+    """
+    Selecciona un bloque de módulos por rango de id.
+    
+    Returns:
+        Tupla (módulos del bloque, id del primer módulo del bloque siguiente)
+    """
+    selected = [
+        module for module in modules
+        if (module_from is None or module.id >= module_from)
+        and (module_to is None or module.id <= module_to)
+    ]
+    if limit is not None and len(selected) > limit:
+        return selected[:limit], selected[limit].id
+    return selected, None
+
+
+def _parse_grid_window(request: HttpRequest, months_ahead: int) -> dict:
+    """
+    Lee los parámetros opcionales de bloque de ``projection_api``.
+    
+    Raises:
+        ValueError: Con el mensaje a devolver si algún parámetro es inválido
+    """
+    def optional_int(name: str) -> int | None:
+        value = request.GET.get(name, '')
+        if value == '':
+            return None
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f'{name} debe ser un entero')
+    
+    window = {
+        'module_from': optional_int('module_from'),
+        'module_to': optional_int('module_to'),
+        'limit': optional_int('limit'),
+        'month_from': optional_int('month_from'),
+        'month_to': optional_int('month_to'),
+        'types': None,
+    }
+    if window['month_from'] is None:
+        window['month_from'] = 1
+    if window['month_to'] is None:
+        window['month_to'] = months_ahead
+    
+    if window['limit'] is not None and not 1 <= window['limit'] <= GRID_MAX_PAGE_SIZE:
+        raise ValueError(f'limit debe estar entre 1 y {GRID_MAX_PAGE_SIZE}')
+    if not 1 <= window['month_from'] <= window['month_to'] <= months_ahead:
+        raise ValueError('month_from y month_to deben cumplir 1 <= month_from <= month_to <= months')
+    
+    types = request.GET.get('types', '')
+    if types:
+        window['types'] = [t.strip().upper() for t in types.split(',') if t.strip()]
+        unknown = set(window['types']) - set(MaintenanceProjectionGrid.HIERARCHY)
+        if unknown:
+            raise ValueError(f'types inválidos: {", ".join(sorted(unknown))}')
+    
+    return window
 
 
 @require_http_methods(["GET"])
@@ -37,23 +141,27 @@ def projection_view(request: HttpRequest) -> HttpResponse:
     if monthly_km < 1000 or monthly_km > 50_000:
         monthly_km = 12_500
     
-    # Obtener módulos activos (excluir 47 y 67 que están fuera de servicio)
-    modules = FleetModule.objects.exclude(
-        id__in=[47, 67]
-    ).order_by('id')
+    # Solo el primer bloque de módulos; el resto lo pide la página al
+    # hacer scroll (projection_api con html=1)
+    modules = _active_modules()
+    page, next_module_from = _module_page(modules, limit=GRID_PAGE_SIZE)
     
     # Generar proyecciones
     grid_service = MaintenanceProjectionGrid(monthly_km=monthly_km)
     
     try:
         projections = grid_service.generate_for_all_modules(
-            modules=list(modules),
+            modules=page,
             months_ahead=months_ahead,
             start_date=date.today()
         )
         
-        # Convertir a formato para template
-        projection_data = grid_service.export_to_dict(projections)
+        # Filas de la grilla renderizadas sin el motor de templates
+        renderer = ProjectionTableRenderer()
+        projection_data = {
+            'months_html': renderer.render_months(projections),
+            'rows_html': renderer.render_rows(projections),
+        }
         
         context = {
             'projections': projection_data,
@@ -61,6 +169,8 @@ def projection_view(request: HttpRequest) -> HttpResponse:
             'monthly_km': monthly_km,
             'total_modules': len(modules),
             'generation_date': date.today(),
+            'next_module_from': next_module_from,
+            'page_size': GRID_PAGE_SIZE,
         }
         
         return render(request, 'maintenance/projection.html', context)
@@ -82,15 +192,19 @@ def projection_view(request: HttpRequest) -> HttpResponse:
         return render(request, 'maintenance/projection.html', context)
 
 
-@require_http_methods(["GET"])
-def projection_export_excel(request: HttpRequest) -> HttpResponse:
+def _export_params(data) -> tuple[int, int]:
     """
-    Exporta proyección a Excel.
+    Meses y km/mes de una exportación; valores inválidos toman el default.
+    
+    Args:
+        data: ``request.GET`` o ``request.POST``
+    
+    Returns:
+        Tupla (months_ahead, monthly_km)
     """
-    # Obtener parámetros
     try:
-        months_ahead = int(request.GET.get('months', 24))
-        monthly_km = int(request.GET.get('monthly_km', 12_500))
+        months_ahead = int(data.get('months', 24))
+        monthly_km = int(data.get('monthly_km', 12_500))
     except ValueError:
         months_ahead = 24
         monthly_km = 12_500
@@ -101,127 +215,400 @@ def projection_export_excel(request: HttpRequest) -> HttpResponse:
     if monthly_km < 1000 or monthly_km > 50_000:
         monthly_km = 12_500
     
-    # Obtener módulos activos
-    modules = FleetModule.objects.exclude(
-        id__in=[47, 67]
-    ).order_by('id')
+    return months_ahead, monthly_km
+
+
+@require_http_methods(["GET"])
+def projection_export_excel(request: HttpRequest) -> HttpResponse:
+    """
+    Exporta proyección a Excel.
+    """
+    # Obtener parámetros
+    months_ahead, monthly_km = _export_params(request.GET)
     
-    # Generar proyecciones
-    grid_service = MaintenanceProjectionGrid(monthly_km=monthly_km)
+    # Obtener módulos activos
+    modules = _active_modules()
     
     try:
-        projections = grid_service.generate_for_all_modules(
-            modules=list(modules),
+        # Mismos datos y parámetros que una exportación previa: se reutiliza
+        # el archivo en caché; si no, se genera una sola vez y se guarda
+        path = projection_workbook(
+            modules,
             months_ahead=months_ahead,
+            monthly_km=monthly_km,
             start_date=date.today()
         )
         
-        # Crear archivo temporal
-        with tempfile.NamedTemporaryFile(
-            mode='wb',
-            suffix='.xlsx',
-            delete=False
-        ) as tmp_file:
-            tmp_path = tmp_file.name
-        
-        # Exportar a Excel
-        exporter = ProjectionExcelExporter()
-        exporter.export(
-            projections=projections,
-            filepath=tmp_path,
-            monthly_km=monthly_km
+        # FileResponse sobre un archivo real usa wsgi.file_wrapper (sendfile)
+        filename = f'proyeccion_mantenimiento_{date.today().strftime("%Y%m%d")}.xlsx'
+        return FileResponse(
+            open(path, 'rb'),
+            as_attachment=True,
+            filename=filename,
+            content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
         )
-        
-        # Leer archivo y enviarlo
-        with open(tmp_path, 'rb') as f:
-            response = HttpResponse(
-                f.read(),
-                content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    
+    except Exception as e:
+        # Mismo formato de error que los endpoints de jobs
+        return _json_response({'error': f'Error al exportar a Excel: {e}'}, status=500)
+
+
+@require_http_methods(["GET"])
+def projection_export_tabular(request: HttpRequest) -> HttpResponse:
+    """
+    Exporta la proyección o el historial en formato largo para BI.
+    
+    Parámetros:
+        format: ``csv`` (default, en streaming) o ``parquet`` (requiere pyarrow)
+        dataset: ``projection`` (default: módulo, tipo, mes, km, flags),
+            ``odometer`` (lecturas) o ``events`` (eventos de mantenimiento)
+        months, monthly_km: Como en la exportación a Excel
+    
+    El Parquet se guarda en la caché de exportaciones y se reutiliza
+    mientras no cambien los datos.
+    """
+    fmt = request.GET.get('format', 'csv')
+    dataset = DATASETS.get(request.GET.get('dataset', 'projection'))
+    if fmt not in TABULAR_FORMATS or dataset is None:
+        return _json_response({
+            'error': f'format debe ser {"/".join(TABULAR_FORMATS)} y dataset {"/".join(DATASETS)}'
+        }, status=400)
+    if fmt == 'parquet' and not parquet_available():
+        return _json_response({'error': 'La exportación Parquet requiere pyarrow'}, status=501)
+    
+    months_ahead, monthly_km = _export_params(request.GET)
+    modules = _active_modules()
+    start_date = date.today()
+    
+    def records():
+        if dataset is PROJECTION:
+            grid_service = MaintenanceProjectionGrid(monthly_km=monthly_km)
+            return projection_records(
+                grid_service.iter_for_modules(modules, months_ahead=months_ahead, start_date=start_date)
             )
-            
-            filename = f'proyeccion_mantenimiento_{date.today().strftime("%Y%m%d")}.xlsx'
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-        
-        # Limpiar archivo temporal
+        return history_records(dataset, [module.id for module in modules])
+    
+    filename = f'proyeccion_{dataset.name}_{start_date.strftime("%Y%m%d")}.{fmt}'
+    if fmt == 'csv':
+        response = StreamingHttpResponse(
+            iter_csv(dataset, records()),
+            content_type='text/csv; charset=utf-8'
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+    
+    key = artifact_key(
+        f'{dataset.name}_parquet',
+        [module.id for module in modules],
+        months=months_ahead,
+        monthly_km=monthly_km,
+        start=start_date.isoformat(),
+    )
+    path = ExportArtifactCache().get_or_build(
+        key, '.parquet', lambda output: write_parquet(dataset, records(), output)
+    )
+    return FileResponse(
+        open(path, 'rb'),
+        as_attachment=True,
+        filename=filename,
+        content_type='application/vnd.apache.parquet'
+    )
+
+
+def _export_job_state(job: ExportJob) -> dict:
+    """Estado de un job de exportación para el cliente que lo consulta."""
+    state = {
+        'id': job.pk,
+        'status': job.status,
+        'progress': job.progress,
+        'total': job.total,
+        'percent': job.percent,
+        'error': job.error or None,
+        'status_url': reverse('maintenance:projection_export_job', args=[job.pk]),
+        'download_url': None,
+    }
+    if job.status == ExportJob.Status.OK:
+        state['download_url'] = reverse('maintenance:projection_export_download', args=[job.pk])
+    return state
+
+
+def _json_response(data: dict, status: int = 200) -> HttpResponse:
+    import json
+    
+    return HttpResponse(json.dumps(data), content_type='application/json', status=status)
+
+
+@require_http_methods(["POST"])
+def projection_export_enqueue(request: HttpRequest) -> HttpResponse:
+    """
+    Encola la exportación a Excel para ``run_export_worker``.
+    
+    Responde 202 con el estado del job (``status_url`` para consultar el
+    avance). Si el libro ya estaba en la caché, el job se crea terminado y
+    la respuesta es 200 con ``download_url``.
+    """
+    months_ahead, monthly_km = _export_params(request.POST)
+    job = enqueue_projection_export(
+        _active_modules(),
+        months_ahead=months_ahead,
+        monthly_km=monthly_km,
+        start_date=date.today()
+    )
+    status = 200 if job.status == ExportJob.Status.OK else 202
+    return _json_response(_export_job_state(job), status=status)
+
+
+@require_http_methods(["GET"])
+def projection_export_job(request: HttpRequest, job_id: int) -> HttpResponse:
+    """Estado y avance de un job de exportación."""
+    job = get_object_or_404(ExportJob, pk=job_id)
+    return _json_response(_export_job_state(job))
+
+
+@require_http_methods(["GET"])
+def projection_export_download(request: HttpRequest, job_id: int) -> HttpResponse:
+    """
+    Descarga el archivo de un job terminado.
+    
+    Responde 409 si el job no terminó bien y 410 si el archivo ya salió de
+    la caché de exportaciones (hay que volver a encolar).
+    """
+    job = get_object_or_404(ExportJob, pk=job_id)
+    if job.status != ExportJob.Status.OK:
+        return _json_response(_export_job_state(job), status=409)
+    
+    path = job_artifact(job)
+    if path is None:
+        return _json_response({'error': 'El archivo ya no está disponible; volvé a exportar'}, status=410)
+    
+    start_date = job.params['start_date'].replace('-', '')
+    return FileResponse(
+        open(path, 'rb'),
+        as_attachment=True,
+        filename=f'proyeccion_mantenimiento_{start_date}.xlsx',
+        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+    )
+
+
+def _projection_api_request(request: HttpRequest) -> dict:
+    """
+    Parámetros validados, bloque de módulos y versiones de datos de una
+    consulta a ``projection_api``.
+    
+    Se memoiza en el request: lo usan las funciones de ``condition``
+    (ETag / Last-Modified) y la vista, con una sola consulta de módulos.
+    
+    Returns:
+        Dict con params, window, modules, page, next_module_from, versions,
+        scope y changed (módulos del bloque a enviar con ``since``, None si
+        va el bloque completo); o {'error': motivo} si algún parámetro es inválido
+    """
+    cached = getattr(request, '_projection_api_request', None)
+    if cached is not None:
+        return cached
+    
+    try:
         try:
-            os.unlink(tmp_path)
-        except Exception:
-            pass
+            months_ahead = int(request.GET.get('months', 24))
+            monthly_km = int(request.GET.get('monthly_km', 12_500))
+        except ValueError:
+            raise ValueError('Parámetros inválidos')
         
-        return response
+        if months_ahead < 1 or months_ahead > 60:
+            raise ValueError('months debe estar entre 1 y 60')
+        if monthly_km < 1000 or monthly_km > 50_000:
+            raise ValueError('monthly_km debe estar entre 1000 y 50000')
+        
+        output_format = request.GET.get('format', 'nested')
+        if output_format not in API_FORMATS:
+            raise ValueError(f'format debe ser uno de: {", ".join(API_FORMATS)}')
+        
+        window = _parse_grid_window(request, months_ahead)
+        since = parse_delta_token(request.GET['since']) if request.GET.get('since') else None
     
-    except Exception as e:
-        messages.error(
-            request,
-            f'Error al exportar a Excel: {str(e)}'
-        )
-        # Redirigir a vista principal
-        return HttpResponse(
-            f'Error al exportar: {str(e)}',
-            status=500
+    except ValueError as e:
+        state = {'error': str(e)}
+    
+    else:
+        # Bloque de módulos activos pedido
+        modules = _active_modules()
+        page, next_module_from = _module_page(
+            modules, window['module_from'], window['module_to'], window['limit']
         )
+        state = {
+            'months_ahead': months_ahead,
+            'monthly_km': monthly_km,
+            'format': output_format,
+            'window': window,
+            'modules': modules,
+            'page': page,
+            'next_module_from': next_module_from,
+            'versions': get_module_versions(module.id for module in page),
+            # Un token de deltas vale para los mismos parámetros y el mismo día
+            'scope': content_hash(
+                date.today(),
+                *sorted(item for item in request.GET.items() if item[0] not in API_DELTA_IGNORED),
+            ),
+            'changed': None,
+        }
+        if since is not None and since[1] == state['scope']:
+            state['changed'] = changed_since(state['versions'], since[0])
+    
+    request._projection_api_request = state
+    return state
+
+
+def _projection_api_etag(request: HttpRequest) -> str | None:
+    """ETag: parámetros, fecha de inicio y versión de datos de cada módulo del bloque."""
+    state = _projection_api_request(request)
+    if 'error' in state:
+        return None
+    return content_hash(
+        sorted(request.GET.items()),
+        date.today(),
+        *(f"{module_id}:{version}" for module_id, version in state['versions'].items()),
+    )
+
+
+def _projection_api_last_modified(request: HttpRequest) -> datetime | None:
+    """Última escritura de los módulos del bloque (la proyección cambia además cada día)."""
+    state = _projection_api_request(request)
+    if 'error' in state:
+        return None
+    start_of_day = timezone.make_aware(datetime.combine(date.today(), time.min))
+    return max([start_of_day, *filter(None, map(version_timestamp, state['versions'].values()))])
 
 
+def _ndjson_with_errors(lines):
+    """
+    Reenvía las líneas NDJSON; un error a mitad de la respuesta (el status
+    200 ya se envió) se informa como una última línea ``{"type": "error"}``.
+    """
+    import json
+    
+    try:
+        yield from lines
+    except Exception as e:
+        yield json.dumps({'type': 'error', 'error': str(e)}) + '\n'
+
+
+@gzip_page
+@condition(etag_func=_projection_api_etag, last_modified_func=_projection_api_last_modified)
 @require_http_methods(["GET"])
 def projection_api(request: HttpRequest) -> HttpResponse:
     """
     API JSON para obtener proyecciones.
     Útil para consumir desde frontend/React.
+    
+    Parámetros opcionales de bloque (grilla paginada):
+        module_from, module_to: Rango de ids de módulo (inclusive)
+        limit: Máximo de módulos por respuesta (1-100)
+        types: Tipos de intervención separados por coma (DA,P,BI,A)
+        month_from, month_to: Ventana de meses dentro del horizonte (1-based)
+        html: Si es 1, devuelve ``rows_html`` (filas de la grilla) en lugar de ``modules``
+        format: ``nested`` (default, una entrada por celda), ``columnar``
+            (eje de meses compartido, km por fila y bitmasks) o ``ndjson``
+            (streaming: línea de encabezado y luego una línea por fila)
+        since: ``version`` de una respuesta anterior con los mismos
+            parámetros: solo se proyectan y devuelven los módulos del bloque
+            cuyos datos cambiaron después (ver ``delta``)
+    
+    La respuesta incluye ``page`` con el bloque servido,
+    ``next_module_from`` para pedir el siguiente y ``version`` para pedir
+    luego solo los cambios. Con ``since`` incluye ``delta``: ``full`` es
+    true si el token es de otro día o de otros parámetros (va el bloque
+    completo) y ``changed_modules`` lista los módulos enviados. Lleva ETag y
+    Last-Modified según la versión de datos de los módulos (304 si el
+    cliente ya tiene esa versión) y se comprime con gzip.
     """
     import json
     
-    # Obtener parámetros
-    try:
-        months_ahead = int(request.GET.get('months', 24))
-        monthly_km = int(request.GET.get('monthly_km', 12_500))
-    except ValueError:
+    state = _projection_api_request(request)
+    if 'error' in state:
         return HttpResponse(
-            json.dumps({'error': 'Parámetros inválidos'}),
+            json.dumps({'error': state['error']}),
             content_type='application/json',
             status=400
         )
     
-    # Validaciones
-    if months_ahead < 1 or months_ahead > 60:
-        return HttpResponse(
-            json.dumps({'error': 'months debe estar entre 1 y 60'}),
-            content_type='application/json',
-            status=400
-        )
-    if monthly_km < 1000 or monthly_km > 50_000:
-        return HttpResponse(
-            json.dumps({'error': 'monthly_km debe estar entre 1000 y 50000'}),
-            content_type='application/json',
-            status=400
-        )
+    window = state['window']
+    page = state['page']
     
-    # Obtener módulos activos
-    modules = FleetModule.objects.exclude(
-        id__in=[47, 67]
-    ).order_by('id')
+    # Con since, solo los módulos que cambiaron
+    projected = page
+    if state['changed'] is not None:
+        projected = [module for module in page if module.id in state['changed']]
     
-    # Generar proyecciones
-    grid_service = MaintenanceProjectionGrid(monthly_km=monthly_km)
+    # Generar proyecciones (solo hasta el último mes de la ventana)
+    grid_service = MaintenanceProjectionGrid(monthly_km=state['monthly_km'])
+    
+    meta = {
+        'generation_date': date.today().isoformat(),
+        'params': {
+            'months_ahead': state['months_ahead'],
+            'monthly_km': state['monthly_km'],
+        },
+        'page': {
+            'module_from': page[0].id if page else None,
+            'module_to': page[-1].id if page else None,
+            'next_module_from': state['next_module_from'],
+            'total_modules': len(state['modules']),
+            'types': window['types'] or grid_service.HIERARCHY,
+            'month_from': window['month_from'],
+            'month_to': window['month_to'],
+        },
+        'version': delta_token(state['scope']),
+    }
+    if request.GET.get('since'):
+        meta['delta'] = {
+            'since': request.GET['since'],
+            'full': state['changed'] is None,
+            'changed_modules': [module.id for module in projected],
+        }
+    
+    if state['format'] == 'ndjson':
+        # Una línea por fila, enviada apenas se proyecta cada módulo
+        projections = (
+            windowed
+            for module_id, rows in grid_service.iter_for_modules(
+                projected, months_ahead=window['month_to'], start_date=date.today()
+            )
+            for windowed in grid_service.window(
+                {module_id: rows}, window['types'], window['month_from'], window['month_to']
+            ).items()
+        )
+        return StreamingHttpResponse(
+            _ndjson_with_errors(grid_service.iter_ndjson(projections, header=meta)),
+            content_type='application/x-ndjson'
+        )
     
     try:
         projections = grid_service.generate_for_all_modules(
-            modules=list(modules),
-            months_ahead=months_ahead,
+            modules=projected,
+            months_ahead=window['month_to'],
             start_date=date.today()
         )
+        projections = grid_service.window(
+            projections, window['types'], window['month_from'], window['month_to']
+        )
         
         # Convertir a dict
-        result = grid_service.export_to_dict(projections)
-        result['generation_date'] = date.today().isoformat()
-        result['params'] = {
-            'months_ahead': months_ahead,
-            'monthly_km': monthly_km,
-        }
+        if state['format'] == 'columnar':
+            result = grid_service.export_to_columnar(projections)
+        else:
+            result = grid_service.export_to_dict(projections)
+        result.update(meta)
+        if request.GET.get('html') == '1':
+            # La página solo inserta el markup: no se repiten las celdas en JSON
+            del result['modules']
+            result['rows_html'] = ProjectionTableRenderer().render_rows(projections)
         
-        return HttpResponse(
-            json.dumps(result, indent=2),
-            content_type='application/json'
-        )
+        if state['format'] == 'columnar':
+            content = json.dumps(result, separators=(',', ':'))
+        else:
+            content = json.dumps(result, indent=2)
+        
+        return HttpResponse(content, content_type='application/json')
     
     except Exception as e:
         return HttpResponse(
@@ -229,3 +616,75 @@ def projection_api(request: HttpRequest) -> HttpResponse:
             content_type='application/json',
             status=500
         )
+
+
+@require_http_methods(["GET"])
+def projection_snapshots(request: HttpRequest) -> HttpResponse:
+    """
+    Snapshots guardados por ``snapshot_projection``, del más reciente al más viejo.
+    
+    Query params:
+        limit: Cantidad máxima (default: 30)
+    """
+    try:
+        limit = int(request.GET.get('limit', 30))
+    except ValueError:
+        return _json_response({'error': 'limit debe ser un número'}, status=400)
+    if limit < 1:
+        return _json_response({'error': 'limit debe ser mayor a 0'}, status=400)
+    
+    snapshots = ProjectionSnapshot.objects.defer('data')[:limit]
+    return _json_response({
+        'snapshots': [
+            {
+                'id': snapshot.pk,
+                'taken_on': snapshot.taken_on.isoformat(),
+                'months_ahead': snapshot.months_ahead,
+                'monthly_km': snapshot.monthly_km,
+                'module_count': snapshot.module_count,
+            }
+            for snapshot in snapshots
+        ],
+    })
+
+
+@gzip_page
+@require_http_methods(["GET"])
+def projection_snapshot_diff(request: HttpRequest) -> HttpResponse:
+    """
+    Celdas que cambiaron entre dos snapshots de la proyección.
+    
+    Query params:
+        to: Id del snapshot nuevo (default: el más reciente)
+        from: Id del snapshot viejo (default: el anterior a ``to`` con los
+            mismos meses y km/mes)
+    
+    Solo se comparan los meses que cubren ambos snapshots. La respuesta
+    lista por módulo y tipo las celdas distintas, con pares [antes, después]
+    (ver ``projection_snapshots.diff_arrays``).
+    """
+    try:
+        to_id = int(request.GET['to']) if request.GET.get('to') else None
+        from_id = int(request.GET['from']) if request.GET.get('from') else None
+    except ValueError:
+        return _json_response({'error': 'from y to deben ser ids de snapshot'}, status=400)
+    
+    if to_id is None:
+        after = ProjectionSnapshot.objects.first()
+        if after is None:
+            return _json_response({'error': 'No hay snapshots guardados'}, status=404)
+    else:
+        after = get_object_or_404(ProjectionSnapshot, pk=to_id)
+    
+    if from_id is None:
+        before = ProjectionSnapshot.objects.filter(
+            months_ahead=after.months_ahead,
+            monthly_km=after.monthly_km,
+            taken_on__lt=after.taken_on,
+        ).first()
+        if before is None:
+            return _json_response({'error': 'No hay un snapshot anterior para comparar'}, status=404)
+    else:
+        before = get_object_or_404(ProjectionSnapshot, pk=from_id)
+    
+    return _json_response(diff_snapshots(before, after))